@@ -1,9 +1,13 @@
-import os, re, time, json
+import asyncio, os, re, sys, json
 from pathlib import Path
-import requests
+import httpx
 import pandas as pd
 from slugify import slugify
 
+# Run from the repository root; make the backend's app package importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from app.utils import http_client
+
 # ---- CONFIG ----
 INPUT_DIR  = Path("hawkersg/backend/SFA/centres_output")
 OUTPUT_DIR = Path("hawkersg/backend/SFA/stall_images")
@@ -24,10 +28,10 @@ def guess_ext(url: str) -> str:
 def safe_name(s: str) -> str:
     return slugify(s, lowercase=True, max_length=90)
 
-def bing_search(query: str, market="en-SG", safe="Moderate"):
+async def bing_search(query: str, market="en-SG", safe="Moderate"):
     headers = {"Ocp-Apim-Subscription-Key": BING_KEY}
     params  = {"q": query, "mkt": market, "safeSearch": safe, "count": 10, "imageType": "Photo"}
-    r = requests.get(BING_ENDPOINT, headers=headers, params=params, timeout=20)
+    r = await http_client.get(BING_ENDPOINT, headers=headers, params=params, timeout=20)
     r.raise_for_status()
     return r.json()
 
@@ -41,12 +45,12 @@ def choose_image(payload: dict):
             return item
     return vals[0] if vals else None
 
-def download(url: str, outpath: Path) -> bool:
+async def download(url: str, outpath: Path) -> bool:
     try:
-        with requests.get(url, stream=True, timeout=30) as r:
+        async with http_client.stream("GET", url, timeout=30) as r:
             r.raise_for_status()
             with open(outpath, "wb") as f:
-                for chunk in r.iter_content(8192):
+                async for chunk in r.aiter_bytes(8192):
                     if chunk:
                         f.write(chunk)
         return outpath.stat().st_size > 10_000
@@ -66,7 +70,7 @@ def get_hawker_name_from_df_or_filename(df: pd.DataFrame, xlsx_path: Path) -> st
     return parts[1] if len(parts) > 1 else base
 
 # ---- MAIN ----
-def main():
+async def main():
     assert BING_KEY, "BING_KEY env var is not set."
 
     ensure_dir(OUTPUT_DIR)
@@ -113,19 +117,19 @@ def main():
 
             query = f"{stall} {hawker_name} Singapore stall"
             try:
-                payload = bing_search(query)
+                payload = await bing_search(query)
                 item = choose_image(payload)
                 if not item:
                     misses.append({"file": xfile.name, "stall": stall, "reason": "no_results"})
-                    time.sleep(DELAY_SEC); continue
+                    await asyncio.sleep(DELAY_SEC); continue
 
                 url = item.get("contentUrl") or item.get("hostPageUrl")
                 ext = guess_ext(url)
                 out = hawker_dir / f"{safe_name(stall)}.{ext}"
 
-                ok = download(url, out)
+                ok = await download(url, out)
                 if not ok and item.get("thumbnailUrl"):
-                    ok = download(item["thumbnailUrl"], out)
+                    ok = await download(item["thumbnailUrl"], out)
 
                 if not ok:
                     misses.append({"file": xfile.name, "stall": stall, "reason": "download_failed", "url": url})
@@ -143,18 +147,19 @@ def main():
                         json.dump(meta, f, indent=2)
                     count += 1
 
-            except requests.HTTPError as e:
+            except httpx.HTTPStatusError as e:
                 misses.append({"file": xfile.name, "stall": stall, "reason": f"http_{e.response.status_code}"})
             except Exception as e:
                 misses.append({"file": xfile.name, "stall": stall, "reason": f"exception_{type(e).__name__}"})
 
-            time.sleep(DELAY_SEC)
+            await asyncio.sleep(DELAY_SEC)
             if PER_FILE_LIMIT and count >= PER_FILE_LIMIT: break
 
     # Write report
     with open(OUTPUT_DIR / "_stall_image_report.json", "w") as f:
         json.dump(misses, f, indent=2)
     print(f"Done. Misses logged to {OUTPUT_DIR / '_stall_image_report.json'}")
+    await http_client.aclose()
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,6 +1,13 @@
-import requests
+import asyncio
 import json
-import time
+import os
+import sys
+
+import httpx
+
+# Run from the repository root; make the backend's app package importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.utils import http_client
 
 # ==============================================================================
 # CONFIGURATION
@@ -17,7 +24,7 @@ INPUT_FILE = "backend/SFA/index.json"
 OUTPUT_FILE = "backend/SFA/index_enriched.json"
 
 
-def get_coordinates(postal_code: str) -> tuple[float | None, float | None]:
+async def get_coordinates(postal_code: str) -> tuple[float | None, float | None]:
     """
     Fetches latitude and longitude for a given postal code using OneMap Search API.
     """
@@ -41,7 +48,7 @@ def get_coordinates(postal_code: str) -> tuple[float | None, float | None]:
     print(f"Searching coordinates for postal: {postal_code}...", end=" ")
 
     try:
-        response = requests.get(ONEMAP_SEARCH_URL, params=params, headers=headers)
+        response = await http_client.get(ONEMAP_SEARCH_URL, params=params, headers=headers)
         response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
         data = response.json()
 
@@ -55,13 +62,13 @@ def get_coordinates(postal_code: str) -> tuple[float | None, float | None]:
             print("NOT FOUND")
             return None, None
             
-    except requests.exceptions.HTTPError as errh:
+    except httpx.HTTPStatusError as errh:
         print(f"\nHTTP Error for {postal_code}: {errh}")
-    except requests.exceptions.ConnectionError as errc:
+    except httpx.ConnectError as errc:
         print(f"\nConnection Error for {postal_code}: {errc}")
-    except requests.exceptions.Timeout as errt:
+    except httpx.TimeoutException as errt:
         print(f"\nTimeout Error for {postal_code}: {errt}")
-    except requests.exceptions.RequestException as err:
+    except httpx.HTTPError as err:
         print(f"\nAn unexpected Error occurred: {err}")
     except ValueError:
         print("\nError: Could not parse LATITUDE/LONGITUDE as float.")
@@ -69,7 +76,7 @@ def get_coordinates(postal_code: str) -> tuple[float | None, float | None]:
     return None, None
 
 
-def main():
+async def main():
     """
     Main function to orchestrate the loading, geocoding, and saving process.
     """
@@ -94,7 +101,7 @@ def main():
         postal_code = item.get("postal")
         
         if postal_code:
-            lat, lon = get_coordinates(postal_code)
+            lat, lon = await get_coordinates(postal_code)
             
             # Add coordinates to the item
             item["latitude"] = lat
@@ -107,7 +114,7 @@ def main():
         enriched_data.append(item)
         
         # ⚠️ API courtesy: Introduce a small delay to avoid hitting rate limits.
-        time.sleep(0.2) 
+        await asyncio.sleep(0.2) 
 
     # Save the enriched data to the new JSON file
     print(f"\nSaving {len(enriched_data)} items to {OUTPUT_FILE}...")
@@ -116,7 +123,8 @@ def main():
         json.dump(enriched_data, f, indent=2)
 
     print(f"Process complete. Data saved successfully to {OUTPUT_FILE}.")
+    await http_client.aclose()
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,10 +1,11 @@
 import os
 import sys
 import json
+import time
+from typing import Callable, Optional
 from sqlalchemy.orm import Session
 import pandas as pd
-from sqlalchemy import select
-from app.controllers.business_controller import get_password_hash
+from sqlalchemy import insert, select
 
 # ----------------------------------------------------
 # Pathing to allow model imports
@@ -19,11 +20,16 @@ sys.path.append(PROJECT_ROOT)
 
 # Import necessary models
 from app.models.hawker_centre_model import HawkerCentre
-from app.models.business_model import Business, StallStatus
+from app.models.business_model import Business, CuisineType, StallStatus
 from app.models.operating_hour_model import OperatingHour
 from app.models.menu_item_model import MenuItem
+from app.models.user_model import User
 
 DEFAULT_BUSINESS_PHOTO = "default-placeholder.jpg"
+BUSINESS_PHOTO_URL = "http://localhost:8001/static/business/{}"
+
+# Rows per INSERT batch. Also bounds the IN (...) list used to read back user ids.
+SEED_BATCH_SIZE = 2000
 
 
 BUSINESS_PHOTO_MAP = {
@@ -119,10 +125,107 @@ def format_address(row):
 
     return address if address else "N/A"
 
-def seed_sfa_data_if_empty(db: Session, index_file_path: str):
+def _load_hawker_centres(csv_path: str) -> pd.DataFrame:
+    """Reads hawker_centres.csv into rows ready for the hawker_centres table."""
+    hawker_df = pd.read_csv(csv_path)
+    hawker_df = hawker_df.dropna(subset=['Name']).drop_duplicates(subset=['Name'])
+
+    return pd.DataFrame({
+        'name': hawker_df['Name'],
+        'address': hawker_df.apply(format_address, axis=1),
+        'description': hawker_df['Description'].fillna(''),
+        'image': hawker_df['PhotoURL'].fillna(''),
+        'latitude': hawker_df['Latitude'],
+        'longitude': hawker_df['Longitude'],
+        'rating': 0.0,
+    })
+
+def _load_stalls(merged_csv_path: str, index_data: list) -> pd.DataFrame:
+    """
+    Reads every SFA stall from the combined merged_results.csv in one pass.
+    Stalls are attributed to the hawker centre named in index.json for their
+    postal code, exactly as the per-centre xlsx files were.
+    """
+    df = pd.read_csv(merged_csv_path, dtype=str)
+
+    centre_by_postal = {
+        entry['postal']: entry['hawker_centre']
+        for entry in index_data
+        if entry.get('postal') and entry.get('hawker_centre')
+    }
+    df['hawker_centre'] = df['Postal Code'].map(centre_by_postal)
+    df['license_number'] = df['Licence Number'].str.strip()
+
+    df = df[df['hawker_centre'].notna() & df['license_number'].fillna('').ne('')]
+    df = df.drop_duplicates(subset=['license_number'], keep='first')
+
+    stalls = pd.DataFrame({
+        'license_number': df['license_number'],
+        'stall_name': df['Business Name'],
+        'licensee_name': df['Licensee Name'],
+        'establishment_address': df['Establishment Address'],
+        'postal_code': df['Postal Code'],
+        'hawker_centre': df['hawker_centre'],
+    })
+    stalls['photo'] = (
+        stalls['stall_name'].map(BUSINESS_PHOTO_MAP).fillna(DEFAULT_BUSINESS_PHOTO).map(BUSINESS_PHOTO_URL.format)
+    )
+    # NaN -> None so missing values are stored as NULL
+    return stalls.astype(object).where(stalls.notna(), None)
+
+def _insert_stalls(db: Session, stalls: pd.DataFrame, on_progress: Optional[Callable[[str, int, int], None]] = None) -> None:
+    """
+    Bulk inserts stalls into the joined users/businesses tables, one executemany
+    per table per batch, reading the generated user ids back by email.
+    """
+    records = stalls.to_dict('records')
+    for start in range(0, len(records), SEED_BATCH_SIZE):
+        batch = records[start:start + SEED_BATCH_SIZE]
+        for row in batch:
+            row['email'] = f"sfa_placeholder_{row['license_number']}@example.com"
+
+        db.execute(insert(User.__table__), [
+            {
+                'email': row['email'],
+                'hashed_password': "placeholder",
+                'username': "",
+                'user_type': "business",
+            }
+            for row in batch
+        ])
+        user_ids = dict(db.execute(
+            select(User.email, User.id).where(User.email.in_([row['email'] for row in batch]))
+        ).all())
+
+        db.execute(insert(Business.__table__), [
+            {
+                'id': user_ids[row['email']],
+                'license_number': row['license_number'],
+                'stall_name': row['stall_name'],
+                'licensee_name': row['licensee_name'],
+                'establishment_address': row['establishment_address'],
+                'postal_code': row['postal_code'],
+                'hawker_centre': row['hawker_centre'],
+                'cuisine_type': CuisineType.others,
+                'description': "",
+                'photo': row['photo'],
+                'status': StallStatus.OPEN,
+                # Can consider adding a new field such that only the real owner of the business claim the hawker stall when signing up
+                # All stalls in every hawker centre are preloaded but can't be edited till it is claimed
+                # is_claimed = false
+            }
+            for row in batch
+        ])
+        if on_progress:
+            on_progress("stalls", start + len(batch), len(records))
+
+def seed_sfa_data_if_empty(db: Session, index_file_path: str, on_progress: Optional[Callable[[str, int, int], None]] = None):
     """
     Checks if the HawkerCentre table is empty. If so, seeds SFA data
-    from hawker_centres.csv first, then processes individual stall files.
+    from hawker_centres.csv first, then bulk inserts every stall from
+    SFA-Scrape/merged_results.csv.
+
+    on_progress(phase, done, total) is called as each phase advances.
     """
     
     # 1. Check if the database has already been seeded (using the session's state)
@@ -135,43 +238,27 @@ def seed_sfa_data_if_empty(db: Session, index_file_path: str):
     SFA_DIR = os.path.dirname(index_file_path)
     
     HAWKER_CENTRES_CSV_PATH = os.path.join(SFA_DIR, 'SFA-Scrape', 'hawker_centres.csv')
+    MERGED_RESULTS_CSV_PATH = os.path.join(SFA_DIR, 'SFA-Scrape', 'merged_results.csv')
     
     # Use manual db.commit() and db.rollback()
     try:
         # --- PHASE 1: SEED HAWKER CENTRE DATA ---
         print("\n--- Phase 1: Seeding Hawker Centre Master Data ---")
+        if on_progress:
+            on_progress("hawker_centres", 0, 0)
         try:
-            hawker_df = pd.read_csv(HAWKER_CENTRES_CSV_PATH)
+            hawker_rows = _load_hawker_centres(HAWKER_CENTRES_CSV_PATH)
         except FileNotFoundError:
             print(f"FATAL ERROR: Hawker Centres CSV file not found at {HAWKER_CENTRES_CSV_PATH}. Aborting seeding.")
             return
 
-        for _, row in hawker_df.iterrows():
-            hawker_centre_name = row.get('Name')
-            if not hawker_centre_name: continue
-            
-            # Find or Create HawkerCentre record
-            hawker_centre = db.scalar(
-                select(HawkerCentre).where(HawkerCentre.name == hawker_centre_name)
-            )
-            
-            if not hawker_centre:
-                full_address = format_address(row)
-                
-                hawker_centre = HawkerCentre(
-                    name=hawker_centre_name,
-                    address=full_address,
-                    description=row.get('Description', ''),
-                    image=row.get('PhotoURL', ''),
-                    latitude=row.get('Latitude'),
-                    longitude=row.get('Longitude'),
-                    rating=0.0 # Initialize rating
-                )
-                db.add(hawker_centre)
-                print(f"  Added Hawker Centre: {hawker_centre_name}")
+        existing_names = set(db.scalars(select(HawkerCentre.name)))
+        hawker_rows = hawker_rows[~hawker_rows['name'].isin(existing_names)]
+        if not hawker_rows.empty:
+            db.execute(insert(HawkerCentre.__table__), hawker_rows.to_dict('records'))
+        print(f"  Added {len(hawker_rows)} Hawker Centres.")
 
         # Commit Phase 1 data before starting Phase 2, in case of interruption
-        db.flush() 
         db.commit()
 
 
@@ -189,81 +276,23 @@ def seed_sfa_data_if_empty(db: Session, index_file_path: str):
             print(f"FATAL ERROR: Failed to read or parse index.json: {e}. Aborting seeding.")
             return
 
-        for entry in index_data:
-            hawker_centre_name = entry.get('hawker_centre')
-            file_path_relative_to_SFA = entry.get('file')
-            
-            if not hawker_centre_name or not file_path_relative_to_SFA:
-                print(f"Skipping malformed entry in index: {entry}")
-                continue
-                
-            print(f"  Processing Business Stalls for: {hawker_centre_name}")
+        started = time.perf_counter()
+        try:
+            stalls = _load_stalls(MERGED_RESULTS_CSV_PATH, index_data)
+        except FileNotFoundError:
+            print(f"FATAL ERROR: Stall CSV file not found at {MERGED_RESULTS_CSV_PATH}. Aborting seeding.")
+            return
+
+        # One query for all existing licences instead of a SELECT per row
+        existing_licences = set(db.scalars(select(Business.license_number)))
+        stalls = stalls[~stalls['license_number'].isin(existing_licences)]
+
+        _insert_stalls(db, stalls, on_progress)
 
-            excel_file_path = os.path.join(SFA_DIR, file_path_relative_to_SFA)
-            
-            try:
-                df = pd.read_excel(excel_file_path)
-            except FileNotFoundError:
-                print(f"  Skipping: Excel file not found at {excel_file_path}")
-                continue
-            except Exception as e:
-                print(f"  Skipping: Error reading Excel file {excel_file_path}: {e}")
-                continue
-                
-            # Retrieve the HawkerCentre object created in Phase 1
-            hawker_centre_obj = db.scalar(
-                select(HawkerCentre).where(HawkerCentre.name == hawker_centre_name)
-            )
-            
-            # if not hawker_centre_obj:
-            #     print(f"  FATAL: Hawker Centre '{hawker_centre_name}' not found from CSV data. Skipping stalls.")
-            #     continue
-
-            # Seed Business (Stall) records
-            for _, row in df.iterrows():
-                license_no = str(row.get('Licence Number', row.get('license_number', row.get('License_No', '')))).strip() 
-                if not license_no: continue
-
-                existing_business = db.scalar(
-                    select(Business).where(Business.license_number == license_no)
-                )
-                if existing_business:
-                    continue
-                
-                new_business_stall = Business(
-                    email=f"sfa_placeholder_{license_no}@example.com",
-                    hashed_password="placeholder",
-                    user_type="business",
-                    username="",
-                    
-                    license_number=license_no,
-                    stall_name=row.get('Business Name', row.get('Stall_Name', row.get('stall_name'))),
-                    licensee_name=row.get('Licensee Name', row.get('Licensee_Name', row.get('licensee_name'))),
-                    establishment_address=row.get('Establishment Address', row.get('Establishment_Address', row.get('establishment_address'))),
-                    postal_code=row.get('Postal Code', row.get('Postal_Code', row.get('postal_code'))),
-                    hawker_centre=hawker_centre_name,
-
-                    cuisine_type="Others",
-                    description="",
-                    photo="",
-                    status=StallStatus.OPEN
-
-                    # Can consider adding a new field such that only the real owner of the business claim the hawker stall when signing up
-                    # All stalls in every hawker centre are preloaded but can't be edited till it is claimed
-                    # is_claimed = false
-                )
-
-                filename = BUSINESS_PHOTO_MAP.get(new_business_stall.stall_name)
-                if filename:
-                    new_business_stall.photo = f"http://localhost:8001/static/business/{filename}"
-                else:
-                    new_business_stall.photo = f"http://localhost:8001/static/business/{DEFAULT_BUSINESS_PHOTO}"
-
-                db.add(new_business_stall)
         # # seed test business account
         # new_business_stall = Business(
         #     email="business@test.com",
-        #     hashed_password=get_password_hash("12345"),
+        #     hashed_password=pwd_context.hash("12345"),
         #     user_type="business",
         #     username="",
             
@@ -283,6 +312,9 @@ def seed_sfa_data_if_empty(db: Session, index_file_path: str):
         
         # Commit all changes to the database
         db.commit()
+        elapsed = time.perf_counter() - started
+        rate = len(stalls) / elapsed if elapsed > 0 else float('inf')
+        print(f"  Seeded {len(stalls)} stalls in {elapsed:.2f}s ({rate:,.0f} rows/sec).")
         print("SFA data seeding complete.")
         
     except Exception as e:
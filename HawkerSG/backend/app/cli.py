@@ -0,0 +1,103 @@
+"""
+Maintenance commands for the HawkerSG backend.
+
+Run from the backend folder:
+    python -m app.cli migrate
+    python -m app.cli seed
+    python -m app.cli fetch-planning-areas
+    python -m app.cli rebuild-review-aggregates
+    python -m app.cli build-image-variants
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from app.database import SessionLocal
+from app.main import create_db_and_tables
+from app.services import image_variants, planning_area, review_aggregates, seeding
+from app.utils import http_client
+
+def migrate(args):
+    """Creates missing tables and indexes on the configured database."""
+    create_db_and_tables()
+    print("Database schema is up to date.")
+
+def seed(args):
+    """Creates the schema and loads SFA data if the database is empty."""
+    seeding.run_seed()
+    print("Database is seeded.")
+
+def rebuild_review_aggregates(args):
+    """Recomputes review_aggregates from the reviews table."""
+    create_db_and_tables()
+    db = SessionLocal()
+    try:
+        count = review_aggregates.rebuild(db)
+        print(f"Rebuilt review aggregates for {count} targets.")
+    finally:
+        db.close()
+
+async def _download_planning_areas(dataset: str, url: str) -> dict:
+    try:
+        if not url:
+            poll = await http_client.get(planning_area.DATA_GOV_DOWNLOAD_URL.format(dataset))
+            poll.raise_for_status()
+            url = poll.json()["data"]["url"]
+
+        response = await http_client.get(url, timeout=120)
+        response.raise_for_status()
+        return response.json()
+    finally:
+        await http_client.aclose()
+
+def fetch_planning_areas(args):
+    """Downloads URA planning-area polygons and writes the compact GeoJSON used by /hawkers/planning-area."""
+    compact = planning_area.compact_geojson(asyncio.run(_download_planning_areas(args.dataset, args.url)))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(compact, f, separators=(",", ":"))
+    print(f"Wrote {len(compact['features'])} planning areas to {args.output}.")
+
+def build_image_variants(args):
+    """Creates thumbnail/medium/WebP variants for photos uploaded before variants existed."""
+    kinds = list(image_variants.PHOTO_DIRS) if args.kind == "all" else [args.kind]
+    for kind in kinds:
+        count = image_variants.backfill(kind, force=args.force)
+        print(f"Built image variants for {count} {kind} photos.")
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="HawkerSG maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser(
+        "migrate", help="Create missing tables and indexes on an existing database"
+    ).set_defaults(func=migrate)
+    subparsers.add_parser(
+        "seed", help="Create tables and load SFA hawker centre/stall data if the database is empty"
+    ).set_defaults(func=seed)
+    subparsers.add_parser(
+        "rebuild-review-aggregates", help="Recompute rating totals from the reviews table"
+    ).set_defaults(func=rebuild_review_aggregates)
+
+    fetch = subparsers.add_parser(
+        "fetch-planning-areas", help="Download URA planning-area polygons for local planning-area lookups"
+    )
+    fetch.add_argument("--dataset", default=planning_area.DATA_GOV_DATASET_ID, help="data.gov.sg dataset id")
+    fetch.add_argument("--url", help="download GeoJSON from this URL instead of data.gov.sg")
+    fetch.add_argument("--output", default=planning_area.PLANNING_AREAS_PATH)
+    fetch.set_defaults(func=fetch_planning_areas)
+
+    variants = subparsers.add_parser(
+        "build-image-variants", help="Generate thumbnail/medium/WebP variants for existing photos"
+    )
+    variants.add_argument("--kind", default="business", choices=[*image_variants.PHOTO_DIRS, "all"])
+    variants.add_argument("--force", action="store_true", help="regenerate variants that are already up to date")
+    variants.set_defaults(func=build_image_variants)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
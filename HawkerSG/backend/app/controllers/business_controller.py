@@ -1,34 +1,37 @@
 import os
 import base64
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from fastapi import UploadFile, HTTPException, status
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 from app.schemas.business_schema import BusinessCreate, BusinessUpdate, OperatingHourIn, MenuItemIn, MenuItemPatch
 from app.models.business_model import Business, StallStatus
 from app.models.operating_hour_model import OperatingHour
 from app.models.menu_item_model import MenuItem
+from app.services import photo_store, schedule_index, search_index
+from app.utils import password_utils
 
 # Static directory for business photos
 STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "businessPhotos")
-MENU_IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "menuPhotos")
 
 # Configuration for file validation
 MAX_FILE_SIZE_BYTES = 20 * 1024 * 1024  # 20MB per spec
 ALLOWED_MIME_TYPES = ["image/jpeg", "image/png", "image/webp"]
 
-# Define the password hashing context (same as consumer)
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-
 # --- Hashing Functions (reuse from consumer pattern) ---
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Hashes a plaintext password using Argon2."""
-    return pwd_context.hash(password)
+    return await password_utils.hash_password(password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifies a plaintext password against a stored hash. Returns (valid, new_hash_if_outdated)."""
+    return await password_utils.verify_password(plain_password, hashed_password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifies a plaintext password against a stored hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+def update_password_hash(db: Session, user: Business, new_hash: str) -> None:
+    """Stores a rehashed password (Argon2 parameters changed since it was hashed)."""
+    user.hashed_password = new_hash
+    db.commit()
 
 # --- DB Interaction Functions ---
 def get_user_by_email(db: Session, email: str) -> Optional[Business]:
@@ -41,8 +44,8 @@ def get_business_by_license(db: Session, license_number: str) -> Optional[Busine
     db.commit()
     return business
 
-def create_business(db: Session, business: BusinessCreate) -> Business:
-    """The core business logic for signing up a new Business Owner."""
+def create_business(db: Session, business: BusinessCreate, hashed_password: str) -> Business:
+    """The core business logic for signing up a new Business Owner. The password is hashed beforehand."""
     
     # Check if license_number already exists
     existing = get_business_by_license(db, business.license_number)
@@ -52,8 +55,6 @@ def create_business(db: Session, business: BusinessCreate) -> Business:
             detail="License number already registered"
         )
     
-    hashed_password = get_password_hash(business.password)
-    
     # Create the Business DB model instance
     db_business = Business(
         email=business.email,
@@ -75,6 +76,7 @@ def create_business(db: Session, business: BusinessCreate) -> Business:
     db.add(db_business)
     db.commit()
     db.refresh(db_business)
+    search_index.index_stall(db, db_business.license_number)
     return db_business
 
 async def update_business_profile(
@@ -117,6 +119,7 @@ async def update_business_profile(
     #     db_business.photo = photo_filename
     
     # CHANGE: Handle profile photo upload if provided (UploadFile)
+    old_filename = None
     if photo is not None and photo.filename:
         # Check if the photo is actually an empty file (may happen with form-data)
         if photo.content_type is None:
@@ -127,24 +130,19 @@ async def update_business_profile(
             old_filename = db_business.photo
             
             # 2. Save the new file and get the new filename
-            new_filename = await save_business_photo(db_business.license_number, photo)
+            new_filename = await save_business_photo(photo)
             
-            # 3. Delete the old file if it exists and is different from the new one
-            if old_filename and old_filename != new_filename:
-                old_file_path = os.path.join(STATIC_DIR, old_filename)
-            try:
-                if os.path.exists(old_file_path):
-                    os.remove(old_file_path)
-            except OSError as e:
-                # Log the error but allow the profile update to continue
-                print(f"Warning: Failed to delete old photo {old_file_path}. Error: {e}")
-                pass
-            
-            # 4. Update the DB model
+            # 3. Update the DB model
             db_business.photo = new_filename
     
     db.commit()
     db.refresh(db_business)
+    search_index.index_stall(db, db_business.license_number)
+
+    # 4. Once committed, drop the old photo's reference. The store deletes the file
+    # only when nothing else uses it (re-uploading the same image keeps it)
+    if old_filename:
+        await photo_store.release_async("business", old_filename)
     return db_business
 
 async def save_business_photo_base64(license_number: str, base64_data: str) -> str:
@@ -197,43 +195,12 @@ async def save_business_photo_base64(license_number: str, base64_data: str) -> s
             detail=f"Failed to save photo: {e}"
         )
 
-async def save_business_photo(license_number: str, photo: UploadFile) -> str:
+async def save_business_photo(photo: UploadFile) -> str:
     """Validate and save business photo, return filename."""
     
-    # Check file type
-    if photo.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file type. Only JPEG, PNG, and WebP images are allowed."
-        )
-    
-    # Check file size
-    file_content = await photo.read()
-    if len(file_content) > MAX_FILE_SIZE_BYTES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds the maximum limit of 20MB."
-        )
-    
-    # Generate filename
-    file_extension = photo.filename.split('.')[-1]
-    new_filename = f"business_{license_number}_{int(datetime.now().timestamp())}.{file_extension}"
-    file_path = os.path.join(STATIC_DIR, new_filename)
-    
-    # Ensure directory exists
-    os.makedirs(STATIC_DIR, exist_ok=True)
-    
-    # Save file
-    try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save photo: {e}"
-        )
-    
-    return new_filename
+    # Streamed to disk with size cap and stored under its content hash;
+    # type checked from the file's magic bytes
+    return await photo_store.save(photo, "business", MAX_FILE_SIZE_BYTES, ALLOWED_MIME_TYPES)
 
 def set_operating_hours(
     db: Session, 
@@ -282,63 +249,21 @@ def set_operating_hours(
             db_hours.append(db_hour)
     
     db.commit()
+    schedule_index.invalidate()
 
     return db_hours
 
 
 # New Helper Function: Save Menu Item Photo
-async def save_menu_item_photo(license_number: str, item_id: str, photo: UploadFile) -> str:
+async def save_menu_item_photo(photo: UploadFile) -> str:
     """Validate and save menu item photo, return filename."""
     
-    # Check file type
-    if photo.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file type. Only JPEG, PNG, and WebP images are allowed."
-        )
-    
-    # Check file size (Read content once)
-    file_content = await photo.read()
-    if len(file_content) > MAX_FILE_SIZE_BYTES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds the maximum limit of 20MB."
-        )
-    
-    # Generate filename (using license_number and item_id for uniqueness)
-    # Note: item_id is a unique database ID after the initial save
-    file_extension = photo.filename.split('.')[-1]
-    new_filename = f"menu_{license_number}_{item_id}_{int(datetime.now().timestamp())}.{file_extension}"
-    file_path = os.path.join(MENU_IMAGE_DIR, new_filename)
-    
-    # Save file
-    try:
-        # We need to seek back to the beginning of the file content for writing
-        # since photo.read() consumed it.
-        # Alternatively, we can use the original photo.file stream logic:
-        # photo.file.seek(0) # Not necessary if using file_content saved above
-        
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save menu photo: {e}"
-        )
-    
-    # Return the filename for database storage
-    return new_filename
+    # Filename is the content hash, so the same dish photo is stored once
+    return await photo_store.save(photo, "menu", MAX_FILE_SIZE_BYTES, ALLOWED_MIME_TYPES)
 
 def delete_menu_item_photo(filename: str):
-    """Deletes a menu item photo from the filesystem."""
-    if filename:
-        file_path = os.path.join(MENU_IMAGE_DIR, filename)
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except OSError as e:
-            print(f"Warning: Failed to delete menu photo {file_path}. Error: {e}")
-            pass
+    """Drops a menu item's reference to its photo; the file goes once nothing uses it."""
+    photo_store.release("menu", filename)
 
 
 async def add_menu_item(
@@ -377,16 +302,13 @@ async def add_menu_item(
     
     image_filename = ""
     if image is not None and image.filename:
-        image_filename = await save_menu_item_photo(
-            db_business.license_number, 
-            str(db_menu_item.id), # Use the new ID for the filename
-            image
-        )
+        image_filename = await save_menu_item_photo(image)
         
         db_menu_item.photo = image_filename
         db.commit()
         db.refresh(db_menu_item)
 
+    search_index.index_stall(db, db_business.license_number)
     return db_menu_item
 
 async def update_menu_item(
@@ -425,23 +347,18 @@ async def update_menu_item(
         return None
     
     old_image_filename = db_item.photo
+    released_image = None
     
     if new_image is not None and new_image.filename:
         # Save new photo
-        new_filename = await save_menu_item_photo(
-            db_business.license_number, 
-            str(db_item.id), 
-            new_image
-        )
+        new_filename = await save_menu_item_photo(new_image)
         db_item.photo = new_filename
-        
-        # Delete old photo
-        delete_menu_item_photo(old_image_filename)
+        released_image = old_image_filename
         
     elif remove_current_image and old_image_filename:
         # Remove photo without replacing
-        delete_menu_item_photo(old_image_filename)
         db_item.photo = ""
+        released_image = old_image_filename
 
     if menu_item.name is not None:
         db_item.name = menu_item.name
@@ -452,6 +369,12 @@ async def update_menu_item(
     
     db.commit()
     db.refresh(db_item)
+    search_index.index_stall(db, db_business.license_number)
+
+    # Release the old photo only after the item stops pointing at it. If the same
+    # image was uploaded again this just drops the extra reference the upload took
+    if released_image:
+        await run_in_threadpool(delete_menu_item_photo, released_image)
     return db_item
 
 def delete_menu_item(
@@ -492,6 +415,7 @@ def delete_menu_item(
     db.commit()
     
     if result > 0:
+        search_index.index_stall(db, db_business.license_number)
         delete_menu_item_photo(old_image_filename)
         
     return result > 0
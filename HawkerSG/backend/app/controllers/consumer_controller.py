@@ -1,14 +1,16 @@
 import os
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 from app.utils.email_utils import generate_reset_token, get_token_expiration, send_password_reset_email
 from app.schemas.consumer_schema import ConsumerCreate
 from app.schemas.user_schema import PasswordResetRequest, PasswordResetData
 from app.models.consumer_model import Consumer
 from app.models.user_model import User as DBUser
+from app.utils import password_utils
+from app.services import photo_store
+from app.services.consumer_lookup import consumer_by_id
 
 STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "profilePhotos")
 
@@ -16,17 +18,19 @@ STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets",
 MAX_FILE_SIZE_BYTES = 2 * 1024 * 1024  
 ALLOWED_MIME_TYPES = ["image/jpeg", "image/png", "image/webp"]
 
-# Define the password hashing context
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-
-# --- Hashing Functions ---
-def get_password_hash(password: str) -> str:
+# --- Hashing Functions (Argon2 on the password hashing pool; 429 when it is full) ---
+async def get_password_hash(password: str) -> str:
     """Hashes a plaintext password using Argon2."""
-    return pwd_context.hash(password)
+    return await password_utils.hash_password(password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifies a plaintext password against a stored hash. Returns (valid, new_hash_if_outdated)."""
+    return await password_utils.verify_password(plain_password, hashed_password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifies a plaintext password against a stored hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+def update_password_hash(db: Session, user: DBUser, new_hash: str) -> None:
+    """Stores a rehashed password (Argon2 parameters changed since it was hashed)."""
+    user.hashed_password = new_hash
+    db.commit()
 
 # --- DB Interaction Functions ---
 def get_user_by_email(db: Session, email: str) -> Optional[DBUser]:
@@ -34,10 +38,8 @@ def get_user_by_email(db: Session, email: str) -> Optional[DBUser]:
     # Query the base User class 
     return db.query(DBUser).filter(DBUser.email == email.lower()).first() 
 
-def create_user(db: Session, user: ConsumerCreate) -> Consumer:
-    """The core business logic for signing up a new Consumer."""
-
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: ConsumerCreate, hashed_password: str) -> Consumer:
+    """The core business logic for signing up a new Consumer. The password is hashed beforehand."""
 
     # Create the Consumer DB model instance
     db_user = Consumer( 
@@ -55,7 +57,7 @@ def create_user(db: Session, user: ConsumerCreate) -> Consumer:
     return db_user
 
 def add_recent_search(db: Session, consumer_id: int, new_term: str):
-    consumer = db.query(Consumer).filter(Consumer.id == consumer_id).first()
+    consumer = db.scalar(consumer_by_id(consumer_id))
     if not consumer:
         return None
 
@@ -98,11 +100,9 @@ def handle_password_reset_request(db: Session, request: PasswordResetRequest) ->
     # Always return True for security reasons
     return True
 
-def handle_password_reset(db: Session, data: PasswordResetData) -> None:
-    """
-    Verifies the token, checks expiration, and updates the user's password.
-    """
-    user = db.query(DBUser).filter(DBUser.reset_token == data.token).first()
+def validate_reset_token(db: Session, token: str) -> DBUser:
+    """Returns the user a password reset token belongs to; 400 if it is unknown or expired."""
+    user = db.query(DBUser).filter(DBUser.reset_token == token).first()
 
     # 1. Token Existence Check
     if not user:
@@ -121,13 +121,16 @@ def handle_password_reset(db: Session, data: PasswordResetData) -> None:
             status_code=400, 
             detail="Password reset token has expired. Please request a new one."
         )
+    return user
 
-    # 3. Hash and Update Password
-    try:
-        hashed_password = pwd_context.hash(data.new_password)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to hash password: {e}")
+def handle_password_reset(db: Session, data: PasswordResetData, hashed_password: str) -> None:
+    """
+    Verifies the token, checks expiration, and updates the user's password
+    to `hashed_password` (data.new_password, hashed beforehand).
+    """
+    user = validate_reset_token(db, data.token)
 
+    # 3. Update Password
     user.hashed_password = hashed_password
     
     # 4. Invalidate the token after successful use
@@ -145,12 +148,20 @@ async def update_consumer_profile(
 ) -> dict:
     """Updates the consumer's username, password, and/or profile picture."""
     
+    # Hash any new password before querying, so no pooled connection is held while Argon2 runs
+    new_hashed_password = None
+    if password:
+        if len(password) < 8:
+             raise HTTPException(status_code=400, detail="New password must be at least 8 characters.")
+        new_hashed_password = await get_password_hash(password)
+
     user = db.query(DBUser).filter(DBUser.id == user_id).first()
     if not user:
         # This shouldn't happen if JWT is valid, but is a safe guard
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
 
     consumer_data = {} # Used to track changes and build the response
+    old_filename = None
 
     # 1. Update Username
     if username is not None and username.strip():
@@ -160,53 +171,24 @@ async def update_consumer_profile(
         consumer_data['username'] = user.username 
 
     # 2. Update Password
-    if password:
-        if len(password) < 8:
-             raise HTTPException(status_code=400, detail="New password must be at least 8 characters.")
-        user.hashed_password = get_password_hash(password)
+    if new_hashed_password:
+        user.hashed_password = new_hashed_password
         consumer_data['password_updated'] = True 
 
     # 3. Handle Profile Picture Upload and Validation
     if profile_pic and profile_pic.filename:
-        # FastAPI's UploadFile is an instance of Starlette's UploadFile
-        
-        # 3a. Check File Type (MIME Type)
-        if profile_pic.content_type not in ALLOWED_MIME_TYPES:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid file type. Only JPEG, PNG, and WebP images are allowed."
-            )
-            
-        # 3b. Check File Size (Reading the first 1MB is needed to confirm size before full upload)        
-        # Read the entire file content into a byte buffer for size check
-        file_content = await profile_pic.read()
-        
-        if len(file_content) > MAX_FILE_SIZE_BYTES:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File size exceeds the maximum limit of 1MB."
-            )
-
-        # 3c. Rewind the file pointer for saving
-        await profile_pic.seek(0)
-
         # --- Capture old filename before update ---
         old_filename = user.profile_pic
         
-        # 3d. Proceed with saving the file 
-        file_extension = profile_pic.filename.split('.')[-1]
-        new_filename = f"user_{user_id}_{int(datetime.now().timestamp())}.{file_extension}"
-        file_path = f"{STATIC_DIR}/{new_filename}"
-
-        os.makedirs(STATIC_DIR, exist_ok=True)
-        
+        # 3a. Stream the file to disk under its content hash: size capped as it is read,
+        # type checked from its magic bytes
         try:
-            # Re-read the file content into the buffer (since it was consumed by the size check)
-            # Alternatively, if you did not use .read() above, you'd use shutil.copyfileobj directly.
-            # Since we used .read() above, we must use the content we already read.
-            with open(file_path, "wb") as buffer:
-                 buffer.write(file_content) # Write the pre-read content
-                 
+            new_filename = await photo_store.save(
+                profile_pic, "profiles", MAX_FILE_SIZE_BYTES, ALLOWED_MIME_TYPES
+            )
+        except HTTPException:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback() 
             raise HTTPException(
@@ -214,24 +196,6 @@ async def update_consumer_profile(
                 detail=f"Failed to save profile picture: {e}"
             )
         
-        # --- Delete the old profile picture file if it exists (BEFORE model update) ---
-        # Checks if old_filename is not None/null AND ensures we don't delete the new file
-        if old_filename and old_filename != new_filename:
-            old_file_path = os.path.join(STATIC_DIR, old_filename)
-            try:
-                # Check if file exists before attempting to remove
-                if os.path.exists(old_file_path):
-                    os.remove(old_file_path)
-                    consumer_data['old_profile_pic_deleted'] = True
-                else:
-                    # Log: Old profile picture file not found on disk, but DB entry existed.
-                    consumer_data['old_profile_pic_not_found'] = True
-
-            except OSError as e:
-                # Log an error if deletion fails (e.g., permissions issue), 
-                # but allow the DB commit to proceed since the new file is saved.
-                consumer_data['old_profile_pic_deletion_failed'] = f"OS Error: {e.strerror}"
-
         # Update the model
         user.profile_pic = new_filename
         consumer_data['profile_pic'] = new_filename
@@ -245,6 +209,11 @@ async def update_consumer_profile(
 
     db.commit()
     db.refresh(user)
+
+    # The old picture is released once the user no longer points at it; the store
+    # deletes the file when nothing else uses it
+    if old_filename:
+        await photo_store.release_async("profiles", old_filename)
     
     # Return the full updated user object (matches ConsumerOut schema structure)
     return {
@@ -1,14 +1,15 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import exists, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, delete, exists, insert, or_, select
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from typing import List, Dict
-from app.models.consumer_model import Consumer
+from typing import Iterable, List, Dict, Set, Tuple
 from app.models.favourite_model import Favourite
-from app.schemas.favourite_schema import FavouriteIn, FavouriteOut, TargetType
+from app.schemas.favourite_schema import FavouriteBatchCheckIn, FavouriteBatchIn, FavouriteIn, FavouriteOut, TargetType
+from app.services.consumer_lookup import consumer_exists
 
-def _ensure_consumer(db: Session, consumer_id: int):
+async def _ensure_consumer(db: AsyncSession, consumer_id: int):
     """Checks if the consumer exists, raising 404 if not."""
-    if not db.query(Consumer).filter(Consumer.id == consumer_id).first():
+    if not await db.scalar(consumer_exists(consumer_id)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consumer not found")
 
 def _get_favourite_query_filters(consumer_id: int, target_type: TargetType, target_id: int):
@@ -17,31 +18,43 @@ def _get_favourite_query_filters(consumer_id: int, target_type: TargetType, targ
            Favourite.target_type == target_type, \
            Favourite.target_id == target_id
 
-def _is_favourite(db: Session, consumer_id: int, target_type: TargetType, target_id: int) -> bool:
+async def _is_favourite(db: AsyncSession, consumer_id: int, target_type: TargetType, target_id: int) -> bool:
     """Checks if a specific target is already favourited by the consumer."""
     q = _get_favourite_query_filters(consumer_id, target_type, target_id)
-    return db.query(exists().where(and_(*q))).scalar()
+    return await db.scalar(select(exists().where(and_(*q))))
 
-def add_favourite(db: Session, consumer_id: int, payload: FavouriteIn) -> Dict:
-    _ensure_consumer(db, consumer_id)
-    
-    if _is_favourite(db, consumer_id, payload.target_type, payload.target_id):
-        return {
-            "status": "ok",
-            "action": "exists",
-            "consumer_id": consumer_id,
-            "target_type": payload.target_type,
-            "target_id": payload.target_id,
-        }
-    
-    new_fav = Favourite(
+def _exists_response(consumer_id: int, payload: FavouriteIn) -> Dict:
+    return {
+        "status": "ok",
+        "action": "exists",
+        "consumer_id": consumer_id,
+        "target_type": payload.target_type,
+        "target_id": payload.target_id,
+    }
+
+async def _insert_favourite(db: AsyncSession, consumer_id: int, payload: FavouriteIn) -> bool:
+    """
+    Adds the favourite and commits. Returns False if a concurrent request added it
+    since our check (the unique index rejects the second row).
+    """
+    db.add(Favourite(
         consumer_id=consumer_id,
         target_type=payload.target_type,
         target_id=payload.target_id,
-    )
-    db.add(new_fav)
-    db.commit()
-    db.refresh(new_fav)
+    ))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return False
+    return True
+
+async def add_favourite(db: AsyncSession, consumer_id: int, payload: FavouriteIn) -> Dict:
+    await _ensure_consumer(db, consumer_id)
+    
+    if (await _is_favourite(db, consumer_id, payload.target_type, payload.target_id)
+            or not await _insert_favourite(db, consumer_id, payload)):
+        return _exists_response(consumer_id, payload)
     
     return {
         "status": "ok",
@@ -51,46 +64,102 @@ def add_favourite(db: Session, consumer_id: int, payload: FavouriteIn) -> Dict:
         "target_id": payload.target_id,
     }
 
-def remove_favourite(db: Session, consumer_id: int, payload: FavouriteIn) -> Dict:
-    _ensure_consumer(db, consumer_id)
+async def remove_favourite(db: AsyncSession, consumer_id: int, payload: FavouriteIn) -> Dict:
+    await _ensure_consumer(db, consumer_id)
     
     q = _get_favourite_query_filters(consumer_id, payload.target_type, payload.target_id)
-    removed_count = db.query(Favourite).filter(and_(*q)).delete(synchronize_session='fetch')
+    removed_count = (await db.execute(
+        delete(Favourite).where(and_(*q)).execution_options(synchronize_session='fetch')
+    )).rowcount
     
     if removed_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Favourite not found")
     
-    db.commit()
+    await db.commit()
     return {"status": "ok", "action": "removed"}
 
-def list_favourites(db: Session, consumer_id: int) -> List[FavouriteOut]:
-    _ensure_consumer(db, consumer_id)
+async def list_favourites(db: AsyncSession, consumer_id: int) -> List[FavouriteOut]:
+    await _ensure_consumer(db, consumer_id)
     
-    favourites = db.query(Favourite).filter(Favourite.consumer_id == consumer_id).all()
+    favourites = (await db.scalars(select(Favourite).where(Favourite.consumer_id == consumer_id))).all()
     
     return [FavouriteOut.model_validate(fav) for fav in favourites]
 
-def is_favourite(db: Session, consumer_id: int, payload: FavouriteIn) -> Dict:
-    _ensure_consumer(db, consumer_id)
+async def is_favourite(db: AsyncSession, consumer_id: int, payload: FavouriteIn) -> Dict:
+    await _ensure_consumer(db, consumer_id)
     
-    is_fav = _is_favourite(db, consumer_id, payload.target_type, payload.target_id)
+    is_fav = await _is_favourite(db, consumer_id, payload.target_type, payload.target_id)
     
     return {"is_favourite": is_fav}
 
-def toggle_favourite(db: Session, consumer_id: int, payload: FavouriteIn) -> Dict:
-    _ensure_consumer(db, consumer_id)
+async def toggle_favourite(db: AsyncSession, consumer_id: int, payload: FavouriteIn) -> Dict:
+    await _ensure_consumer(db, consumer_id)
 
-    if _is_favourite(db, consumer_id, payload.target_type, payload.target_id):
+    if await _is_favourite(db, consumer_id, payload.target_type, payload.target_id):
         q = _get_favourite_query_filters(consumer_id, payload.target_type, payload.target_id)
-        db.query(Favourite).filter(and_(*q)).delete(synchronize_session='fetch')
-        db.commit()
+        await db.execute(delete(Favourite).where(and_(*q)).execution_options(synchronize_session='fetch'))
+        await db.commit()
         return {"status": "ok", "action": "removed"}
-    else:
-        new_fav = Favourite(
-            consumer_id=consumer_id,
-            target_type=payload.target_type,
-            target_id=payload.target_id,
-        )
-        db.add(new_fav)
-        db.commit()
-        return {"status": "ok", "action": "added"}
+    if not await _insert_favourite(db, consumer_id, payload):
+        return _exists_response(consumer_id, payload)
+    return {"status": "ok", "action": "added"}
+
+def _targets_clause(consumer_id: int, targets: Iterable[FavouriteIn]):
+    """
+    The consumer's favourites among `targets`: one (consumer_id, target_type, target_id IN ...)
+    branch per target type, each a seek on uq_favourites_consumer_target. At worst the
+    database reads the consumer's own slice of that (covering) index.
+    """
+    ids_by_type: Dict[str, Set[int]] = {}
+    for target in targets:
+        ids_by_type.setdefault(target.target_type, set()).add(target.target_id)
+    return or_(*(
+        and_(Favourite.consumer_id == consumer_id, Favourite.target_type == target_type, Favourite.target_id.in_(sorted(ids)))
+        for target_type, ids in ids_by_type.items()
+    ))
+
+async def _favourited(db: AsyncSession, consumer_id: int, targets: List[FavouriteIn]) -> Set[Tuple[str, int]]:
+    if not targets:
+        return set()
+    rows = await db.execute(
+        select(Favourite.target_type, Favourite.target_id).where(_targets_clause(consumer_id, targets))
+    )
+    return {(target_type, target_id) for target_type, target_id in rows}
+
+async def check_favourites(db: AsyncSession, consumer_id: int, payload: FavouriteBatchCheckIn) -> Dict:
+    """
+    Which of `payload.targets` the consumer has favourited, as booleans in request order,
+    from one indexed query. The caller is the consumer (token checked by the route), so
+    no separate existence check is made.
+    """
+    favourited = await _favourited(db, consumer_id, payload.targets)
+    return {"is_favourite": [(t.target_type, t.target_id) in favourited for t in payload.targets]}
+
+async def apply_favourites_batch(db: AsyncSession, consumer_id: int, payload: FavouriteBatchIn) -> Dict:
+    """Adds and removes favourites in one transaction. Targets already in the wanted state are skipped."""
+    await _ensure_consumer(db, consumer_id)
+
+    # A concurrent request may add one of our favourites between the lookup and the
+    # insert; the unique index rejects ours, and the retry sees theirs
+    for attempt in range(2):
+        try:
+            removed = 0
+            if payload.remove:
+                removed = (await db.execute(
+                    delete(Favourite).where(_targets_clause(consumer_id, payload.remove))
+                    .execution_options(synchronize_session=False)
+                )).rowcount
+
+            existing = await _favourited(db, consumer_id, payload.add)
+            new = {(t.target_type, t.target_id) for t in payload.add} - existing
+            if new:
+                await db.execute(insert(Favourite), [
+                    {"consumer_id": consumer_id, "target_type": target_type, "target_id": target_id}
+                    for target_type, target_id in sorted(new)
+                ])
+            await db.commit()
+            return {"status": "ok", "added": len(new), "removed": removed}
+        except IntegrityError:
+            await db.rollback()
+            if attempt:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Favourites changed concurrently, retry")
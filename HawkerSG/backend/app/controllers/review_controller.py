@@ -1,28 +1,43 @@
+import base64
+import binascii
+import json
 import os
-import shutil
-from typing import Dict, List, Optional, Any
+from datetime import datetime
+from typing import Dict, List, Literal, Optional, Any
 from fastapi import HTTPException, status, UploadFile
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.schemas.review_schema import ReviewIn, ReviewOut
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.review_schema import ReviewIn, ReviewListItemOut, ReviewOut, ReviewerOut
 from app.models.consumer_model import Consumer
+from app.models.user_model import User
 from app.models.review_model import Review
+from app.models.review_aggregate_model import ReviewAggregate
 
 from app.services.review_guard import guard_review_text
+from app.services import hawker_catalogue, photo_store, review_aggregates
+from app.services.consumer_lookup import consumer_exists
 
 REVIEW_IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "reviewPhotos")
+MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024  # 10MB per review photo
 
-def _ensure_consumer(db: Session, consumer_id: int):
+# Page size limits for the review listings
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+ReviewSort = Literal["newest", "highest", "lowest"]
+
+async def _ensure_consumer(db: AsyncSession, consumer_id: int):
     """Ensures consumer exists. This remains for path validation."""
-    if not db.query(Consumer).filter(Consumer.id == consumer_id).first():
+    if not await db.scalar(consumer_exists(consumer_id)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consumer not found")
 
-def _get_review_by_id_and_owner(db: Session, review_id: int, consumer_id: int) -> Review:
+async def _get_review_by_id_and_owner(db: AsyncSession, review_id: int, consumer_id: int) -> Review:
     """Retrieves a specific review, ensuring the consumer is the owner."""
-    review = db.query(Review).filter(
+    review = await db.scalar(select(Review).where(
         Review.id == review_id, 
         Review.consumer_id == consumer_id
-    ).first()
+    ))
     if not review:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Review not found or not owned by consumer")
     return review
@@ -35,38 +50,27 @@ def _serialize_images_in(images_list: Optional[List[str]]) -> str:
     """Converts the list of strings to a pipe-delimited string for storage."""
     return "|".join(images_list or [])
 
-def save_review_image_file(file: UploadFile, user_id: int) -> str:
+async def save_review_image_file(file: UploadFile, user_id: int) -> str:
     """Saves the uploaded file locally and returns its public path."""
     
-    # 1. Validation
-    allowed_extensions = ('.png', '.jpg', '.jpeg', '.webp')
-    file_extension = os.path.splitext(file.filename or "")[1].lower()
-    
-    if file_extension not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="Invalid file type. Only PNG, JPG, JPEG, and WEBP are allowed.")
-
-    # 2. Create a unique, secure filename
-    new_filename = f"review_{user_id}_{os.urandom(8).hex()}{file_extension}"
-    file_path = os.path.join(REVIEW_IMAGE_DIR, new_filename)
-
+    # 1. Stream to disk under the content hash, so a photo attached to several reviews
+    # is stored once. Size capped as it is read, type checked from the file's magic
+    # bytes rather than its extension. The upload's reference waits as a pending upload
+    # of this user until a review of theirs claims it (upsert_review).
     try:
-        # 3. Save the file locally
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # 4. Construct the public path (Mount point from main.py is /static/review)
-        public_path = f"/static/review/{new_filename}" 
-        
-        return public_path
-    
+        new_filename = await photo_store.save(file, "review", MAX_FILE_SIZE_BYTES, owner_id=user_id)
+    except HTTPException:
+        raise
     except Exception as e:
-        # Clean up the file if an error occurred after opening it
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            
         print(f"Error saving file {file.filename}: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not save file on server.")
 
+    # Uploads that were never attached give their reference up
+    await photo_store.expire_pending_async()
+
+    # 2. Construct the public path (Mount point from main.py is /static/review)
+    return f"/static/review/{new_filename}"
+
 # def create_review(db: Session, consumer_id: int, payload: ReviewIn) -> ReviewOut:
 #     # SECURITY NOTE: Ideally, the consumer_id should come from the JWT, 
 #     # not the path, to prevent IDOR.
@@ -111,14 +115,14 @@ def save_review_image_file(file: UploadFile, user_id: int) -> str:
 #     # Use ORM mode for serialization
 #     return ReviewOut.model_validate(new_review)
 
-def upsert_review(db: Session, consumer_id: int, payload: ReviewIn) -> ReviewOut:
+async def upsert_review(db: AsyncSession, consumer_id: int, payload: ReviewIn) -> ReviewOut:
     """
     Creates a new review or updates an existing one if the consumer has 
     already reviewed the specified target (upsert operation).
     """
     # SECURITY NOTE: Ideally, the consumer_id should come from the JWT, 
     # not the path, to prevent IDOR.
-    _ensure_consumer(db, consumer_id)
+    await _ensure_consumer(db, consumer_id)
 
     # Step 1: Run LLM moderation + constructiveness check (Kept commented as per original)
     # verdict = guard_review_text(payload.description)
@@ -128,43 +132,73 @@ def upsert_review(db: Session, consumer_id: int, payload: ReviewIn) -> ReviewOut
     #         detail=verdict["reason"],
     #     )
 
-    # Step 2: CHECK FOR DUPLICATE/EXISTING REVIEW
-    existing_review = db.query(Review).filter(
-        Review.consumer_id == consumer_id,
-        Review.target_type == payload.target_type,
-        Review.target_id == payload.target_id
-    ).first()
-    
-    # Step 3: Handle Upsert Logic
-    action_status = ""
-    if existing_review:
-        # **UPDATE** existing review
-        review = existing_review
-        review.star_rating = payload.star_rating
-        review.description = payload.description or ""
-        review.images = _serialize_images_in(payload.images)
-        action_status = "updated"
-        # Note: target_type and target_id are not changed on update.
-        
-        db.commit()
-        db.refresh(review)
-        
-    else:
-        # **CREATE** a new review
-        new_review = Review(
-            consumer_id=consumer_id,
-            target_type=payload.target_type,
-            target_id=payload.target_id,
-            star_rating=payload.star_rating,
-            description=payload.description or "",
-            images=_serialize_images_in(payload.images),
-        )
-        
-        db.add(new_review)
-        db.commit()
-        db.refresh(new_review)
-        review = new_review
-        action_status = "created"
+    images = list(dict.fromkeys(payload.images or []))  # each photo is referenced once per review
+
+    # A concurrent request may create this review between our lookup and insert. The
+    # unique index rejects ours; the rollback undoes our claims and rating delta, and
+    # the retry applies them once, as an update of the review that now exists.
+    for attempt in range(2):
+        # Step 2: CHECK FOR DUPLICATE/EXISTING REVIEW
+        existing_review = await db.scalar(select(Review).where(
+            Review.consumer_id == consumer_id,
+            Review.target_type == payload.target_type,
+            Review.target_id == payload.target_id
+        ))
+
+        # Step 3: Handle Upsert Logic
+        released_images = []
+        kept_images = _serialize_images_out(existing_review.images) if existing_review else []
+        try:
+            # Newly attached photos must be this consumer's own uploads; their references pass to the review
+            await photo_store.claim_pending(db, "review", consumer_id, [p for p in images if p not in kept_images])
+            if existing_review:
+                # **UPDATE** existing review
+                review = existing_review
+                await db.run_sync(
+                    review_aggregates.apply_delta, review.target_type, review.target_id, 0, payload.star_rating - review.star_rating
+                )
+                released_images = [p for p in kept_images if p not in images]
+                review.star_rating = payload.star_rating
+                review.description = payload.description or ""
+                review.images = _serialize_images_in(images)
+                action_status = "updated"
+                # Note: target_type and target_id are not changed on update.
+            else:
+                # **CREATE** a new review
+                review = Review(
+                    consumer_id=consumer_id,
+                    target_type=payload.target_type,
+                    target_id=payload.target_id,
+                    star_rating=payload.star_rating,
+                    description=payload.description or "",
+                    images=_serialize_images_in(images),
+                )
+                db.add(review)
+                await db.flush()  # a concurrent duplicate fails here, before the rating delta
+                await db.run_sync(review_aggregates.apply_delta, payload.target_type, payload.target_id, 1, payload.star_rating)
+                action_status = "created"
+
+            await db.commit()
+            break
+        except IntegrityError:
+            await db.rollback()
+            if attempt:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Review changed concurrently, retry")
+        except Exception:
+            # Rejected photo or failed commit: nothing is written, and
+            # the uploads claimed so far stay pending, for a retry to claim or to expire
+            await db.rollback()
+            raise
+
+    await db.refresh(review)
+
+    if review.target_type == "hawker":
+        # Hawker centre ratings are part of the cached GET /hawkers/ payload
+        hawker_catalogue.invalidate()
+
+    # Photos dropped from an updated review lose their reference
+    for path in released_images:
+        await photo_store.release_async("review", path)
 
     # Step 4: Serialize and return
     review.images = _serialize_images_out(review.images)
@@ -192,47 +226,141 @@ def update_review(db: Session, consumer_id: int, review_id: int, payload: Review
     return ReviewOut.model_validate(review)
 """
 
-def delete_review(db: Session, consumer_id: int, review_id: int) -> Dict:
+async def delete_review(db: AsyncSession, consumer_id: int, review_id: int) -> Dict:
     # This call includes the ownership check
-    review = _get_review_by_id_and_owner(db, review_id, consumer_id) 
+    review = await _get_review_by_id_and_owner(db, review_id, consumer_id) 
     
-    db.delete(review)
-    db.commit()
+    await db.run_sync(review_aggregates.apply_delta, review.target_type, review.target_id, -1, -review.star_rating)
+    await db.delete(review)
+    await db.commit()
+    if review.target_type == "hawker":
+        hawker_catalogue.invalidate()
+    for path in _serialize_images_out(review.images):
+        await photo_store.release_async("review", path)
     return {"message": "Review deleted"}
 
-def list_reviews_for_target(db: Session, target_type: str, target_id: int) -> List[ReviewOut]:
-    reviews = db.query(Review).filter(
-        Review.target_type == target_type,
-        Review.target_id == target_id
-    ).order_by(Review.created_at.desc()).all() # Newest first
-    
-    return [ReviewOut.model_validate(r) for r in reviews]
+def _sort_keys(sort: ReviewSort) -> list:
+    """
+    (column, descending) pairs a listing is ordered by; (created_at, id) makes the order total.
+    "lowest" is the exact reverse of "highest" (equal ratings oldest first) so both walk
+    ix_reviews_target_rating in one direction instead of sorting.
+    """
+    if sort == "highest":
+        return [(Review.star_rating, True), (Review.created_at, True), (Review.id, True)]
+    if sort == "lowest":
+        return [(Review.star_rating, False), (Review.created_at, False), (Review.id, False)]
+    return [(Review.created_at, True), (Review.id, True)]
 
-def list_reviews_for_consumer(db: Session, consumer_id: int) -> List[ReviewOut]:
-    _ensure_consumer(db, consumer_id)
-    
-    reviews = db.query(Review).filter(
-        Review.consumer_id == consumer_id
-    ).order_by(Review.created_at.desc()).all() # Newest first
-    
-    return [ReviewOut.model_validate(r) for r in reviews]
-
-def get_avg_rating(db: Session, target_type: str, target_id: int) -> Dict[str, Any]:
-    # Use SQLAlchemy's func.avg() to calculate the average rating in the database
-    result = db.query(
-        func.avg(Review.star_rating).label('average_rating'),
-        func.count(Review.id).label('count')
-    ).filter(
-        Review.target_type == target_type,
-        Review.target_id == target_id
-    ).first()
-    
-    avg_rating = result.average_rating
-    count = result.count
+def _after(keys: list, values: list):
+    """Rows that come after `values` in the order given by `keys` (the keyset condition)."""
+    column, descending = keys[0]
+    beyond = column < values[0] if descending else column > values[0]
+    if len(keys) == 1:
+        return beyond
+    return or_(beyond, and_(column == values[0], _after(keys[1:], values[1:])))
+
+def _encode_cursor(review: Review, keys: list) -> str:
+    values = [getattr(review, column.key) for column, _ in keys]
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str, keys: list) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(value) if column is Review.created_at else int(value)
+            for (column, _), value in zip(keys, values)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+async def _list_reviews(db: AsyncSession, query, sort: ReviewSort, cursor: Optional[str], limit: Optional[int]) -> list:
+    """
+    Runs `query` (selecting Review first) in the listing order, starting after `cursor`.
+    limit=None returns every row; otherwise one extra row is fetched to tell if another page exists.
+    """
+    keys = _sort_keys(sort)
+    if cursor is not None:
+        query = query.where(_after(keys, _decode_cursor(cursor, keys)))
+    query = query.order_by(*(column.desc() if descending else column.asc() for column, descending in keys))
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return (await db.execute(query)).all()
+
+def _page(items: list, rows: list, sort: ReviewSort, limit: int) -> Dict[str, Any]:
+    has_more = len(rows) > limit
+    return {
+        "items": items[:limit],
+        "next_cursor": _encode_cursor(rows[limit - 1][0], _sort_keys(sort)) if has_more else None,
+        "limit": limit,
+        "sort": sort,
+    }
+
+def _list_item(review: Review, reviewer: Optional[ReviewerOut]) -> ReviewListItemOut:
+    item = ReviewListItemOut.model_validate(review)
+    item.reviewer = reviewer
+    return item
+
+async def list_reviews_for_target(
+    db: AsyncSession,
+    target_type: str,
+    target_id: int,
+    sort: ReviewSort = "newest",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = DEFAULT_PAGE_SIZE,
+):
+    """
+    One page of a target's reviews with each reviewer's name and avatar, in a single
+    joined query. limit=None returns the plain list of every review instead of a page.
+    """
+    # Join the tables rather than the Consumer entity, whose users/consumers
+    # inheritance join SQLite would build for every user before joining
+    users, consumers = User.__table__, Consumer.__table__
+    query = (
+        select(Review, users.c.username, consumers.c.profile_pic)
+        .outerjoin(users, users.c.id == Review.consumer_id)
+        .outerjoin(consumers, consumers.c.id == Review.consumer_id)
+        .where(Review.target_type == target_type, Review.target_id == target_id)
+    )
+    rows = await _list_reviews(db, query, sort, cursor, limit)
+    items = [
+        _list_item(review, ReviewerOut(id=review.consumer_id, username=username, profile_pic=profile_pic))
+        for review, username, profile_pic in rows
+    ]
+    return items if limit is None else _page(items, rows, sort, limit)
+
+async def list_reviews_for_consumer(
+    db: AsyncSession,
+    consumer_id: int,
+    sort: ReviewSort = "newest",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = DEFAULT_PAGE_SIZE,
+):
+    """One page of a consumer's reviews; limit=None returns the plain list of every review."""
+    # The existence check also fetches the reviewer shown on every item (columns only,
+    # so none of the consumer's relationships are loaded)
+    consumer = (await db.execute(
+        select(Consumer.username, Consumer.profile_pic).where(Consumer.id == consumer_id)
+    )).first()
+    if consumer is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consumer not found")
+    reviewer = ReviewerOut(id=consumer_id, username=consumer.username, profile_pic=consumer.profile_pic)
+
+    rows = await _list_reviews(db, select(Review).where(Review.consumer_id == consumer_id), sort, cursor, limit)
+    items = [_list_item(review, reviewer) for review, in rows]
+    return items if limit is None else _page(items, rows, sort, limit)
+
+async def get_avg_rating(db: AsyncSession, target_type: str, target_id: int) -> Dict[str, Any]:
+    # Read the maintained totals (primary-key lookup) instead of scanning reviews
+    aggregate = await db.get(ReviewAggregate, (target_type, target_id))
+    count = aggregate.review_count if aggregate else 0
+    rating_sum = aggregate.rating_sum if aggregate else 0
     
     return {
         "target_type": target_type, 
         "target_id": target_id, 
-        "average_rating": round(avg_rating, 2) if avg_rating is not None else 0.0, 
+        "average_rating": review_aggregates.average_rating(rating_sum, count), 
         "count": count
-    }
\ No newline at end of file
+    }
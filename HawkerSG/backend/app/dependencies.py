@@ -1,4 +1,7 @@
-from fastapi import Depends, HTTPException, status
+import os
+import secrets
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from app.utils.jwt_utils import decode_access_token
 
@@ -72,4 +75,23 @@ def get_current_license_number(token: str = Depends(business_oauth2_scheme)) ->
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return str(license_number)
\ No newline at end of file
+    return str(license_number)
+
+# Shared secret for operator endpoints (e.g. /admin/profiles); they are disabled while unset
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Checks the X-Admin-Token header against ADMIN_TOKEN.
+    Used for operator-only endpoints.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token.",
+        )
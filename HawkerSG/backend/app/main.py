@@ -1,16 +1,21 @@
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware 
-from fastapi.staticfiles import StaticFiles
 
 from app.database import Base, engine, SessionLocal
+from app.migrations import run_migrations
+from app.utils.body_limit import BodySizeLimitMiddleware
 from app.utils.profiler_middleware import PyInstrumentProfilerMiddleware
+from app.utils.static_assets import StaticAssets, StaticAssetsMiddleware
 from app.routes.consumer_route import router as consumer_router
 from app.routes.business_route import router as business_router
 from app.routes.favourite_route import router as favourite_router  
 from app.routes.review_route import router as review_router
 from app.routes.hawker_route import router as hawker_router
 from app.routes.stall_route import router as stall_router
+from app.routes.health_route import router as health_router
+from app.routes.admin_route import router as admin_router
+from app.routes.search_route import router as search_router
 
 # Import models here so Base knows about them when calling create_all
 from app.models import (
@@ -21,11 +26,13 @@ from app.models import (
     hawker_centre_model,
     business_model,
     operating_hour_model,
-    menu_item_model
+    menu_item_model,
+    review_aggregate_model,
+    stored_photo_model
 )
 
-# SEEDING IMPORT
-from app.assets.database_seed.seed_db import seed_sfa_data_if_empty
+from app.services import photo_store, planning_area, search_index, seeding, suggest_index
+from app.utils import http_client, onemap_token_manager
 
 # Define paths relative to the current file (main.py is in 'app')
 MAIN_DIR = os.path.dirname(__file__)
@@ -33,6 +40,9 @@ MAIN_DIR = os.path.dirname(__file__)
 # Path to the index.json file (from app/main.py -> ../SFA/index.json)
 INDEX_JSON_PATH = os.path.join(MAIN_DIR, "..", "SFA", "index.json")
 
+# Set SEED_ON_STARTUP=0 when seeding is run separately with `python -m app.cli seed`
+SEED_ON_STARTUP = os.getenv("SEED_ON_STARTUP", "1").lower() not in ("0", "false", "no")
+
 # Define the directories where profile pictures are stored
 # Use relative path to main.py file's location. E.g. /backend/app/assets/profilePhotos
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "assets", "profilePhotos")
@@ -40,65 +50,73 @@ BUSINESS_STATIC_DIR = os.path.join(os.path.dirname(__file__), "assets", "busines
 MENU_IMAGE_DIR = os.path.join(os.path.dirname(__file__), "assets", "menuPhotos")
 REVIEW_IMAGE_DIR = os.path.join(os.path.dirname(__file__), "assets", "reviewPhotos")
 
+# Cache lifetime for photos that are not content-addressed (seed photos, older uploads)
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+# Internal nginx location for X-Accel-Redirect (e.g. /internal); unset to send files directly
+STATIC_ACCEL_REDIRECT = os.getenv("STATIC_ACCEL_REDIRECT") or None
+# Largest request body accepted, in bytes: the biggest photo (20MB business and menu
+# photos) plus the other form fields. Larger requests get a 413 before they are read.
+MAX_REQUEST_BODY_BYTES = int(os.getenv("MAX_REQUEST_BODY_BYTES", str(21 * 1024 * 1024)))
+
 # Function to create tables
 def create_db_and_tables():
     # Base.metadata.create_all requires all models to be imported before calling
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add any newer indexes to them
+    run_migrations(engine)
 
 # Initialize App and DB
 app = FastAPI(title="HawkerSG")
 
 @app.on_event("startup")
 def startup_db_and_seed():
-    print("Running database table creation...")
-    create_db_and_tables()
-    print("Database tables ensured.")
-    
-    # 1. Get a fresh database session
-    db = SessionLocal()
-    
-    try:
-        # 2. Call the seeding function
-        seed_sfa_data_if_empty(db, INDEX_JSON_PATH)
-    except Exception as e:
-        # Catch and print error, which would typically be a database issue
-        print(f"Error during application startup seeding: {e}")
-        # NOTE: The exception is primarily for logging, the app should still start.
-    finally:
-        # 3. Always close the session
-        db.close()
+    # Table creation and seeding run in a background thread under a file lock,
+    # so workers start serving immediately and only one of them seeds.
+    # GET /health/ready reports when the data is available.
+    if SEED_ON_STARTUP:
+        seeding.start_background_seed()
+    else:
+        seeding.disable()
+        # Seeding builds the search and suggestion indexes when it finishes; otherwise build them now
+        search_index.warm()
+        suggest_index.warm()
+
+@app.on_event("startup")
+async def start_onemap_token_refresh():
+    # The OneMap token is only needed while planning areas fall back to OneMap
+    if not planning_area.is_available():
+        onemap_token_manager.start_background_refresh()
+
+@app.on_event("shutdown")
+async def close_outbound_http():
+    await onemap_token_manager.stop_background_refresh()
+    await http_client.aclose()
 
 # STATIC FILES CONFIGURATION
-# 1. Mount the STATIC_DIR to a public URL path (e.g., /static/profiles)
-# 2. The browser will access files at: http://localhost:8001/static/profiles/profilePicture.png
+# Photos are served at e.g. http://localhost:8001/static/profiles/profilePicture.png
+# by StaticAssetsMiddleware, which answers them before CORS, the profiler and
+# routing. Uploads stored under their content hash are cached as immutable
+# (see photo_store); other files for STATIC_MAX_AGE seconds with ETag revalidation.
+# Behind nginx, STATIC_ACCEL_REDIRECT hands the file transfer to nginx.
 os.makedirs(STATIC_DIR, exist_ok=True)  # Ensure directory exists
 os.makedirs(BUSINESS_STATIC_DIR, exist_ok=True)
 os.makedirs(MENU_IMAGE_DIR, exist_ok=True)
 os.makedirs(REVIEW_IMAGE_DIR, exist_ok=True)
 
-app.mount(
-    "/static/profiles", 
-    StaticFiles(directory=STATIC_DIR, check_dir=False), 
-    name="profiles"
-)
-
-app.mount(
-    "/static/business", 
-    StaticFiles(directory=BUSINESS_STATIC_DIR, check_dir=False), 
-    name="business"
-)
-
-app.mount(
-    "/static/menu", 
-    StaticFiles(directory=MENU_IMAGE_DIR, check_dir=False), 
-    name="menu"
-)
-
-app.mount(
-    "/static/review", 
-    StaticFiles(directory=REVIEW_IMAGE_DIR, check_dir=False), 
-    name="review"
-)
+def _static_assets(directory: str) -> StaticAssets:
+    return StaticAssets(
+        directory=directory,
+        max_age=STATIC_MAX_AGE,
+        immutable=photo_store.is_content_addressed,
+        accel_redirect=STATIC_ACCEL_REDIRECT,
+    )
+
+STATIC_MOUNTS = {
+    "/static/profiles": _static_assets(STATIC_DIR),
+    "/static/business": _static_assets(BUSINESS_STATIC_DIR),
+    "/static/menu": _static_assets(MENU_IMAGE_DIR),
+    "/static/review": _static_assets(REVIEW_IMAGE_DIR),
+}
 
 # Setup CORS (Crucial for frontend development)
 app.add_middleware(
@@ -111,6 +129,11 @@ app.add_middleware(
 
 app.add_middleware(PyInstrumentProfilerMiddleware)
 
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=MAX_REQUEST_BODY_BYTES)
+
+# Added last so it runs first: static requests never reach the middleware above
+app.add_middleware(StaticAssetsMiddleware, mounts=STATIC_MOUNTS)
+
 # Routes
 app.include_router(consumer_router)
 app.include_router(business_router)
@@ -118,6 +141,9 @@ app.include_router(favourite_router)
 app.include_router(review_router)
 app.include_router(hawker_router)
 app.include_router(stall_router)
+app.include_router(health_router)
+app.include_router(admin_router)
+app.include_router(search_router)
 
 # Optional: Root route
 @app.get("/")
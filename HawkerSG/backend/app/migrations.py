@@ -0,0 +1,64 @@
+"""
+In-place schema upgrades for existing databases.
+
+Base.metadata.create_all only creates missing tables, so indexes added to a
+model after its table exists (e.g. on an existing HawkerSG.db) are never built.
+run_migrations creates them, first removing duplicate rows that would violate
+the new unique indexes.
+
+Run via startup or manually:
+    python -m app.cli migrate
+"""
+from sqlalchemy import delete, func, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.favourite_model import Favourite
+from app.models.review_model import Review
+from app.services import review_aggregates
+
+def _existing_index_names(engine: Engine, table_name: str) -> set:
+    return {ix["name"] for ix in inspect(engine).get_indexes(table_name)}
+
+def _dedupe_reviews(db: Session) -> int:
+    """Keeps the most recent review (highest id) per consumer and target."""
+    keep = select(func.max(Review.id)).group_by(Review.consumer_id, Review.target_type, Review.target_id)
+    return db.execute(delete(Review).where(Review.id.not_in(keep))).rowcount
+
+def _dedupe_favourites(db: Session) -> int:
+    """Keeps the first favourite (lowest id) per consumer and target."""
+    keep = select(func.min(Favourite.id)).group_by(Favourite.consumer_id, Favourite.target_type, Favourite.target_id)
+    return db.execute(delete(Favourite).where(Favourite.id.not_in(keep))).rowcount
+
+# unique index name -> function removing rows that would violate it
+_DEDUPE_BEFORE = {
+    "uq_reviews_consumer_target": _dedupe_reviews,
+    "uq_favourites_consumer_target": _dedupe_favourites,
+}
+
+def run_migrations(engine: Engine) -> None:
+    """Creates every index declared on the models that is missing from the database."""
+    with Session(engine) as db:
+        reviews_deduped = 0
+        for table in Base.metadata.sorted_tables:
+            existing = _existing_index_names(engine, table.name)
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+
+                dedupe = _DEDUPE_BEFORE.get(index.name)
+                if dedupe:
+                    removed = dedupe(db)
+                    db.commit()
+                    if removed:
+                        print(f"Removed {removed} duplicate rows from {table.name} before adding {index.name}.")
+                    if table.name == Review.__tablename__:
+                        reviews_deduped += removed
+
+                index.create(engine)
+                print(f"Created index {index.name} on {table.name}.")
+
+        if reviews_deduped:
+            # Deleted duplicates were still counted in the rating totals
+            review_aggregates.rebuild(db)
@@ -1,7 +1,7 @@
 from app.models.user_model import User
 from app.database import Base
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Boolean, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Boolean, DateTime, Index
+from sqlalchemy.orm import relationship, object_session
 import enum
 from datetime import datetime
 from datetime import datetime, time
@@ -56,22 +56,23 @@ class Business(User):
     __mapper_args__ = {
         "polymorphic_identity": "business",
     }
+
+    # Composite (filter, id) indexes so filtered /stalls pages can seek straight
+    # to the cursor instead of scanning the whole table.
+    __table_args__ = (
+        Index("ix_businesses_hawker_centre_id", "hawker_centre", "id"),
+        Index("ix_businesses_cuisine_type_id", "cuisine_type", "id"),
+        Index("ix_businesses_postal_code_id", "postal_code", "id"),
+    )
     
 
                 
     def is_currently_open(self):
         """Check if stall is open based on today's operating hours"""
-        now = datetime.now(pytz.timezone("Asia/Singapore"))
-        current_day = now.strftime("%A").lower()  # e.g. 'monday'
+        # Imported here to avoid a circular import (the index imports the models)
+        from app.services import schedule_index
 
-        for hours in self.operating_hours:
-            if hours.day_of_week.lower() == current_day:
-                if hours.closed:
-                    return False
-                try:
-                    open_time = datetime.strptime(hours.open_time, "%H:%M").time()
-                    close_time = datetime.strptime(hours.close_time, "%H:%M").time()
-                except Exception:
-                    return False
-                return open_time <= now.time() <= close_time
-        return False
\ No newline at end of file
+        now = datetime.now(pytz.timezone("Asia/Singapore"))
+        return schedule_index.is_open(
+            object_session(self), self.license_number, self.status == StallStatus.OPEN, now
+        )
@@ -11,13 +11,12 @@ class Consumer(User):
     profile_pic = Column(String, nullable=True)
     recentlySearch = Column(String, default="")
 
-    favourites = relationship("Favourite", back_populates="consumer", 
-        # Optional: Set lazy='joined' or 'selectin' for more efficient loading 
-        # when fetching a Consumer and their favourites.
-        lazy="selectin" 
-    )
+    # Never loaded implicitly: a consumer's favourites and reviews grow with their
+    # activity, and most requests touching a Consumer need neither. Load them per
+    # query with consumer_lookup.consumer_by_id(..., favourites=True, reviews=True)
+    favourites = relationship("Favourite", back_populates="consumer", lazy="raise_on_sql")
 
-    reviews = relationship("Review", back_populates="consumer", lazy="selectin")
+    reviews = relationship("Review", back_populates="consumer", lazy="raise_on_sql")
 
     __mapper_args__ = {
         "polymorphic_identity": "consumer",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -15,3 +15,9 @@ class Favourite(Base):
     # This allows you to access the Consumer object from a Favourite object.
     # 'Consumer' is the class name of the target model.
     consumer = relationship("Consumer", back_populates="favourites")
+
+    __table_args__ = (
+        # One favourite per target per consumer. The consumer_id prefix also
+        # serves list_favourites, and the full key serves _is_favourite.
+        Index("uq_favourites_consumer_target", "consumer_id", "target_type", "target_id", unique=True),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class ReviewAggregate(Base):
+    """
+    Denormalized review totals per target, maintained by the review controller
+    in the same transaction as the review write. Lets listings show ratings
+    without an AVG/COUNT query per row.
+    """
+    __tablename__ = "review_aggregates"
+
+    target_type = Column(String(50), primary_key=True)
+    target_id = Column(Integer, primary_key=True)
+
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -22,8 +22,15 @@ class Review(Base):
 
     consumer = relationship("Consumer", back_populates="reviews") 
     
-    # Add a unique constraint to ensure a user can only review a specific target once
-    # Optional, but often a good idea for reviews:
-    # __table_args__ = (
-    #     UniqueConstraint('consumer_id', 'target_type', 'target_id', name='_consumer_target_uc'),
-    # )
\ No newline at end of file
+    __table_args__ = (
+        # A user can only review a specific target once (also serves upsert_review's lookup).
+        # Declared as a unique index rather than a constraint so existing SQLite
+        # databases can be migrated in place, see app/migrations.py.
+        Index("uq_reviews_consumer_target", "consumer_id", "target_type", "target_id", unique=True),
+        # list_reviews_for_target: filter on target, newest first
+        Index("ix_reviews_target_created", "target_type", "target_id", "created_at"),
+        # list_reviews_for_target sorted by highest/lowest rating
+        Index("ix_reviews_target_rating", "target_type", "target_id", "star_rating", "created_at"),
+        # list_reviews_for_consumer: filter on consumer, newest first
+        Index("ix_reviews_consumer_created", "consumer_id", "created_at"),
+    )
\ No newline at end of file
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from app.database import Base
+
+class StoredPhoto(Base):
+    """
+    Reference count for a content-addressed photo (see app/services/photo_store.py).
+    The file is deleted when the last business, menu item, profile or review
+    pointing at it lets go.
+    """
+    __tablename__ = "stored_photos"
+
+    kind = Column(String(20), primary_key=True)      # business / menu / profiles / review
+    filename = Column(String(80), primary_key=True)  # <sha256>.<ext>
+
+    ref_count = Column(Integer, nullable=False, default=0)
+
+class PendingUpload(Base):
+    """
+    A photo uploaded but not yet attached to anything. It holds the upload's
+    reference until its uploader attaches it (photo_store.claim_pending) or it
+    expires (photo_store.expire_pending).
+    """
+    __tablename__ = "pending_uploads"
+    __table_args__ = (
+        Index("ix_pending_uploads_owner", "kind", "owner_id", "filename"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)
+    filename = Column(String(80), nullable=False)
+    owner_id = Column(Integer, nullable=False)  # users.id of the uploader
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from app.dependencies import require_admin
+from app.utils import profiler_middleware
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+@router.get("/profiles")
+def list_profiles(limit: int = Query(50, ge=1, le=500)):
+    """Recent request profiles, newest first, with the files saved for each."""
+    return {"profiles": profiler_middleware.list_profiles()[:limit]}
+
+@router.get("/profiles/{filename}")
+def download_profile(filename: str):
+    """Downloads one saved profile (.html opens in a browser, .speedscope.json in speedscope.app)."""
+    path = profiler_middleware.profile_file_path(filename)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    media_type = "text/html" if filename.endswith(".html") else "application/json"
+    return FileResponse(path, media_type=media_type, filename=filename)
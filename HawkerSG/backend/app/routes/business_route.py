@@ -1,5 +1,6 @@
 from datetime import timedelta
 from typing import List, Optional
+from anyio import from_thread
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
@@ -16,10 +17,16 @@ from app.dependencies import get_current_license_number
 router = APIRouter(prefix="/business", tags=["Business"])
 
 # ===== Authentication Endpoints (No JWT Required) =====
+# Signup, login and password reset are sync routes, so their database calls run in the
+# threadpool rather than on the event loop. They reach the async Argon2 pool
+# (app/utils/password_utils.py) through anyio's from_thread.run.
 
 @router.post("/signup", response_model=BusinessOut, status_code=status.HTTP_201_CREATED)
 def signup_business(business_in: BusinessCreate, db: Session = Depends(get_db)):
     """Handles the POST request for business owner sign up."""
+
+    # Hash before touching the database, so no pooled connection is held while Argon2 runs
+    hashed_password = from_thread.run(business_controller.get_password_hash, business_in.password)
     
     # Check if email already exists
     if business_controller.get_user_by_email(db, business_in.email):
@@ -30,7 +37,7 @@ def signup_business(business_in: BusinessCreate, db: Session = Depends(get_db)):
     
     try:
         # Create new business account
-        new_business = business_controller.create_business(db, business=business_in)
+        new_business = business_controller.create_business(db, business=business_in, hashed_password=hashed_password)
         return new_business
     except HTTPException as e:
         raise e
@@ -57,12 +64,19 @@ def login_business(form_data: OAuth2PasswordRequestForm = Depends(), db: Session
             detail="Incorrect email or password"
         )
     
-    # 2. Verify password hash
-    if not business_controller.verify_password(password, db_user.hashed_password):
+    # 2. Verify password hash (on the password hashing pool). End the read transaction
+    # first, so no pooled connection is held while Argon2 runs
+    hashed_password = db_user.hashed_password
+    db.commit()
+    valid, new_hash = from_thread.run(business_controller.verify_password, password, hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
+    if new_hash:
+        # Hashed with older Argon2 parameters; upgrade it now that we have the password
+        business_controller.update_password_hash(db, db_user, new_hash)
     
     # 3. Check user type (must be business)
     if db_user.user_type != "business":
@@ -1,5 +1,6 @@
 from datetime import timedelta
 from typing import Optional
+from anyio import from_thread
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
@@ -9,14 +10,21 @@ from app.schemas.user_schema import PasswordResetRequest, PasswordResetData
 from app.controllers import consumer_controller
 from app.utils.jwt_utils import create_access_token, ACCESS_TOKEN_EXPIRE_SECONDS
 from app.dependencies import get_current_user_id
-from app.models.user_model import User as DBUser
+from app.services.consumer_lookup import consumer_by_id
 
 router = APIRouter(prefix="/consumer")
 
+# Signup, login and password reset are sync routes, so their database calls run in the
+# threadpool rather than on the event loop. They reach the async Argon2 pool
+# (app/utils/password_utils.py) through anyio's from_thread.run.
+
 @router.post("/signup", response_model=ConsumerOut, status_code=status.HTTP_201_CREATED)
 def signup_user(user_in: ConsumerCreate, db: Session = Depends(get_db)): # <-- Use ConsumerCreate
     """Handles the POST request for user sign up."""
 
+    # Hash before touching the database, so no pooled connection is held while Argon2 runs
+    hashed_password = from_thread.run(consumer_controller.get_password_hash, user_in.password)
+
     if consumer_controller.get_user_by_email(db, user_in.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,7 +33,7 @@ def signup_user(user_in: ConsumerCreate, db: Session = Depends(get_db)): # <-- U
 
     try:
         # Returns a Consumer object which is mapped to ConsumerOut
-        new_user = consumer_controller.create_user(db, user=user_in) 
+        new_user = consumer_controller.create_user(db, user=user_in, hashed_password=hashed_password) 
         return new_user
     except Exception as e:
         print(f"Error during sign up: {e}")
@@ -46,12 +54,19 @@ def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
             detail="Incorrect email or password"
         )
 
-    # 2. Verify password hash
-    if not consumer_controller.verify_password(password, db_user.hashed_password):
+    # 2. Verify password hash (on the password hashing pool). End the read transaction
+    # first, so no pooled connection is held while Argon2 runs
+    hashed_password = db_user.hashed_password
+    db.commit()
+    valid, new_hash = from_thread.run(consumer_controller.verify_password, password, hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
+    if new_hash:
+        # Hashed with older Argon2 parameters; upgrade it now that we have the password
+        consumer_controller.update_password_hash(db, db_user, new_hash)
     
     # 3. Update: Checks that user whom login from this URL is a Consumer
     if db_user.user_type != "consumer":
@@ -105,8 +120,14 @@ def reset_user_password(
     """
     Finalizes the password reset by validating the token and setting the new password.
     """
+    # Reject an unknown or expired token before spending a hash on it. End the read
+    # transaction first, so no pooled connection is held while Argon2 runs
+    consumer_controller.validate_reset_token(db, data.token)
+    db.commit()
+    hashed_password = from_thread.run(consumer_controller.get_password_hash, data.new_password)
     try:
-        consumer_controller.handle_password_reset(db, data)
+        # Checks the token again: a concurrent reset may have used it meanwhile
+        consumer_controller.handle_password_reset(db, data, hashed_password)
         return {"message": "Password successfully reset."}
     except HTTPException as e:
         # Re-raise explicit exceptions from the controller
@@ -176,9 +197,10 @@ def add_search_to_history(
 
 @router.get("/{consumer_id}", response_model=ConsumerOut)
 def get_consumer(consumer_id: int, db: Session = Depends(get_db)):
-    user = db.query(DBUser).filter(DBUser.id == consumer_id).first()
-    if not user or user.user_type != "consumer":
+    # One query for the users and consumers columns; only consumers match
+    consumer = db.scalar(consumer_by_id(consumer_id))
+    if not consumer:
         raise HTTPException(status_code=404, detail="Consumer not found")
-    return user
+    return consumer
 
 
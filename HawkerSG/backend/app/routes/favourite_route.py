@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, status, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
-from app.database import get_db
-from app.schemas.favourite_schema import FavouriteIn, FavouriteOut
+from app.database import get_async_db
+from app.schemas.favourite_schema import FavouriteBatchCheckIn, FavouriteBatchIn, FavouriteIn, FavouriteOut
 from app.controllers import favourite_controller as ctrl
 from app.dependencies import get_current_user_id
 
@@ -16,25 +16,37 @@ def _check_owner_match(path_id: int, token_id: int):
         )
 
 @router.get("", response_model=List[FavouriteOut])
-def list_favourites(consumer_id: int, db: Session = Depends(get_db)):
-    return ctrl.list_favourites(db, consumer_id)
+async def list_favourites(consumer_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await ctrl.list_favourites(db, consumer_id)
 
 @router.post("", response_model=Dict)
-def add_favourite(consumer_id: int, fav: FavouriteIn, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+async def add_favourite(consumer_id: int, fav: FavouriteIn, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
     _check_owner_match(consumer_id, user_id)
-    return ctrl.add_favourite(db, consumer_id, fav)
+    return await ctrl.add_favourite(db, consumer_id, fav)
 
 @router.delete("", response_model=Dict)
-def remove_favourite(consumer_id: int, fav: FavouriteIn, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+async def remove_favourite(consumer_id: int, fav: FavouriteIn, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
     _check_owner_match(consumer_id, user_id)
-    return ctrl.remove_favourite(db, consumer_id, fav)
+    return await ctrl.remove_favourite(db, consumer_id, fav)
 
 @router.post("/toggle", response_model=Dict)
-def toggle_favourite(consumer_id: int, fav: FavouriteIn, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+async def toggle_favourite(consumer_id: int, fav: FavouriteIn, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
     _check_owner_match(consumer_id, user_id)
-    return ctrl.toggle_favourite(db, consumer_id, fav)
+    return await ctrl.toggle_favourite(db, consumer_id, fav)
 
 @router.post("/check", response_model=Dict)
-def check_favourite(consumer_id: int, fav: FavouriteIn, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+async def check_favourite(consumer_id: int, fav: FavouriteIn, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
     _check_owner_match(consumer_id, user_id)
-    return ctrl.is_favourite(db, consumer_id, fav)
+    return await ctrl.is_favourite(db, consumer_id, fav)
+
+@router.post("/check/batch", response_model=Dict)
+async def check_favourites(consumer_id: int, payload: FavouriteBatchCheckIn, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    """is_favourite[i] tells whether targets[i] is a favourite, e.g. to mark every heart on a stall grid."""
+    _check_owner_match(consumer_id, user_id)
+    return await ctrl.check_favourites(db, consumer_id, payload)
+
+@router.post("/batch", response_model=Dict)
+async def apply_favourites_batch(consumer_id: int, payload: FavouriteBatchIn, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
+    """Adds `add` and removes `remove` in a single transaction; returns how many rows changed."""
+    _check_owner_match(consumer_id, user_id)
+    return await ctrl.apply_favourites_batch(db, consumer_id, payload)
@@ -1,43 +1,88 @@
-import requests
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.database import get_db
+import httpx
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.business_model import Business
 from app.models.hawker_centre_model import HawkerCentre
-from app.utils.onemap_token_manager import get_onemap_token
+from app.models.review_aggregate_model import ReviewAggregate
+from app.routes.stall_route import business_to_dto, now_sg, schedule_snapshot, stalls_with_ratings
+from app.services import geo_index, hawker_catalogue, planning_area, review_aggregates
+from app.utils import http_client, onemap_token_manager
 
 router = APIRouter(
     prefix="/hawkers",
     tags=["Hawkers"]
 )
 
+# Search radius limits for /hawkers/nearby, in metres
+DEFAULT_NEARBY_RADIUS_M = 2000
+MAX_NEARBY_RADIUS_M = 50000
+
+def hawkers_with_ratings():
+    """Select of HawkerCentre rows paired with their review totals, fetched in the same query."""
+    return select(
+        HawkerCentre, ReviewAggregate.review_count, ReviewAggregate.rating_sum
+    ).outerjoin(
+        ReviewAggregate,
+        and_(ReviewAggregate.target_type == "hawker", ReviewAggregate.target_id == HawkerCentre.id),
+    )
+
+def hawker_to_dto(hawker: HawkerCentre, review_count: Optional[int] = 0, rating_sum: Optional[int] = 0) -> dict:
+    return {
+        "id": hawker.id,
+        "name": hawker.name,
+        "address": hawker.address,
+        "description": hawker.description,
+        "image": hawker.image,
+        "rating": review_aggregates.average_rating(rating_sum, review_count),
+        "review_count": review_count or 0,
+        "latitude": hawker.latitude,
+        "longitude": hawker.longitude,
+    }
+
+async def _load_catalogue(db: AsyncSession) -> list:
+    hawkers = (await db.execute(hawkers_with_ratings().order_by(HawkerCentre.id))).all()
+    return [hawker_to_dto(h, count, total) for h, count, total in hawkers]
+
 @router.get("/")
-def get_all_hawkers(db: Session = Depends(get_db)):
-    """Return all hawker centres from the database."""
-    hawkers = db.query(HawkerCentre).all()
-    if not hawkers:
+async def get_all_hawkers(
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Return all hawker centres, served from the in-process catalogue cache.
+    Clients sending the current ETag in If-None-Match get a 304 without a DB query.
+    """
+    catalogue = hawker_catalogue.current()
+    if catalogue and hawker_catalogue.etag_matches(if_none_match, catalogue.etag):
+        return Response(status_code=304, headers={"ETag": catalogue.etag, "Cache-Control": hawker_catalogue.CACHE_CONTROL})
+
+    catalogue = await hawker_catalogue.get(db, _load_catalogue)
+    if catalogue.body == b"[]":
+        hawker_catalogue.invalidate()  # don't cache an unseeded database
         raise HTTPException(status_code=404, detail="No hawker centres found in the database")
-    return hawkers
 
-@router.get("/planning-area", response_model=str)
-async def get_planning_area_proxy(
-    latitude: float = Query(..., description="WGS84 Latitude"),
-    longitude: float = Query(..., description="WGS84 Longitude")
-):
+    headers = {"ETag": catalogue.etag, "Cache-Control": hawker_catalogue.CACHE_CONTROL}
+    if hawker_catalogue.etag_matches(if_none_match, catalogue.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=catalogue.body, media_type="application/json", headers=headers)
+
+async def _onemap_planning_area(latitude: float, longitude: float) -> str:
     """
-    Proxies the OneMap GetPlanningArea API call securely using a backend-managed token.
+    Calls the OneMap GetPlanningArea API with a backend-managed token,
+    through the shared outbound HTTP client.
     """
     # 1. Get the current, valid token from the secure backend cache/manager
-    token = get_onemap_token()
+    token = await onemap_token_manager.get_onemap_token()
     if not token:
         # 503 Service Unavailable is appropriate if an external dependency fails
         raise HTTPException(status_code=503, 
                             detail="Service Unavailable: Failed to retrieve secure OneMap token.")
         
     # 2. Construct the external OneMap API request URL
-    PLANNING_AREA_URL = (
-        f"https://www.onemap.gov.sg/api/public/popapi/getPlanningarea"
-        f"?latitude={latitude}&longitude={longitude}"
-    )
+    PLANNING_AREA_URL = f"{onemap_token_manager.ONEMAP_BASE_URL}/api/public/popapi/getPlanningarea"
     
     headers = {
         "Authorization": token  # The secure, refreshed token is added here
@@ -45,7 +90,9 @@ async def get_planning_area_proxy(
 
     # 3. Make the request to OneMap
     try:
-        response = requests.get(PLANNING_AREA_URL, headers=headers)
+        response = await http_client.get(
+            PLANNING_AREA_URL, params={"latitude": latitude, "longitude": longitude}, headers=headers
+        )
         
         # Check for 401 Unauthorized (which shouldn't happen if get_onemap_token works, but as a safeguard)
         if response.status_code == 401:
@@ -56,24 +103,78 @@ async def get_planning_area_proxy(
         
         # 4. Process the response data just like the frontend did (best to do this on the backend)
         if data and isinstance(data, list) and data[0].get('pln_area_n'):
-            areaName = data[0]['pln_area_n']
             # Format the area name from ALL CAPS (e.g., "YISHUN") to Title Case ("Yishun")
-            formatted_area = ' '.join(
-                [word.capitalize() for word in areaName.lower().split()]
-            )
-            return formatted_area
+            return planning_area.format_area_name(data[0]['pln_area_n'])
         
         return "Singapore" # Fallback if no specific planning area found
 
-    except requests.exceptions.RequestException as e:
+    except http_client.CircuitOpenError as e:
+        print(f"Skipping OneMap GetPlanningArea: {e}")
+        raise HTTPException(status_code=503, detail="External map service unavailable.")
+    except (httpx.HTTPError, ValueError) as e:
         print(f"Error calling OneMap GetPlanningArea: {e}")
         # Return a generic error to the frontend
         raise HTTPException(status_code=500, detail="External map service failed.")
 
+@router.get("/planning-area", response_model=str)
+async def get_planning_area_proxy(
+    latitude: float = Query(..., description="WGS84 Latitude"),
+    longitude: float = Query(..., description="WGS84 Longitude")
+):
+    """
+    Resolves the planning area locally from the bundled URA polygons.
+    Falls back to the OneMap GetPlanningArea API only when no polygon file is available.
+    """
+    if planning_area.is_available():
+        return planning_area.resolve(latitude, longitude) or "Singapore"
+
+    return await _onemap_planning_area(latitude, longitude)
+
+@router.get("/nearby")
+async def get_nearby_hawkers(
+    lat: float = Query(..., ge=-90, le=90, description="WGS84 latitude"),
+    lng: float = Query(..., ge=-180, le=180, description="WGS84 longitude"),
+    radius: float = Query(DEFAULT_NEARBY_RADIUS_M, gt=0, le=MAX_NEARBY_RADIUS_M, description="Search radius in metres"),
+    limit: int = Query(10, ge=1, le=50),
+    include_stalls: bool = Query(False, description="Also return the stalls in each hawker centre"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Hawker centres within `radius` metres of (lat, lng), nearest first, each with
+    distance_m. Answered from the cached catalogue and an in-memory grid index;
+    the database is only queried for stalls when include_stalls=true.
+    """
+    catalogue = await hawker_catalogue.get(db, _load_catalogue)
+    index = geo_index.index_for(catalogue)
+    results = [
+        {**catalogue.items[i], "distance_m": round(distance, 1)}
+        for i, distance in index.nearest(lat, lng, radius, limit)
+    ]
+
+    if include_stalls and results:
+        # Stalls are linked to centres by postal code (stall hawker_centre names
+        # come from the SFA index and do not always match the centre names)
+        postal_of = {h["id"]: geo_index.postal_from_address(h["address"]) for h in results}
+        postals = {p for p in postal_of.values() if p}
+        rows = (await db.execute(
+            stalls_with_ratings().where(Business.postal_code.in_(postals)).order_by(Business.id)
+        )).all() if postals else []
+        open_licences, scheduled_today = await schedule_snapshot(db, now_sg())
+
+        stalls_by_postal = {}
+        for biz, count, total in rows:
+            stalls_by_postal.setdefault(biz.postal_code, []).append(
+                business_to_dto(biz, open_licences, scheduled_today, count, total)
+            )
+        for hawker in results:
+            hawker["stalls"] = stalls_by_postal.get(postal_of[hawker["id"]], [])
+
+    return results
+
 @router.get("/{hawker_id}")
-def get_hawker_by_id(hawker_id: int, db: Session = Depends(get_db)):
+async def get_hawker_by_id(hawker_id: int, db: AsyncSession = Depends(get_async_db)):
     """Return a single hawker centre by its ID."""
-    hawker = db.query(HawkerCentre).filter(HawkerCentre.id == hawker_id).first()
-    if not hawker:
+    row = (await db.execute(hawkers_with_ratings().where(HawkerCentre.id == hawker_id))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Hawker centre not found")
-    return hawker
+    return hawker_to_dto(*row)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.services import seeding
+from app.utils import http_client
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Health"]
+)
+
+@router.get("/live")
+def live():
+    """The process is up and serving requests."""
+    return {"status": "ok"}
+
+@router.get("/ready")
+def ready():
+    """200 once tables exist and SFA data is loaded; 503 with seeding progress until then."""
+    if not seeding.is_ready() and seeding.status()["status"] in ("pending", "disabled"):
+        # Seeding runs elsewhere (another worker or `python -m app.cli seed`)
+        seeding.mark_ready_if_seeded()
+
+    state = seeding.status()
+    ready = state["status"] == "ready"
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "seeding": state},
+    )
+
+@router.get("/outbound")
+def outbound():
+    """Per-host latency, failure counts and circuit state for outbound HTTP calls."""
+    return {"hosts": http_client.metrics()}
@@ -1,11 +1,11 @@
-from typing import Any, Dict, List
-from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Dict, Optional
+from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.schemas.review_schema import ReviewIn
 from app.controllers import review_controller as ctrl
 from app.dependencies import get_current_user_id
-from app.controllers.review_controller import save_review_image_file
+from app.controllers.review_controller import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ReviewSort, save_review_image_file
 
 router = APIRouter(prefix="", tags=["Reviews"])
 
@@ -25,7 +25,7 @@ async def upload_review_image(
     
     # Delegate the file saving and path generation to the controller/service layer
     try:
-        public_path = save_review_image_file(file, user_id)
+        public_path = await save_review_image_file(file, user_id)
         return {"public_path": public_path}
     except HTTPException as e:
         raise e
@@ -34,37 +34,57 @@ async def upload_review_image(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not save file on server.")
 
 @router.post("/consumers/{consumer_id}/reviews", status_code=status.HTTP_201_CREATED)
-def create_review(
+async def create_review(
     consumer_id: int, 
     payload: ReviewIn, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int = Depends(get_current_user_id)
 ):
     _check_owner_match(consumer_id, user_id)
-    return ctrl.upsert_review(db, consumer_id, payload)
+    return await ctrl.upsert_review(db, consumer_id, payload)
 
 # Delete a review (only owner)
 @router.delete("/consumers/{consumer_id}/reviews/{review_id}", status_code=status.HTTP_200_OK)
-def delete_review(
+async def delete_review(
     consumer_id: int, 
     review_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int = Depends(get_current_user_id)
 ):
     _check_owner_match(consumer_id, user_id)
-    return ctrl.delete_review(db, consumer_id, review_id)
+    return await ctrl.delete_review(db, consumer_id, review_id)
 
 # List reviews for a target (business/hawker) - PUBLIC ROUTE
-@router.get("/targets/{target_type}/{target_id}/reviews", response_model=List[Any])
-def list_reviews_for_target(target_type: str, target_id: int, db: Session = Depends(get_db)):
-    return ctrl.list_reviews_for_target(db, target_type, target_id)
+@router.get("/targets/{target_type}/{target_id}/reviews")
+async def list_reviews_for_target(
+    target_type: str,
+    target_id: int,
+    sort: ReviewSort = Query("newest", description="newest, highest or lowest rated first"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    all_reviews: bool = Query(False, alias="all", description="Return every review as a plain list (legacy, unpaginated)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    One page of reviews, each with its reviewer's username and avatar. Pass the
+    returned next_cursor as ?cursor= (with the same sort) for the following page;
+    it is null on the last page.
+    """
+    return await ctrl.list_reviews_for_target(db, target_type, target_id, sort, cursor, None if all_reviews else limit)
 
 # List reviews created by a consumer - PUBLIC ROUTE (Consumer's profile view)
-@router.get("/consumers/{consumer_id}/reviews", response_model=List[Any])
-def list_reviews_for_consumer(consumer_id: int, db: Session = Depends(get_db)):
-    return ctrl.list_reviews_for_consumer(db, consumer_id)
+@router.get("/consumers/{consumer_id}/reviews")
+async def list_reviews_for_consumer(
+    consumer_id: int,
+    sort: ReviewSort = Query("newest", description="newest, highest or lowest rated first"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    all_reviews: bool = Query(False, alias="all", description="Return every review as a plain list (legacy, unpaginated)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await ctrl.list_reviews_for_consumer(db, consumer_id, sort, cursor, None if all_reviews else limit)
 
 # Average rating for a target - PUBLIC ROUTE
 @router.get("/targets/{target_type}/{target_id}/reviews/average", response_model=Dict)
-def get_avg_rating(target_type: str, target_id: int, db: Session = Depends(get_db)):
-    return ctrl.get_avg_rating(db, target_type, target_id)
+async def get_avg_rating(target_type: str, target_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await ctrl.get_avg_rating(db, target_type, target_id)
@@ -0,0 +1,46 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
+
+from app.services import search_index, suggest_index
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Retry-After for searches made while the index is first being built
+SEARCH_RETRY_AFTER_SECONDS = 5
+
+@router.get("/")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to match against stall, menu and hawker centre names"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    type: Optional[Literal["stall", "hawker"]] = Query(None, description="Only return stalls or hawker centres"),
+):
+    """
+    Ranked full-text search over stalls (name, licensee, cuisine, hawker centre,
+    menu items) and hawker centres. Words may be partial or contain one typo.
+    503 while the index is first being built (at startup and after seeding).
+    """
+    if not search_index.ensure_built():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The search index is being built. Try again shortly.",
+            headers={"Retry-After": str(SEARCH_RETRY_AFTER_SECONDS)},
+        )
+    # Scoring is CPU work under the index lock; keep it off the event loop
+    total, items = await run_in_threadpool(search_index.search, q, limit, type)
+    return {"query": q, "total": total, "items": items}
+
+@router.get("/suggest")
+async def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100, description="What has been typed so far"),
+    limit: int = Query(suggest_index.MAX_SUGGESTIONS, ge=1, le=suggest_index.MAX_SUGGESTIONS),
+):
+    """
+    Typeahead suggestions (stall and hawker centre names, cuisines, popular
+    searches) that have a word starting with `prefix`, most popular first.
+    Empty until the suggestion index is first built (at startup and after seeding).
+    """
+    suggest_index.ensure_built()
+    return {"prefix": prefix, "items": suggest_index.suggest(prefix, limit)}
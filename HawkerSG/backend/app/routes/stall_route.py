@@ -1,12 +1,15 @@
 # app/routes/stall_route.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from datetime import datetime, time
+from typing import FrozenSet, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 import pytz
 
-from app.database import get_db
-from app.models.business_model import Business, StallStatus
-from app.models.operating_hour_model import OperatingHour
+from app.database import get_async_db
+from app.models.business_model import Business, CuisineType, StallStatus
+from app.models.review_aggregate_model import ReviewAggregate
+from app.services import image_variants, review_aggregates, schedule_index
 
 router = APIRouter(prefix="/stalls", tags=["Stalls"])
 
@@ -16,6 +19,10 @@ DAY_MAP = {
     4: "Friday", 5: "Saturday", 6: "Sunday"
 }
 
+# Page size limits for the paginated listing
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 def now_sg():
     return datetime.now(SG_TZ)
 
@@ -43,40 +50,30 @@ def now_sg():
 #             return True
 #     return False
 
-def is_business_open(biz: Business, db: Session) -> bool:
-    """Return True if current SG time is within today's operating window(s).
-    
-    NOTE: This is optimized to use the already-loaded operating_hours relationship
-    if available, eliminating the N+1 query problem.
+async def schedule_snapshot(db: AsyncSession, now: datetime) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    (open, scheduled) licence sets from the in-process schedule index. The index
+    only touches the database when it rebuilds, which runs through the async session.
     """
+    return await db.run_sync(schedule_index.snapshot, now)
 
-    today = now_sg()
-    day_name = DAY_MAP[today.weekday()]
-    
-    # -----------------------------------------------------------------
-    # OPTIMIZATION: Access the pre-loaded relationship instead of querying
-    # -----------------------------------------------------------------
-    all_operating_hours = biz.operating_hours
-    
-    # Filter the pre-loaded hours list for today's hours
-    windows = [
-        oh for oh in all_operating_hours
-        if oh.day == day_name
-    ]
-    
-    if not windows:
-        # fall back to status enum if no hours recorded
-        return biz.status == StallStatus.OPEN
-
-    tnow = today.time()
-    for w in windows:
-        start: time = w.start_time
-        end: time = w.end_time
-        if start <= tnow <= end:
-            return True
-    return False
-
-def business_to_dto(biz: Business, db: Session):
+def is_business_open(biz: Business, open_licences: FrozenSet[str], scheduled_today: FrozenSet[str]) -> bool:
+    """Return True if current SG time is within today's operating window(s).
+
+    Answered from a schedule index snapshot, so no OperatingHour rows are
+    loaded per stall.
+    """
+    return schedule_index.is_open_in(
+        biz.license_number, biz.status == StallStatus.OPEN, open_licences, scheduled_today
+    )
+
+def business_to_dto(
+    biz: Business,
+    open_licences: FrozenSet[str],
+    scheduled_today: FrozenSet[str],
+    review_count: Optional[int] = 0,
+    rating_sum: Optional[int] = 0,
+):
     return {
         "id": biz.id,
         "license_number": biz.license_number,
@@ -84,14 +81,16 @@ def business_to_dto(biz: Business, db: Session):
         "licensee_name": biz.licensee_name,
         "description": biz.description or "",
         "status": biz.status.name,
-        "is_open": is_business_open(biz, db),
+        "is_open": is_business_open(biz, open_licences, scheduled_today),
         "establishment_address": biz.establishment_address or "",
         "hawker_centre": biz.hawker_centre or "",
         "postal_code": biz.postal_code or "",
         "photo": biz.photo or "",
-        # optional placeholders your FE maps:
-        "rating": 0,
-        "review_count": 0,
+        # thumb/medium/webp URLs, None until generated (see services/image_variants.py)
+        "photo_variants": image_variants.variant_urls("business", biz.photo),
+        # maintained by the review controller, see services/review_aggregates.py
+        "rating": review_aggregates.average_rating(rating_sum, review_count),
+        "review_count": review_count or 0,
         # include raw hours if FE ever wants to draw them:
         # "hours": [{"day": oh.day, "start": oh.start_time.isoformat(), "end": oh.end_time.isoformat()} for oh in biz.operating_hours],
     }
@@ -101,23 +100,77 @@ def business_to_dto(biz: Business, db: Session):
 #     stalls = db.query(Business).all()
 #     return [business_to_dto(b, db) for b in stalls]
 
-@router.get("/", response_model=list[dict])
-def get_all_stalls(db: Session = Depends(get_db)):
-    """Return all stalls, optimized using eager loading."""
-    
-    # OPTIMIZATION: Use joinedload to fetch OperatingHour data for all stalls
-    # in a single, efficient query.
-    stalls = db.query(Business).options(
-        joinedload(Business.operating_hours)
-    ).all()
-    
-    return [business_to_dto(b, db) for b in stalls]
+def stalls_with_ratings():
+    """Select of Business rows paired with their review totals, fetched in the same query."""
+    return select(
+        Business, ReviewAggregate.review_count, ReviewAggregate.rating_sum
+    ).outerjoin(
+        ReviewAggregate,
+        and_(ReviewAggregate.target_type == "business", ReviewAggregate.target_id == Business.id),
+    )
+
+def open_now_clause(open_licences: FrozenSet[str], scheduled_today: FrozenSet[str]):
+    """SQL filter equivalent of is_business_open, built from a schedule index snapshot."""
+    # Only stalls with configured hours appear in these sets, so the IN lists stay small.
+    unscheduled_and_open = Business.status == StallStatus.OPEN
+    if scheduled_today:
+        unscheduled_and_open = and_(Business.license_number.notin_(scheduled_today), unscheduled_and_open)
+    if not open_licences:
+        return unscheduled_and_open
+    return or_(Business.license_number.in_(open_licences), unscheduled_and_open)
+
+@router.get("/")
+async def get_all_stalls(
+    cursor: Optional[int] = Query(None, ge=0, description="Return stalls with an id greater than this (next_cursor of the previous page)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    hawker_centre: Optional[str] = Query(None),
+    cuisine_type: Optional[CuisineType] = Query(None),
+    postal_code: Optional[str] = Query(None),
+    open_now: bool = Query(False, description="Only return stalls that are currently open"),
+    all_stalls: bool = Query(False, alias="all", description="Return every stall as a plain list (legacy, unpaginated)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Return one page of stalls ordered by id, using keyset pagination on Business.id.
+    Pass the returned next_cursor as ?cursor= to fetch the following page; it is
+    null on the last page. ?all=true keeps the old unpaginated list response.
+    """
+    query = stalls_with_ratings()
+    if hawker_centre:
+        query = query.where(Business.hawker_centre == hawker_centre)
+    if cuisine_type:
+        query = query.where(Business.cuisine_type == cuisine_type)
+    if postal_code:
+        query = query.where(Business.postal_code == postal_code)
+    open_licences, scheduled_today = await schedule_snapshot(db, now_sg())
+    if open_now:
+        query = query.where(open_now_clause(open_licences, scheduled_today))
+
+    if all_stalls:
+        stalls = (await db.execute(query.order_by(Business.id))).all()
+        return [business_to_dto(b, open_licences, scheduled_today, count, total) for b, count, total in stalls]
+
+    if cursor is not None:
+        query = query.where(Business.id > cursor)
+
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.execute(query.order_by(Business.id).limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "items": [business_to_dto(b, open_licences, scheduled_today, count, total) for b, count, total in rows],
+        "next_cursor": rows[-1][0].id if has_more else None,
+        "limit": limit,
+    }
 
 @router.get("/{stall_id}", response_model=dict)
-def get_stall_by_id(stall_id: int, db: Session = Depends(get_db)):
-    biz = db.query(Business).filter(Business.id == stall_id).first()
-    if not biz:
+async def get_stall_by_id(stall_id: int, db: AsyncSession = Depends(get_async_db)):
+    row = (await db.execute(stalls_with_ratings().where(Business.id == stall_id))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Stall not found")
-    return business_to_dto(biz, db)
+    biz, count, total = row
+    open_licences, scheduled_today = await schedule_snapshot(db, now_sg())
+    return business_to_dto(biz, open_licences, scheduled_today, count, total)
 
 # http://127.0.0.1:8001/stalls/?profile=true
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, computed_field, field_validator
 from app.models.business_model import CuisineType
-from typing import Literal, Optional, List
+from app.services import image_variants
+from typing import Dict, Literal, Optional, List
 from datetime import datetime, time
 from decimal import Decimal
 
@@ -47,6 +48,12 @@ class BusinessOut(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def photo_variants(self) -> Optional[Dict[str, str]]:
+        """thumb/medium/webp URLs of the photo, None until they are generated."""
+        return image_variants.variant_urls("business", self.photo)
+
 # Business Update Schema (for Manage Stall Profile) - excludes license_number
 class BusinessUpdate(BaseModel):
     stall_name: Optional[str] = None
@@ -98,6 +105,12 @@ class MenuItemOut(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def photo_variants(self) -> Optional[Dict[str, str]]:
+        """thumb/medium/webp URLs of the photo, None until they are generated."""
+        return image_variants.variant_urls("menu", self.photo)
+
 class MenuItemPatch(BaseModel):
     name: Optional[str] = Field(None, max_length=100)
     price: Optional[Decimal] = Field(None, ge=0)
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Literal, Optional
+from pydantic import BaseModel, EmailStr, ConfigDict, computed_field
+from typing import Dict, Literal, Optional
 from datetime import datetime
+from app.services import image_variants
 
 class SearchHistoryRequest(BaseModel):
     search_term: str
@@ -24,6 +25,12 @@ class ConsumerOut(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def profile_pic_variants(self) -> Optional[Dict[str, str]]:
+        """thumb/medium/webp URLs of the profile picture, None until they are generated."""
+        return image_variants.variant_urls("profiles", self.profile_pic)
+
 # --- JWT Output Schema ---
 class Consumer_Token(BaseModel):
     access_token: str
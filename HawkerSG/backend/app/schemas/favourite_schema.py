@@ -1,9 +1,12 @@
-from pydantic import BaseModel, field_validator, ConfigDict
-from typing import Literal, Optional
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
+from typing import List, Literal, Optional
 from datetime import datetime
 
 TargetType = Literal["business", "hawkercentre", "stall"]
 
+# Most targets accepted by one batch request
+MAX_BATCH_SIZE = 500
+
 class FavouriteIn(BaseModel):
     target_type: TargetType
     target_id: int
@@ -25,4 +28,16 @@ class FavouriteOut(BaseModel):
                 return datetime.fromisoformat(v.rstrip("Z"))
             except Exception:
                 return None
-        return v
\ No newline at end of file
+        return v
+class FavouriteBatchCheckIn(BaseModel):
+    targets: List[FavouriteIn] = Field(..., max_length=MAX_BATCH_SIZE)
+
+class FavouriteBatchIn(BaseModel):
+    add: List[FavouriteIn] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+    remove: List[FavouriteIn] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+
+    @model_validator(mode="after")
+    def add_and_remove_disjoint(self):
+        if {(t.target_type, t.target_id) for t in self.add} & {(t.target_type, t.target_id) for t in self.remove}:
+            raise ValueError("A target cannot be both added and removed")
+        return self
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, ConfigDict, Field, field_validator
-from typing import Literal, Optional, List
+from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator
+from typing import Dict, Literal, Optional, List
 from datetime import datetime
+from app.services.image_variants import variant_urls
 
 TargetType = Literal["business", "hawker"]
 
@@ -45,3 +46,24 @@ class ReviewOut(BaseModel):
         
         # If it's already a list (e.g., if passed directly), or None, return as is
         return v if isinstance(v, list) else []
+
+    @computed_field
+    @property
+    def image_variants(self) -> List[Optional[Dict[str, str]]]:
+        """thumb/medium/webp URLs per image (same order as images), None until generated."""
+        return [variant_urls("review", image) for image in self.images]
+
+class ReviewerOut(BaseModel):
+    id: int
+    username: Optional[str] = None
+    profile_pic: Optional[str] = None
+
+    @computed_field
+    @property
+    def profile_pic_variants(self) -> Optional[Dict[str, str]]:
+        """thumb/medium/webp URLs of the reviewer's profile picture, None until generated."""
+        return variant_urls("profiles", self.profile_pic)
+
+class ReviewListItemOut(ReviewOut):
+    """A review in a listing, with its author's name and avatar from the same query."""
+    reviewer: Optional[ReviewerOut] = None
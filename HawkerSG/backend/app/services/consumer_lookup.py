@@ -0,0 +1,21 @@
+from sqlalchemy import exists, select
+from sqlalchemy.orm import selectinload
+from app.models.consumer_model import Consumer
+
+# Statements for finding consumers, usable with both Session and AsyncSession.
+# Consumer.favourites and Consumer.reviews are never loaded implicitly (they are
+# lazy="raise_on_sql"): check a consumer exists with consumer_exists, and ask
+# consumer_by_id for the collections a caller actually uses.
+
+def consumer_exists(consumer_id: int):
+    """SELECT EXISTS on the consumers primary key; loads no User columns or relationships."""
+    return select(exists().where(Consumer.__table__.c.id == consumer_id))
+
+def consumer_by_id(consumer_id: int, favourites: bool = False, reviews: bool = False):
+    """SELECT of one Consumer, optionally with its favourites and/or reviews (one extra query each)."""
+    query = select(Consumer).where(Consumer.id == consumer_id)
+    if favourites:
+        query = query.options(selectinload(Consumer.favourites))
+    if reviews:
+        query = query.options(selectinload(Consumer.reviews))
+    return query
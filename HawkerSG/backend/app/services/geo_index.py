@@ -0,0 +1,91 @@
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# In-memory spatial index over hawker centre coordinates.
+# Points are bucketed into a fixed lat/lng grid, so a radius query only looks
+# at the cells overlapping its bounding box, then ranks the candidates with a
+# vectorized haversine distance.
+
+EARTH_RADIUS_M = 6_371_008.8
+METRES_PER_DEGREE_LAT = 111_320.0
+CELL_DEG = 0.01  # ~1.1 km cells; Singapore spans roughly 40 x 25 cells
+
+POSTAL_IN_ADDRESS = re.compile(r"S\((\d+)\)")
+
+def postal_from_address(address: Optional[str]) -> Optional[str]:
+    """Postal code from a formatted hawker centre address, e.g. '... S(48947)' -> '048947'."""
+    match = POSTAL_IN_ADDRESS.search(address or "")
+    return match.group(1).zfill(6) if match else None
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance in metres; arguments in radians, numpy-broadcastable."""
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+class GeoIndex:
+    def __init__(self, latitudes: Sequence[float], longitudes: Sequence[float]):
+        lat_deg = np.asarray(latitudes, dtype=np.float64)
+        lng_deg = np.asarray(longitudes, dtype=np.float64)
+        self.size = len(lat_deg)
+        self.lat = np.radians(lat_deg)
+        self.lng = np.radians(lng_deg)
+
+        rows = np.floor(lat_deg / CELL_DEG).astype(np.int64)
+        cols = np.floor(lng_deg / CELL_DEG).astype(np.int64)
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, key in enumerate(zip(rows.tolist(), cols.tolist())):
+            cells.setdefault(key, []).append(i)
+        self.cells = {key: np.array(members, dtype=np.int64) for key, members in cells.items()}
+        self.all = np.arange(self.size, dtype=np.int64)
+
+    def _candidates(self, lat: float, lng: float, radius_m: float) -> np.ndarray:
+        dlat = radius_m / METRES_PER_DEGREE_LAT
+        dlng = radius_m / (METRES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        row_lo, row_hi = math.floor((lat - dlat) / CELL_DEG), math.floor((lat + dlat) / CELL_DEG)
+        col_lo, col_hi = math.floor((lng - dlng) / CELL_DEG), math.floor((lng + dlng) / CELL_DEG)
+
+        # A box covering more cells than there are points is cheaper to scan whole
+        if (row_hi - row_lo + 1) * (col_hi - col_lo + 1) > max(len(self.cells), 1):
+            return self.all
+
+        found = [
+            self.cells[(row, col)]
+            for row in range(row_lo, row_hi + 1)
+            for col in range(col_lo, col_hi + 1)
+            if (row, col) in self.cells
+        ]
+        return np.concatenate(found) if found else self.all[:0]
+
+    def nearest(self, lat: float, lng: float, radius_m: float, limit: int) -> List[Tuple[int, float]]:
+        """(point index, distance in metres) within radius_m, nearest first, at most `limit`."""
+        candidates = self._candidates(lat, lng, radius_m)
+        if not len(candidates):
+            return []
+
+        distances = haversine_m(math.radians(lat), math.radians(lng), self.lat[candidates], self.lng[candidates])
+        within = distances <= radius_m
+        candidates, distances = candidates[within], distances[within]
+
+        if len(distances) > limit:
+            top = np.argpartition(distances, limit - 1)[:limit]
+            candidates, distances = candidates[top], distances[top]
+        order = np.argsort(distances, kind="stable")
+        return list(zip(candidates[order].tolist(), distances[order].tolist()))
+
+# Index over the cached hawker catalogue, rebuilt whenever the catalogue is
+_indexed_catalogue = None
+_index: Optional[GeoIndex] = None
+
+def index_for(catalogue) -> GeoIndex:
+    """GeoIndex over catalogue.items (hawker DTOs), rebuilt when the catalogue changes."""
+    global _indexed_catalogue, _index
+    if _indexed_catalogue is not catalogue:
+        items = catalogue.items
+        _index = GeoIndex([h["latitude"] for h in items], [h["longitude"] for h in items])
+        _indexed_catalogue = catalogue
+    return _index
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import time as _time
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.hawker_centre_model import HawkerCentre
+
+# Process-level cache of the serialized GET /hawkers/ payload.
+# The list only changes when the seed runs or a hawker centre review is written,
+# so it is built once and served as-is. Each rebuild is stamped with a version,
+# and the strong ETag is a hash of the bytes so every worker agrees on it.
+
+# Other worker processes do not see our invalidations, so rebuild periodically as well
+REBUILD_INTERVAL_SECONDS = 60
+CACHE_CONTROL = "public, max-age=60"
+
+class Catalogue(NamedTuple):
+    version: int
+    items: List[dict]   # treat as read-only; shared by every request
+    body: bytes
+    etag: str
+    built_at: float
+
+_version = 0
+_catalogue: Optional[Catalogue] = None
+
+def invalidate() -> None:
+    """Bumps the version; the next request rebuilds the payload from the database."""
+    global _version, _catalogue
+    _version += 1
+    _catalogue = None
+
+def current() -> Optional[Catalogue]:
+    """The cached payload, or None if it must be rebuilt. Never touches the database."""
+    catalogue = _catalogue
+    if catalogue is None or catalogue.version != _version:
+        return None
+    if _time.monotonic() - catalogue.built_at > REBUILD_INTERVAL_SECONDS:
+        return None
+    return catalogue
+
+async def get(db: AsyncSession, build: Callable[[AsyncSession], Awaitable[List[dict]]]) -> Catalogue:
+    """Returns the cached payload, rebuilding it with `build(db)` when stale."""
+    global _catalogue
+    catalogue = current()
+    if catalogue is not None:
+        return catalogue
+
+    version = _version
+    items = await build(db)
+    body = json.dumps(items, separators=(",", ":")).encode()
+    catalogue = Catalogue(
+        version=version,
+        items=items,
+        body=body,
+        etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+        built_at=_time.monotonic(),
+    )
+    # Don't store a payload built from data that was invalidated while we queried
+    if version == _version:
+        _catalogue = catalogue
+    return catalogue
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check: a list of entity tags or '*', weak tags compared weakly."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+# ORM writes to hawker_centres (the seed's bulk inserts call invalidate() itself)
+@event.listens_for(HawkerCentre, "after_insert")
+@event.listens_for(HawkerCentre, "after_update")
+@event.listens_for(HawkerCentre, "after_delete")
+def _hawker_centre_changed(mapper, connection, target):
+    invalidate()
@@ -0,0 +1,157 @@
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from PIL import Image, ImageOps
+
+# Downscaled WebP variants of uploaded photos.
+# Each photo gets a thumbnail, a medium size and a full-size WebP, written to a
+# "variants" folder beside it so the existing /static mounts serve them. They
+# are generated after upload on a small worker pool (Pillow releases the GIL
+# while resizing and encoding), and the DTOs only advertise them once the files
+# exist, so clients fall back to the original until then.
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
+
+# kind -> (photo folder, public mount in main.py)
+PHOTO_DIRS = {
+    "business": (os.path.join(ASSETS_DIR, "businessPhotos"), "/static/business"),
+    "menu": (os.path.join(ASSETS_DIR, "menuPhotos"), "/static/menu"),
+    "profiles": (os.path.join(ASSETS_DIR, "profilePhotos"), "/static/profiles"),
+    "review": (os.path.join(ASSETS_DIR, "reviewPhotos"), "/static/review"),
+}
+VARIANT_DIR = "variants"
+
+# variant -> longest edge in pixels (None keeps the original size)
+VARIANT_SIZES = {"thumb": 320, "medium": 960, "webp": None}
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+# How often a folder listing is re-read to pick up variants written by other workers
+RESCAN_SECONDS = 60
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image-variants")
+_lock = threading.Lock()
+_ready: Dict[str, set] = {}        # kind -> variant filenames on disk
+_scanned_at: Dict[str, float] = {}
+
+def variant_filenames(filename: str) -> Dict[str, str]:
+    stem = os.path.splitext(filename)[0]
+    return {name: f"{stem}.webp" if name == "webp" else f"{stem}_{name}.webp" for name in VARIANT_SIZES}
+
+def _variant_dir(kind: str) -> str:
+    return os.path.join(PHOTO_DIRS[kind][0], VARIANT_DIR)
+
+def generate(kind: str, filename: str, force: bool = False) -> Dict[str, str]:
+    """
+    Writes the variants of one photo and returns their filenames. Variants newer
+    than the photo are kept unless `force` is set.
+    """
+    source = os.path.join(PHOTO_DIRS[kind][0], filename)
+    out_dir = _variant_dir(kind)
+    os.makedirs(out_dir, exist_ok=True)
+    names = variant_filenames(filename)
+    source_mtime = os.path.getmtime(source)
+
+    pending = {
+        name: target for name, target in names.items()
+        if force or not os.path.exists(os.path.join(out_dir, target))
+        or os.path.getmtime(os.path.join(out_dir, target)) < source_mtime
+    }
+    if pending:
+        with Image.open(source) as img:
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+            # Largest first, so each smaller variant is resized from the previous one
+            for name in sorted(pending, key=lambda n: -(VARIANT_SIZES[n] or 1 << 30)):
+                size = VARIANT_SIZES[name]
+                if size:
+                    img.thumbnail((size, size), Image.Resampling.LANCZOS)
+                target = os.path.join(out_dir, pending[name])
+                tmp = target + ".tmp"
+                img.save(tmp, "WEBP", quality=WEBP_QUALITY, method=4)
+                os.replace(tmp, target)
+
+    with _lock:
+        _ready.setdefault(kind, set()).update(names.values())
+    return names
+
+def _generate_logged(kind: str, filename: str) -> None:
+    try:
+        generate(kind, filename)
+    except Exception as e:
+        print(f"Warning: Failed to create image variants for {kind}/{filename}. Error: {e}")
+
+def schedule(kind: str, filename: Optional[str]) -> Optional[Future]:
+    """Queues variant generation for a newly saved photo."""
+    if not filename:
+        return None
+    return _executor.submit(_generate_logged, kind, filename)
+
+def remove(kind: str, filename: Optional[str]) -> None:
+    """Deletes the variants of a photo that is being replaced or removed."""
+    if not filename:
+        return
+    for target in variant_filenames(filename).values():
+        path = os.path.join(_variant_dir(kind), target)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"Warning: Failed to delete image variant {path}. Error: {e}")
+        with _lock:
+            _ready.get(kind, set()).discard(target)
+
+def _ready_names(kind: str) -> set:
+    now = time.monotonic()
+    with _lock:
+        if now - _scanned_at.get(kind, float("-inf")) < RESCAN_SECONDS:
+            return _ready[kind]
+    try:
+        names = set(os.listdir(_variant_dir(kind)))
+    except FileNotFoundError:
+        names = set()
+    with _lock:
+        _ready[kind] = names | _ready.get(kind, set())
+        _scanned_at[kind] = now
+        return _ready[kind]
+
+def variant_urls(kind: str, photo: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    URLs of the variants of `photo` (a stored filename, public path or absolute
+    URL), or None until they have all been generated.
+    """
+    if not photo:
+        return None
+    filename = os.path.basename(urlsplit(photo).path)
+    if not filename.lower().endswith(IMAGE_EXTENSIONS):
+        return None
+    names = variant_filenames(filename)
+    ready = _ready_names(kind)
+    if not all(name in ready for name in names.values()):
+        return None
+
+    # Keep the form of the stored value: bare filenames get the mount path
+    prefix = photo[:-len(filename)] if photo.endswith(filename) and "/" in photo else f"{PHOTO_DIRS[kind][1]}/"
+    return {name: f"{prefix}{VARIANT_DIR}/{target}" for name, target in names.items()}
+
+def backfill(kind: str, force: bool = False) -> int:
+    """Generates missing variants for every photo in a folder. Returns the number of photos processed."""
+    photo_dir = PHOTO_DIRS[kind][0]
+    filenames = sorted(
+        f for f in os.listdir(photo_dir)
+        if f.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(photo_dir, f))
+    ) if os.path.isdir(photo_dir) else []
+
+    def run(filename):
+        try:
+            generate(kind, filename, force)
+            return True
+        except Exception as e:
+            print(f"Skipped {filename}: {e}")
+            return False
+
+    return sum(_executor.map(run, filenames))
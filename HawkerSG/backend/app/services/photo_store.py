@@ -0,0 +1,192 @@
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import BinaryIO, Iterable, List, Optional
+from urllib.parse import urlsplit
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.models.stored_photo_model import PendingUpload, StoredPhoto
+from app.services import image_variants, uploads
+from app.utils.file_lock import exclusive_lock
+
+# Content-addressed photo storage.
+# Uploaded photos are saved as `<sha256>.<ext>` in their kind's folder, so an
+# image uploaded twice is stored once and a name always means the same bytes.
+# Content never changes under a stored name, so the static mounts serve these
+# files (and their variants) as immutable.
+# stored_photos counts the references to each file: a fresh upload holds one,
+# which passes to the row that takes the filename, and release() drops one when
+# a row lets go. The file and its variants are deleted at zero.
+# Photos whose path comes back from the client (review photos) are uploaded with
+# an owner: the upload's reference is parked in pending_uploads, and only that
+# user can attach it (claim_pending). Unclaimed uploads expire after
+# PENDING_UPLOAD_TTL and give their reference up. Adding a
+# reference and deleting at zero both happen under a per-folder lock shared by
+# all workers, so a concurrent upload of the same image cannot lose its file.
+#
+# Photos saved before this store (seed photos, timestamped uploads) have no
+# stored_photos row and are never deleted by it; several stalls share them.
+
+# A stored name, or a variant of one: 64 hex digits then "." or "_"
+_DIGEST_NAME = re.compile(r"^[0-9a-f]{64}[._]")
+
+LOCK_FILENAME = ".photo-refs.lock"
+
+# How long an owned upload waits to be attached before expire_pending releases it
+PENDING_UPLOAD_TTL = timedelta(hours=24)
+
+_thread_lock = threading.Lock()
+
+# Replaced in tests
+_session_factory = SessionLocal
+
+def is_content_addressed(filename: Optional[str]) -> bool:
+    return bool(filename) and bool(_DIGEST_NAME.match(filename))
+
+def _filename(photo: Optional[str]) -> str:
+    """The stored filename of a photo given as a filename, public path or absolute URL."""
+    return os.path.basename(urlsplit(photo or "").path)
+
+@contextmanager
+def _locked(kind: str):
+    photo_dir = image_variants.PHOTO_DIRS[kind][0]
+    os.makedirs(photo_dir, exist_ok=True)
+    with _thread_lock, exclusive_lock(os.path.join(photo_dir, LOCK_FILENAME)):
+        yield
+
+def _add_reference(db, kind: str, filename: str) -> None:
+    stmt = (
+        update(StoredPhoto)
+        .where(StoredPhoto.kind == kind, StoredPhoto.filename == filename)
+        .values(ref_count=StoredPhoto.ref_count + 1)
+    )
+    if not db.execute(stmt).rowcount:
+        db.execute(insert(StoredPhoto).values(kind=kind, filename=filename, ref_count=1))
+
+def store(
+    source: BinaryIO, kind: str, max_bytes: int, allowed_types: Iterable[str] = uploads.EXTENSIONS,
+    owner_id: Optional[int] = None,
+) -> str:
+    """
+    Streams an image into the `kind` folder under its content hash and returns the
+    filename, holding one reference for the caller. Identical images share a file.
+    With `owner_id` the reference is held by a pending upload that only that user
+    can claim.
+    """
+    photo_dir = image_variants.PHOTO_DIRS[kind][0]
+    # The slow part (reading, hashing, writing) runs outside the lock
+    tmp_path, mime_type, digest = uploads.receive_image(source, photo_dir, max_bytes, allowed_types)
+    filename = f"{digest}.{uploads.EXTENSIONS[mime_type]}"
+    try:
+        with _locked(kind):
+            target = os.path.join(photo_dir, filename)
+            is_new = not os.path.exists(target)
+            if is_new:
+                os.replace(tmp_path, target)
+            with _session_factory() as db:
+                _add_reference(db, kind, filename)
+                if owner_id is not None:
+                    db.add(PendingUpload(
+                        kind=kind, filename=filename, owner_id=owner_id,
+                        expires_at=datetime.utcnow() + PENDING_UPLOAD_TTL,
+                    ))
+                db.commit()
+    finally:
+        uploads.discard(tmp_path)
+
+    if is_new:
+        # Thumbnail/medium/WebP variants are made in the background
+        image_variants.schedule(kind, filename)
+    return filename
+
+async def save(
+    upload: UploadFile, kind: str, max_bytes: int, allowed_types: Iterable[str] = uploads.EXTENSIONS,
+    owner_id: Optional[int] = None,
+) -> str:
+    """store() for a FastAPI upload, run off the event loop."""
+    await upload.seek(0)
+    return await run_in_threadpool(store, upload.file, kind, max_bytes, allowed_types, owner_id)
+
+async def claim_pending(db: AsyncSession, kind: str, owner_id: int, photos: Iterable[str]) -> None:
+    """
+    Moves the references of `owner_id`'s pending uploads of `photos` to the row being
+    written in `db`; they commit or roll back with it. Raises 400 for a photo that
+    is not an unexpired upload of this owner (e.g. another user's public path).
+    """
+    now = datetime.utcnow()
+    for photo in photos:
+        pending_id = await db.scalar(select(PendingUpload.id).where(
+            PendingUpload.kind == kind,
+            PendingUpload.owner_id == owner_id,
+            PendingUpload.filename == _filename(photo),
+            PendingUpload.expires_at > now,
+        ).limit(1))
+        # A concurrent request may claim the same upload first; only one delete wins
+        if pending_id is None or not (await db.execute(
+            delete(PendingUpload).where(PendingUpload.id == pending_id)
+        )).rowcount:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Photo {photo} is not one of your uploads, or it has expired. Upload it again.",
+            )
+
+def expire_pending(now: Optional[datetime] = None) -> int:
+    """Releases uploads that were never claimed within PENDING_UPLOAD_TTL. Returns how many."""
+    with _session_factory() as db:
+        expired = db.execute(
+            select(PendingUpload.id, PendingUpload.kind, PendingUpload.filename)
+            .where(PendingUpload.expires_at <= (now or datetime.utcnow()))
+        ).all()
+        released: List[tuple] = []
+        for pending_id, kind, filename in expired:
+            # Skip uploads claimed since the select
+            if db.execute(delete(PendingUpload).where(PendingUpload.id == pending_id)).rowcount:
+                released.append((kind, filename))
+        db.commit()
+    for kind, filename in released:
+        release(kind, filename)
+    return len(released)
+
+async def expire_pending_async() -> int:
+    """expire_pending() run off the event loop."""
+    return await run_in_threadpool(expire_pending)
+
+def release(kind: str, photo: Optional[str]) -> bool:
+    """
+    Drops one reference to a stored photo, deleting the file and its variants when
+    none are left. Call after the change that stopped using it is committed.
+    Returns True if the file was deleted; photos outside the store are left alone.
+    """
+    filename = _filename(photo)
+    if not is_content_addressed(filename):
+        return False
+
+    with _locked(kind):
+        with _session_factory() as db:
+            key = (StoredPhoto.kind == kind, StoredPhoto.filename == filename)
+            db.execute(update(StoredPhoto).where(*key).values(ref_count=StoredPhoto.ref_count - 1))
+            remaining = db.scalar(select(StoredPhoto.ref_count).where(*key))
+            if remaining is None or remaining > 0:
+                db.commit()
+                return False
+            db.execute(delete(StoredPhoto).where(*key))
+            db.commit()
+
+        path = os.path.join(image_variants.PHOTO_DIRS[kind][0], filename)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"Warning: Failed to delete photo {path}. Error: {e}")
+        image_variants.remove(kind, filename)
+    return True
+
+async def release_async(kind: str, photo: Optional[str]) -> bool:
+    """release() run off the event loop."""
+    return await run_in_threadpool(release, kind, photo)
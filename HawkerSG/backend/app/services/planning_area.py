@@ -0,0 +1,156 @@
+import json
+import math
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Local planning-area lookup from URA Master Plan planning-area polygons.
+# Polygons are loaded once from a GeoJSON file and bucketed into a grid by
+# bounding box, so a lookup only runs point-in-polygon tests against the few
+# areas whose boxes cover the point. Results are memoised per ~11 m cell.
+#
+# The file is produced by `python -m app.cli fetch-planning-areas`.
+
+PLANNING_AREAS_PATH = os.getenv(
+    "PLANNING_AREAS_GEOJSON",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "data", "planning_areas.geojson"),
+)
+# URA Master Plan 2019 Planning Area Boundary (No Sea), GeoJSON, on data.gov.sg
+DATA_GOV_DATASET_ID = "d_4765db0e87b9c86336792efe8a1f7a66"
+DATA_GOV_DOWNLOAD_URL = "https://api-open.data.gov.sg/v1/public/api/datasets/{}/poll-download"
+CELL_DEG = 0.02
+LOOKUP_DECIMALS = 4   # lat/lng rounding for the LRU cache (~11 m)
+LOOKUP_CACHE_SIZE = 4096
+
+# Older data.gov.sg exports keep attributes in an HTML table in "Description"
+_DESCRIPTION_NAME = re.compile(r"<th>PLN_AREA_N</th>\s*<td>([^<]*)</td>", re.IGNORECASE)
+
+def format_area_name(raw: str) -> str:
+    """"BUKIT PANJANG" -> "Bukit Panjang", as returned to the frontend."""
+    return " ".join(word.capitalize() for word in raw.lower().split())
+
+def _feature_name(properties: Dict) -> Optional[str]:
+    for key in ("PLN_AREA_N", "pln_area_n", "name"):
+        if properties.get(key):
+            return properties[key]
+    match = _DESCRIPTION_NAME.search(properties.get("Description") or "")
+    return match.group(1) if match else None
+
+def _polygons(geometry: Dict) -> List[List[np.ndarray]]:
+    """Polygon/MultiPolygon -> list of polygons, each a list of (n, 2) lng/lat ring arrays."""
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return []
+    return [[np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon] for polygon in polygons]
+
+def _inside(lng: float, lat: float, rings: List[np.ndarray]) -> bool:
+    """Even-odd ray casting over all rings, so holes are excluded."""
+    crossings = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for ring in rings:
+            x1, y1 = ring[:, 0], ring[:, 1]
+            x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+            spans = (y1 > lat) != (y2 > lat)
+            x_cross = (x2 - x1) * (lat - y1) / (y2 - y1) + x1
+            crossings += int(np.count_nonzero(spans & (lng < x_cross)))
+    return crossings % 2 == 1
+
+class PlanningAreaIndex:
+    def __init__(self, features: List[Dict]):
+        # (name, rings, (min_lng, min_lat, max_lng, max_lat)) per polygon
+        self.polygons: List[Tuple[str, List[np.ndarray], Tuple[float, float, float, float]]] = []
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+        for feature in features:
+            name = _feature_name(feature.get("properties") or {})
+            if not name or not feature.get("geometry"):
+                continue
+            for rings in _polygons(feature["geometry"]):
+                outer = rings[0]
+                bbox = (outer[:, 0].min(), outer[:, 1].min(), outer[:, 0].max(), outer[:, 1].max())
+                position = len(self.polygons)
+                self.polygons.append((format_area_name(name), rings, bbox))
+                for row in range(math.floor(bbox[1] / CELL_DEG), math.floor(bbox[3] / CELL_DEG) + 1):
+                    for col in range(math.floor(bbox[0] / CELL_DEG), math.floor(bbox[2] / CELL_DEG) + 1):
+                        self.cells.setdefault((row, col), []).append(position)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PlanningAreaIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f).get("features", []))
+
+    def lookup(self, lat: float, lng: float) -> Optional[str]:
+        """Name of the planning area containing the point, or None."""
+        for position in self.cells.get((math.floor(lat / CELL_DEG), math.floor(lng / CELL_DEG)), ()):
+            name, rings, (min_lng, min_lat, max_lng, max_lat) = self.polygons[position]
+            if min_lng <= lng <= max_lng and min_lat <= lat <= max_lat and _inside(lng, lat, rings):
+                return name
+        return None
+
+_lock = threading.Lock()
+_index: Optional[PlanningAreaIndex] = None
+_loaded = False
+
+def get_index() -> Optional[PlanningAreaIndex]:
+    """The loaded index, or None when no planning-area file is available."""
+    global _index, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                try:
+                    _index = PlanningAreaIndex.from_file(PLANNING_AREAS_PATH)
+                    print(f"Loaded {len(_index.polygons)} planning-area polygons from {PLANNING_AREAS_PATH}")
+                except FileNotFoundError:
+                    print(f"Planning-area file not found at {PLANNING_AREAS_PATH}; using OneMap for lookups.")
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Could not load planning areas from {PLANNING_AREAS_PATH}: {e}")
+                _loaded = True
+    return _index
+
+def use_index(index: Optional[PlanningAreaIndex]) -> None:
+    """Replaces the loaded index (e.g. after fetching a new file, or in tests)."""
+    global _index, _loaded
+    with _lock:
+        _index, _loaded = index, True
+    _cached_lookup.cache_clear()
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _cached_lookup(lat: float, lng: float) -> Optional[str]:
+    return _index.lookup(lat, lng)
+
+def compact_geojson(geojson: Dict, decimals: int = 6) -> Dict:
+    """Keeps only the area name and 2D coordinates rounded to `decimals` (~0.1 m), to keep the bundled file small."""
+    def round_rings(polygon):
+        return [[[round(x, decimals), round(y, decimals)] for x, y, *_ in ring] for ring in polygon]
+
+    features = []
+    for feature in geojson.get("features", []):
+        name = _feature_name(feature.get("properties") or {})
+        geometry = feature.get("geometry") or {}
+        if not name or geometry.get("type") not in ("Polygon", "MultiPolygon"):
+            continue
+        if geometry["type"] == "Polygon":
+            coordinates = round_rings(geometry["coordinates"])
+        else:
+            coordinates = [round_rings(polygon) for polygon in geometry["coordinates"]]
+        features.append({
+            "type": "Feature",
+            "properties": {"PLN_AREA_N": name},
+            "geometry": {"type": geometry["type"], "coordinates": coordinates},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+def is_available() -> bool:
+    return get_index() is not None
+
+def resolve(latitude: float, longitude: float) -> Optional[str]:
+    """Planning area for a point, from the local polygons. None if outside every area."""
+    if get_index() is None:
+        return None
+    return _cached_lookup(round(latitude, LOOKUP_DECIMALS), round(longitude, LOOKUP_DECIMALS))
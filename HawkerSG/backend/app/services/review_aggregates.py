@@ -0,0 +1,67 @@
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.review_aggregate_model import ReviewAggregate
+from app.models.review_model import Review
+
+def average_rating(rating_sum, review_count) -> float:
+    """Average star rating rounded to 2 dp; 0.0 when there are no reviews."""
+    if not review_count:
+        return 0.0
+    return round(rating_sum / review_count, 2)
+
+def apply_delta(db: Session, target_type: str, target_id: int, count_delta: int, rating_delta: int) -> None:
+    """
+    Adjusts a target's totals inside the caller's transaction (the caller commits).
+    Uses an in-place UPDATE so concurrent writers never overwrite each other.
+    """
+    if count_delta == 0 and rating_delta == 0:
+        return
+
+    stmt = (
+        update(ReviewAggregate)
+        .where(ReviewAggregate.target_type == target_type, ReviewAggregate.target_id == target_id)
+        .values(
+            review_count=ReviewAggregate.review_count + count_delta,
+            rating_sum=ReviewAggregate.rating_sum + rating_delta,
+        )
+    )
+    if db.execute(stmt).rowcount:
+        return
+
+    # First review for this target: create the row. If another writer created
+    # it between our UPDATE and INSERT, fall back to the UPDATE.
+    try:
+        with db.begin_nested():
+            db.execute(insert(ReviewAggregate).values(
+                target_type=target_type,
+                target_id=target_id,
+                review_count=count_delta,
+                rating_sum=rating_delta,
+            ))
+    except IntegrityError:
+        db.execute(stmt)
+
+def rebuild(db: Session) -> int:
+    """Recomputes every aggregate from the reviews table in one statement. Returns the row count."""
+    db.execute(delete(ReviewAggregate))
+    totals = select(
+        Review.target_type,
+        Review.target_id,
+        func.count(Review.id),
+        func.coalesce(func.sum(Review.star_rating), 0),
+    ).group_by(Review.target_type, Review.target_id)
+    db.execute(insert(ReviewAggregate).from_select(
+        ["target_type", "target_id", "review_count", "rating_sum"], totals
+    ))
+    db.commit()
+    return db.scalar(select(func.count()).select_from(ReviewAggregate))
+
+def rebuild_if_empty(db: Session) -> None:
+    """Backfills aggregates for databases created before the table existed."""
+    if db.scalar(select(ReviewAggregate.target_id).limit(1)) is not None:
+        return
+    if db.scalar(select(Review.id).limit(1)) is None:
+        return
+    count = rebuild(db)
+    print(f"Rebuilt {count} review aggregates from existing reviews.")
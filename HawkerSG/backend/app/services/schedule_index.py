@@ -0,0 +1,153 @@
+import threading
+import time as _time
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, FrozenSet, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models.operating_hour_model import OperatingHour
+
+# In-process index of stall operating hours.
+# Every window is stored as a [start, end] interval in minutes since Monday 00:00,
+# so "which stalls are open at time T" is a single pass over sorted intervals
+# instead of loading OperatingHour rows per stall.
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DAY_INDEX = {
+    "Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3,
+    "Friday": 4, "Saturday": 5, "Sunday": 6,
+}
+
+# Other worker processes do not see our invalidations, so rebuild periodically as well
+REBUILD_INTERVAL_SECONDS = 60
+
+class _Snapshot(NamedTuple):
+    starts: Tuple[int, ...]                          # sorted window start minutes
+    windows: Tuple[Tuple[int, int, str], ...]        # (start, end, license_number), same order as starts
+    scheduled_by_day: Dict[int, FrozenSet[str]]      # weekday -> licences with any window that day
+    generation: int                                  # value of _generation when the rows were read
+    built_at: float
+
+# Readers take _snapshot once and use only that object, so a concurrent rebuild or
+# invalidate() never changes the data under them. invalidate() bumps _generation,
+# which marks every older snapshot stale without removing it.
+_lock = threading.Lock()
+_rebuilding = threading.Lock()  # only ever tried without blocking
+_generation = 0
+_snapshot = _Snapshot((), (), {}, -1, 0.0)
+_open_cache: Tuple[Optional[_Snapshot], int, FrozenSet[str]] = (None, -1, frozenset())
+
+def minute_of_week(when: datetime) -> int:
+    return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+def invalidate() -> None:
+    """Marks the index stale; the next lookup rebuilds it from the database."""
+    global _generation
+    with _lock:
+        _generation += 1
+
+def _is_stale(snap: _Snapshot) -> bool:
+    return snap.generation != _generation or _time.monotonic() - snap.built_at > REBUILD_INTERVAL_SECONDS
+
+def _build(db: Session, generation: int) -> _Snapshot:
+    rows = db.query(
+        OperatingHour.license_number,
+        OperatingHour.day,
+        OperatingHour.start_time,
+        OperatingHour.end_time,
+    ).all()
+
+    windows = []
+    scheduled: Dict[int, set] = {}
+    for license_number, day, start_time, end_time in rows:
+        day_idx = DAY_INDEX.get(day)
+        if day_idx is None:
+            continue
+        start = day_idx * MINUTES_PER_DAY + start_time.hour * 60 + start_time.minute
+        end = day_idx * MINUTES_PER_DAY + end_time.hour * 60 + end_time.minute
+        if end < start:
+            # Overnight window, e.g. 18:00-02:00 runs into the next day
+            end += MINUTES_PER_DAY
+        windows.append((start, end, license_number))
+        scheduled.setdefault(day_idx, set()).add(license_number)
+
+    windows.sort()
+    return _Snapshot(
+        starts=tuple(w[0] for w in windows),
+        windows=tuple(windows),
+        scheduled_by_day={day: frozenset(licences) for day, licences in scheduled.items()},
+        generation=generation,
+        built_at=_time.monotonic(),
+    )
+
+def _ensure_built(db: Session) -> _Snapshot:
+    global _snapshot
+    snap = _snapshot
+    if not _is_stale(snap):
+        return snap
+    # When the index has only aged past REBUILD_INTERVAL_SECONDS, one caller rebuilds
+    # while the rest keep using it. After invalidate() everyone reads fresh data.
+    generation = _generation
+    refreshing = snap.generation == generation
+    if refreshing and not _rebuilding.acquire(blocking=False):
+        return snap
+    try:
+        # No lock is held while querying: under AsyncSession.run_sync this runs on the
+        # event loop, and a caller blocked on a lock there would stop the query finishing
+        fresh = _build(db, generation)
+    finally:
+        if refreshing:
+            _rebuilding.release()
+    with _lock:
+        # Never replace a snapshot of newer data with an older one
+        if fresh.generation >= _snapshot.generation:
+            _snapshot = fresh
+    return fresh
+
+def _open_at_minute(snap: _Snapshot, minute: int) -> FrozenSet[str]:
+    # Windows that started at or before `minute` (and, for windows wrapping past
+    # Sunday midnight, at or before `minute` + one week) and have not ended yet.
+    open_now = set()
+    for probe in (minute, minute + MINUTES_PER_WEEK):
+        for start, end, license_number in snap.windows[:bisect_right(snap.starts, probe)]:
+            if probe <= end:
+                open_now.add(license_number)
+    return frozenset(open_now)
+
+def _open_in(snap: _Snapshot, minute: int) -> FrozenSet[str]:
+    global _open_cache
+    # Keyed on the snapshot too, so a result computed from an older snapshot is never served
+    cached_snap, cached_minute, cached = _open_cache
+    if cached_snap is snap and cached_minute == minute:
+        return cached
+    result = _open_at_minute(snap, minute)
+    _open_cache = (snap, minute, result)
+    return result
+
+def open_license_numbers(db: Session, when: datetime) -> FrozenSet[str]:
+    """Returns the licence numbers whose operating hours cover `when`."""
+    return _open_in(_ensure_built(db), minute_of_week(when))
+
+def scheduled_license_numbers(db: Session, when: datetime) -> FrozenSet[str]:
+    """Returns the licence numbers that have any operating hours on `when`'s weekday."""
+    return _ensure_built(db).scheduled_by_day.get(when.weekday(), frozenset())
+
+def snapshot(db: Session, when: datetime) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """(open, scheduled) licence sets at `when`, for checking many stalls with is_open_in."""
+    snap = _ensure_built(db)
+    return _open_in(snap, minute_of_week(when)), snap.scheduled_by_day.get(when.weekday(), frozenset())
+
+def is_open_in(license_number: str, status_open: bool, open_licences: FrozenSet[str], scheduled: FrozenSet[str]) -> bool:
+    """
+    Open if a window covers the snapshot time. Stalls without hours for the day
+    fall back to their manual OPEN/CLOSED status.
+    """
+    if license_number in open_licences:
+        return True
+    if license_number in scheduled:
+        return False
+    return status_open
+
+def is_open(db: Session, license_number: str, status_open: bool, when: datetime) -> bool:
+    """is_open_in for a single stall at `when`."""
+    return is_open_in(license_number, status_open, *snapshot(db, when))
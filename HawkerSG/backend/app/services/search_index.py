@@ -0,0 +1,374 @@
+import heapq
+import math
+import re
+import threading
+import time as _time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.business_model import Business
+from app.models.hawker_centre_model import HawkerCentre
+from app.models.menu_item_model import MenuItem
+
+# In-process full-text index over stalls, their menus and hawker centres.
+# An inverted index (term -> {document: weighted term frequency}) is ranked
+# with BM25. Each query word also matches the terms it is a prefix of (for
+# search-as-you-type) and terms one edit away (typos; the scraped data has
+# its own misspellings, so this applies to known words too), found through a
+# map of single-character deletions instead of comparing against the whole
+# vocabulary. Every query word must match.
+#
+# The controllers re-index a stall after each committed change, so this
+# process sees its own writes at once. Other worker processes pick them up
+# on the periodic background rebuild.
+
+Key = Tuple[str, int]  # ("stall", Business.id) or ("hawker", HawkerCentre.id)
+
+# How much a match in each field counts towards a document's score
+FIELD_WEIGHTS = {
+    "stall_name": 3.0,
+    "licensee_name": 1.0,
+    "hawker_centre": 1.5,
+    "cuisine_type": 1.5,
+    "menu_name": 2.0,
+    "menu_description": 0.5,
+    "name": 3.0,  # hawker centre name
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score multipliers for words matched as a prefix or with a typo
+PREFIX_WEIGHT = 0.7
+TYPO_WEIGHT = 0.5
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 50   # most frequent completions of a short prefix
+MIN_TYPO_LENGTH = 4
+
+# Other worker processes do not see our updates, so rebuild periodically as well
+REBUILD_INTERVAL_SECONDS = 300
+
+_WORD = re.compile(r"[^\W_]+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased words with accents removed."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WORD.findall(text.lower())
+
+def _deletes(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion, substitution or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return len(diffs) == 2 and diffs[1] == diffs[0] + 1 and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+class SearchIndex:
+    """Inverted index with BM25 ranking, prefix matching and one-typo tolerance."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Key, float]] = {}
+        self._doc_terms: Dict[Key, Dict[str, float]] = {}
+        self._doc_length: Dict[Key, float] = {}
+        self._payloads: Dict[Key, dict] = {}
+        self._total_length = 0.0
+        self._vocabulary: List[str] = []          # sorted, for prefix lookups
+        self._deletions: Dict[str, Set[str]] = {}  # term minus one character -> terms
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def upsert(self, key: Key, fields: Iterable[Tuple[str, Optional[str]]], payload: dict) -> None:
+        """(Re)indexes a document from (field, text) pairs; `payload` is returned with its hits."""
+        self.remove(key)
+        frequencies: Dict[str, float] = {}
+        for field, text in fields:
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+        if not frequencies:
+            return
+
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._add_term(term)
+            postings[key] = frequency
+        self._doc_terms[key] = frequencies
+        self._doc_length[key] = sum(frequencies.values())
+        self._total_length += self._doc_length[key]
+        self._payloads[key] = payload
+
+    def remove(self, key: Key) -> None:
+        frequencies = self._doc_terms.pop(key, None)
+        if frequencies is None:
+            return
+        for term in frequencies:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+                self._remove_term(term)
+        self._total_length -= self._doc_length.pop(key)
+        del self._payloads[key]
+
+    def _add_term(self, term: str) -> None:
+        insort(self._vocabulary, term)
+        if len(term) >= MIN_TYPO_LENGTH - 1:
+            for deletion in _deletes(term):
+                self._deletions.setdefault(deletion, set()).add(term)
+
+    def _remove_term(self, term: str) -> None:
+        i = bisect_left(self._vocabulary, term)
+        if i < len(self._vocabulary) and self._vocabulary[i] == term:
+            del self._vocabulary[i]
+        if len(term) >= MIN_TYPO_LENGTH - 1:
+            for deletion in _deletes(term):
+                terms = self._deletions.get(deletion)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._deletions[deletion]
+
+    def _prefix_terms(self, word: str) -> List[str]:
+        start = bisect_left(self._vocabulary, word)
+        end = bisect_left(self._vocabulary, word + "\U0010ffff", start)
+        terms = self._vocabulary[start:end]
+        if len(terms) > MAX_PREFIX_EXPANSIONS:
+            terms = heapq.nlargest(MAX_PREFIX_EXPANSIONS, terms, key=lambda t: len(self._postings[t]))
+        return terms
+
+    def _typo_terms(self, word: str) -> Set[str]:
+        candidates: Set[str] = set(self._deletions.get(word, ()))   # word is missing a character
+        for deletion in _deletes(word):
+            if deletion in self._postings:                           # word has an extra character
+                candidates.add(deletion)
+            candidates.update(self._deletions.get(deletion, ()))    # substituted or swapped character
+        return {term for term in candidates if _within_one_edit(word, term)}
+
+    def expand(self, word: str) -> Dict[str, float]:
+        """Index terms a query word matches, with their score multiplier."""
+        matches: Dict[str, float] = {}
+        if word in self._postings:
+            matches[word] = 1.0
+        if len(word) >= MIN_PREFIX_LENGTH:
+            for term in self._prefix_terms(word):
+                matches.setdefault(term, PREFIX_WEIGHT)
+        if len(word) >= MIN_TYPO_LENGTH:
+            for term in self._typo_terms(word):
+                matches.setdefault(term, TYPO_WEIGHT)
+        return matches
+
+    def search(self, query: str, limit: int = 20, kind: Optional[str] = None) -> Tuple[int, List[Tuple[float, dict]]]:
+        """(number of matches, top `limit` (score, payload) pairs) for documents matching every query word."""
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words or not self._doc_terms:
+            return 0, []
+
+        doc_count = len(self._doc_terms)
+        average_length = self._total_length / doc_count
+        scores: Optional[Dict[Key, float]] = None
+        for word in words:
+            word_scores: Dict[Key, float] = {}
+            for term, multiplier in self.expand(word).items():
+                postings = self._postings[term]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, frequency in postings.items():
+                    if kind is not None and key[0] != kind:
+                        continue
+                    if scores is not None and key not in scores:
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_length[key] / average_length)
+                    score = multiplier * idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                    if score > word_scores.get(key, 0.0):
+                        word_scores[key] = score
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {key: scores[key] + score for key, score in word_scores.items()}
+            if not scores:
+                return 0, []
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return len(scores), [(score, self._payloads[key]) for key, score in top]
+
+# --- Documents ---
+
+def _cuisine(value) -> Optional[str]:
+    return getattr(value, "value", value)
+
+def stall_document(business, menu_items: Iterable[Tuple[str, Optional[str]]]) -> Tuple[Key, list, dict]:
+    """(key, fields, payload) for a Business row (or a row with the same attributes)."""
+    fields = [
+        ("stall_name", business.stall_name),
+        ("licensee_name", business.licensee_name),
+        ("hawker_centre", business.hawker_centre),
+        ("cuisine_type", _cuisine(business.cuisine_type)),
+    ]
+    for name, description in menu_items:
+        fields.append(("menu_name", name))
+        fields.append(("menu_description", description))
+    payload = {
+        "type": "stall",
+        "id": business.id,
+        "license_number": business.license_number,
+        "name": business.stall_name or business.licensee_name or "",
+        "hawker_centre": business.hawker_centre or "",
+        "cuisine_type": _cuisine(business.cuisine_type),
+        "photo": business.photo or "",
+    }
+    return ("stall", business.id), fields, payload
+
+def hawker_document(centre) -> Tuple[Key, list, dict]:
+    payload = {"type": "hawker", "id": centre.id, "name": centre.name, "image": centre.image or ""}
+    return ("hawker", centre.id), [("name", centre.name)], payload
+
+_STALL_COLUMNS = (
+    Business.id, Business.license_number, Business.stall_name, Business.licensee_name,
+    Business.hawker_centre, Business.cuisine_type, Business.photo,
+)
+
+def build(db: Session) -> SearchIndex:
+    """Indexes every stall, menu item and hawker centre in three queries."""
+    menus: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+    for license_number, name, description in db.execute(
+        select(MenuItem.license_number, MenuItem.name, MenuItem.description)
+    ):
+        menus.setdefault(license_number, []).append((name, description))
+
+    index = SearchIndex()
+    for row in db.execute(select(*_STALL_COLUMNS)):
+        index.upsert(*stall_document(row, menus.get(row.license_number, ())))
+    for row in db.execute(select(HawkerCentre.id, HawkerCentre.name, HawkerCentre.image)):
+        index.upsert(*hawker_document(row))
+    return index
+
+# --- Process-wide index ---
+
+# The index is only ever built by one background thread at a time, with its own
+# session: a full build takes a while on the seeded data, and must not run on
+# the event loop or once per concurrent request. Searches made before the first
+# build finishes are answered 503 (see the route).
+
+# Replaced in tests
+_session_factory = SessionLocal
+
+# _lock guards the module state and the index's contents; it is never held while the database is read
+_lock = threading.Lock()
+_index: Optional[SearchIndex] = None
+_built_at = 0.0
+_rebuilding = False
+_rebuild_again = False  # warm() was called during a build, which may have read older data
+_builds = 0  # builds reading the database right now
+_pending: List[Tuple[Key, list, dict]] = []  # updates made while a build was reading the database
+
+def invalidate() -> None:
+    """Drops the index; the next search starts a rebuild."""
+    global _index
+    with _lock:
+        _index = None
+
+def _build_and_publish(db: Session) -> None:
+    global _index, _built_at, _builds
+    with _lock:
+        _builds += 1
+    try:
+        index = build(db)
+        with _lock:
+            # Re-apply stalls changed while we were reading; their documents are newer
+            for key, fields, payload in _pending:
+                index.upsert(key, fields, payload)
+            _index, _built_at = index, _time.monotonic()
+    finally:
+        with _lock:
+            _builds -= 1
+            if not _builds:
+                _pending.clear()
+
+def _rebuild_in_background() -> None:
+    global _rebuilding, _rebuild_again
+    while True:
+        try:
+            with _session_factory() as db:
+                _build_and_publish(db)
+        except Exception as e:
+            print(f"Warning: Failed to rebuild the search index. Error: {e}")
+        with _lock:
+            if not _rebuild_again:
+                _rebuilding = False
+                return
+            _rebuild_again = False
+
+def _start_rebuild(again: bool) -> None:
+    global _rebuilding, _rebuild_again
+    with _lock:
+        if _rebuilding:
+            _rebuild_again = _rebuild_again or again
+            return
+        _rebuilding = True
+    threading.Thread(target=_rebuild_in_background, name="search-index", daemon=True).start()
+
+def warm() -> None:
+    """
+    Rebuilds the index in a background thread (at startup and after seeding). If a
+    build is already running, another follows it, as it may have read older data.
+    """
+    _start_rebuild(again=True)
+
+def ensure_built() -> bool:
+    """
+    True once the index is built. Never builds on the calling thread: a missing index
+    is built, and one older than REBUILD_INTERVAL_SECONDS rebuilt, in the background
+    while searches keep using the old one.
+    """
+    if _index is None:
+        _start_rebuild(again=False)
+        return False
+    if _time.monotonic() - _built_at > REBUILD_INTERVAL_SECONDS and not _rebuilding:
+        _start_rebuild(again=False)
+    return True
+
+def search(query: str, limit: int = 20, kind: Optional[str] = None) -> Tuple[int, List[dict]]:
+    """
+    (number of matches, top hits) from the built index; call ensure_built first.
+    Scoring holds the lock, so call it from a worker thread rather than the event loop.
+    """
+    with _lock:
+        if _index is None:
+            return 0, []
+        total, hits = _index.search(query, limit, kind)
+    return total, [{**payload, "score": round(score, 4)} for score, payload in hits]
+
+def index_stall(db: Session, license_number: str) -> None:
+    """Re-indexes one stall and its menu from the database. Call after the change is committed."""
+    if _index is None and not _builds:
+        return
+    row = db.execute(select(*_STALL_COLUMNS).where(Business.license_number == license_number)).first()
+    if row is None:
+        return
+    menu = db.execute(
+        select(MenuItem.name, MenuItem.description).where(MenuItem.license_number == license_number)
+    ).all()
+    document = stall_document(row, menu)
+    with _lock:
+        if _index is not None:
+            _index.upsert(*document)
+        if _builds:
+            _pending.append(document)
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import inspect, select
+
+from app.database import SessionLocal, engine
+from app.models.hawker_centre_model import HawkerCentre
+from app.services import hawker_catalogue, search_index, suggest_index
+from app.utils.file_lock import exclusive_lock
+
+# Schema setup and SFA seeding, run once per deployment instead of inside every
+# worker's startup event. A file lock next to the SQLite database makes sure only
+# one process (uvicorn worker or `python -m app.cli seed`) seeds at a time; the
+# others wait for it and then find the data already present.
+
+_state_lock = threading.Lock()
+_state = {
+    "status": "pending",   # pending | disabled | waiting_for_lock | running | ready | failed
+    "phase": None,
+    "done": 0,
+    "total": 0,
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+}
+_thread: Optional[threading.Thread] = None
+
+def lock_path() -> str:
+    """Seed lock file: beside the SQLite database, or in the temp dir for other databases."""
+    if engine.url.get_backend_name() == "sqlite" and engine.url.database not in (None, "", ":memory:"):
+        return os.path.abspath(engine.url.database) + ".seed.lock"
+    return os.path.join(tempfile.gettempdir(), "hawkersg.seed.lock")
+
+def seed_lock():
+    """Holds an exclusive lock across processes for the duration of the block."""
+    return exclusive_lock(lock_path())
+
+def _update(**changes) -> None:
+    with _state_lock:
+        _state.update(changes)
+
+def _report_progress(phase: str, done: int, total: int) -> None:
+    _update(phase=phase, done=done, total=total)
+
+def status() -> dict:
+    """Snapshot of this process's seeding progress."""
+    with _state_lock:
+        return dict(_state)
+
+def is_ready() -> bool:
+    return status()["status"] == "ready"
+
+def run_seed() -> None:
+    """Creates tables/indexes and seeds SFA data if the database is empty. Safe to call from several processes."""
+    # Imported here because app.main imports this module
+    from app.main import INDEX_JSON_PATH, create_db_and_tables
+    from app.assets.database_seed.seed_db import seed_sfa_data_if_empty
+    from app.services import review_aggregates
+
+    _update(status="waiting_for_lock", started_at=time.time(), finished_at=None, error=None)
+    try:
+        with seed_lock():
+            _update(status="running", phase="schema")
+            create_db_and_tables()
+
+            db = SessionLocal()
+            try:
+                seed_sfa_data_if_empty(db, INDEX_JSON_PATH, on_progress=_report_progress)
+                # Backfill rating totals for databases created before review_aggregates existed
+                _update(phase="review_aggregates")
+                review_aggregates.rebuild_if_empty(db)
+            finally:
+                db.close()
+    except Exception as e:
+        _update(status="failed", error=str(e), finished_at=time.time())
+        raise
+
+    hawker_catalogue.invalidate()
+    search_index.warm()
+    suggest_index.warm()
+    _update(status="ready", phase=None, finished_at=time.time())
+
+def _run_in_background() -> None:
+    try:
+        run_seed()
+    except Exception as e:
+        # The app keeps serving; /health/ready reports the failure
+        print(f"Error during background seeding: {e}")
+
+def start_background_seed() -> None:
+    """Runs run_seed in a daemon thread so startup returns immediately."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _thread = threading.Thread(target=_run_in_background, name="hawkersg-seed", daemon=True)
+    _thread.start()
+
+def disable() -> None:
+    """Startup seeding is off; readiness then depends on `python -m app.cli seed` having been run."""
+    _update(status="disabled")
+
+def mark_ready_if_seeded() -> None:
+    """Marks this process ready once another process has seeded the database."""
+    if not inspect(engine).has_table(HawkerCentre.__tablename__):
+        return
+    with SessionLocal() as db:
+        if db.scalars(select(HawkerCentre.id).limit(1)).first() is not None:
+            _update(status="ready", finished_at=time.time())
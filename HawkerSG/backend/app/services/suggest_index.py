@@ -0,0 +1,212 @@
+import heapq
+import threading
+import time as _time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.business_model import Business
+from app.models.consumer_model import Consumer
+from app.models.favourite_model import Favourite
+from app.models.hawker_centre_model import HawkerCentre
+from app.models.review_aggregate_model import ReviewAggregate
+from app.services.search_index import tokenize
+
+# Typeahead suggestions for GET /search/suggest: stall names, hawker centre
+# names, cuisines and terms other consumers search for, ranked by popularity.
+#
+# Every word of a suggestion starts a key ("tian tian chicken rice",
+# "tian chicken rice", "chicken rice", "rice") in one sorted list, so the
+# keys matching a prefix are a contiguous range found with bisect. The ranked
+# results of the short prefixes, whose ranges hold thousands of keys, are
+# computed when the index is built; longer prefixes only match a handful of
+# keys and are ranked on the fly.
+#
+# Popularity is 1 + reviews + favourites for each stall (stalls sharing a name
+# add up), stalls + reviews + favourites for hawker centres, the number of
+# stalls for cuisines, and the number of consumers who recently searched for
+# a term.
+
+MAX_SUGGESTIONS = 10
+PRECOMPUTED_PREFIX_LENGTH = 3
+# A search term is only suggested once this many consumers have searched for it,
+# so one person's searches are never shown to others
+MIN_TERM_SEARCHERS = 3
+
+REBUILD_INTERVAL_SECONDS = 300
+
+class SuggestIndex:
+    """Sorted prefix index over suggestions ({"text", "type", "popularity", ...})."""
+
+    def __init__(self, suggestions: List[dict]):
+        self._suggestions = suggestions
+        entries = sorted(
+            (" ".join(words[i:]), n)
+            for n, suggestion in enumerate(suggestions)
+            for words in [tokenize(suggestion["text"])]
+            for i in range(len(words))
+        )
+        self._keys = [key for key, _ in entries]
+        self._owners = [n for _, n in entries]
+
+        # Best suggestions first: most popular, then shortest, then alphabetical
+        self._rank = {
+            n: (-s["popularity"], len(s["text"]), s["text"].lower()) for n, s in enumerate(suggestions)
+        }
+        matches: Dict[str, set] = {}
+        for key, n in entries:
+            for length in range(1, min(len(key), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                matches.setdefault(key[:length], set()).add(n)
+        self._top = {
+            prefix: heapq.nsmallest(MAX_SUGGESTIONS, owners, key=self._rank.__getitem__)
+            for prefix, owners in matches.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._suggestions)
+
+    def suggest(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[dict]:
+        key = " ".join(tokenize(prefix))
+        if not key:
+            return []
+        if len(key) <= PRECOMPUTED_PREFIX_LENGTH:
+            best = self._top.get(key, [])
+        else:
+            start = bisect_left(self._keys, key)
+            end = bisect_left(self._keys, key + "\U0010ffff", start)
+            best = heapq.nsmallest(MAX_SUGGESTIONS, set(self._owners[start:end]), key=self._rank.__getitem__)
+        return [self._suggestions[n] for n in best[:limit]]
+
+def _merge(suggestions: Dict[tuple, dict], kind: str, text: Optional[str], popularity: int, id: Optional[int] = None) -> None:
+    # Many stalls share a name ("Chicken Rice"): suggest it once, with their combined popularity
+    text = (text or "").strip()
+    if not tokenize(text):
+        return
+    entry = suggestions.get((kind, text.lower()))
+    if entry is None:
+        suggestions[(kind, text.lower())] = {"text": text, "type": kind, "id": id, "count": 1, "popularity": popularity}
+    else:
+        entry["popularity"] += popularity
+        entry["count"] += 1
+        entry["id"] = None
+
+def _centre_key(name: Optional[str]) -> str:
+    # SFA stall rows spell centre names slightly differently from the centre list
+    # ("Blk 665 Tekka CentreZhu Jiao Market" vs "Blk 665 (Tekka Centre/Zhu Jiao Market)")
+    return "".join(tokenize(name))
+
+def build(db: Session) -> SuggestIndex:
+    reviews = {
+        (target_type, target_id): count
+        for target_type, target_id, count in db.execute(
+            select(ReviewAggregate.target_type, ReviewAggregate.target_id, ReviewAggregate.review_count)
+        )
+    }
+    favourites: Counter = Counter()
+    for target_type, target_id, count in db.execute(
+        select(Favourite.target_type, Favourite.target_id, func.count())
+        .group_by(Favourite.target_type, Favourite.target_id)
+    ):
+        favourites[("business" if target_type == "stall" else target_type, target_id)] += count
+
+    suggestions: Dict[tuple, dict] = {}
+    stalls_per_centre: Counter = Counter()
+    stalls_per_cuisine: Counter = Counter()
+    for id, stall_name, licensee_name, hawker_centre, cuisine_type in db.execute(
+        select(Business.id, Business.stall_name, Business.licensee_name, Business.hawker_centre, Business.cuisine_type)
+    ):
+        popularity = 1 + reviews.get(("business", id), 0) + favourites[("business", id)]
+        _merge(suggestions, "stall", stall_name or licensee_name, popularity, id)
+        stalls_per_centre[_centre_key(hawker_centre)] += 1
+        if cuisine_type is not None:
+            stalls_per_cuisine[cuisine_type.value] += 1
+
+    for id, name in db.execute(select(HawkerCentre.id, HawkerCentre.name)):
+        popularity = stalls_per_centre[_centre_key(name)] + reviews.get(("hawker", id), 0) + favourites[("hawkercentre", id)]
+        _merge(suggestions, "hawker", name, popularity, id)
+    for cuisine, count in stalls_per_cuisine.items():
+        _merge(suggestions, "cuisine", cuisine, count)
+
+    searchers: Counter = Counter()
+    spelling: Dict[str, str] = {}
+    for (recent,) in db.execute(select(Consumer.recentlySearch).where(Consumer.recentlySearch != "")):
+        terms = {term.strip() for term in (recent or "").split("|") if term.strip()}
+        for term in {t.lower(): t for t in terms}.values():
+            searchers[term.lower()] += 1
+            spelling.setdefault(term.lower(), term)
+    for term, count in searchers.items():
+        if count >= MIN_TERM_SEARCHERS:
+            _merge(suggestions, "term", spelling[term], count)
+
+    return SuggestIndex(list(suggestions.values()))
+
+# --- Process-wide index ---
+
+# Built only by one background thread at a time, with its own session, never on
+# the request path: until the first build is published, suggest() returns [].
+
+# Replaced in tests
+_session_factory = SessionLocal
+
+_lock = threading.Lock()
+_index: Optional[SuggestIndex] = None
+_built_at = 0.0
+_rebuilding = False
+_rebuild_again = False  # warm() was called during a build, which may have read older data
+
+def invalidate() -> None:
+    """Drops the index; the next request starts a rebuild."""
+    global _index
+    with _lock:
+        _index = None
+
+def _rebuild() -> None:
+    global _index, _built_at, _rebuilding, _rebuild_again
+    while True:
+        try:
+            with _session_factory() as db:
+                index = build(db)
+            with _lock:
+                _index, _built_at = index, _time.monotonic()
+        except Exception as e:
+            print(f"Warning: Failed to build the suggestion index. Error: {e}")
+        with _lock:
+            if not _rebuild_again:
+                _rebuilding = False
+                return
+            _rebuild_again = False
+
+def _start_rebuild(again: bool) -> None:
+    global _rebuilding, _rebuild_again
+    with _lock:
+        if _rebuilding:
+            _rebuild_again = _rebuild_again or again
+            return
+        _rebuilding = True
+    threading.Thread(target=_rebuild, name="suggest-index", daemon=True).start()
+
+def warm() -> None:
+    """
+    Builds the index in a background thread (at startup and after seeding). If a
+    build is already running, another follows it, as it may have read older data.
+    """
+    _start_rebuild(again=True)
+
+def ensure_built() -> bool:
+    """
+    True once the index is built. Never builds on the calling thread: a missing index
+    is built, and a stale one refreshed, in the background.
+    """
+    if _index is None:
+        _start_rebuild(again=False)
+        return False
+    if _time.monotonic() - _built_at > REBUILD_INTERVAL_SECONDS and not _rebuilding:
+        _start_rebuild(again=False)
+    return True
+
+def suggest(prefix: str, limit: int = MAX_SUGGESTIONS) -> List[dict]:
+    """Suggestions from the built index; [] until the first build is published."""
+    index = _index
+    return index.suggest(prefix, limit) if index is not None else []
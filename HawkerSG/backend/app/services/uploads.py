@@ -0,0 +1,78 @@
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Iterable, Optional, Tuple
+from fastapi import HTTPException, status
+
+# Streaming image uploads.
+# The upload is copied to a temp file in the destination folder CHUNK_SIZE bytes
+# at a time, counting bytes as it goes, so memory stays at one chunk however
+# large the file is and an oversized upload stops being copied at the first chunk
+# past the limit. The cap limits what is stored: by the time a route runs,
+# Starlette has already received the whole request body into its own spooled
+# temp file. The amount received is bounded by BodySizeLimitMiddleware
+# (app/utils/body_limit.py, MAX_REQUEST_BODY_BYTES in app/main.py) instead.
+# The image type comes from the file's magic bytes (the client's content_type
+# and extension are not trusted). The caller renames the finished temp file
+# into place atomically (photo_store.store), so readers never see a partial image.
+
+CHUNK_SIZE = 16 * 1024
+
+EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """MIME type from the first 12 bytes of an image, or None if it is not JPEG/PNG/WebP."""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+def _invalid_type() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid file type. Only JPEG, PNG, and WebP images are allowed."
+    )
+
+def receive_image(source: BinaryIO, dest_dir: str, max_bytes: int, allowed_types: Iterable[str] = EXTENSIONS) -> Tuple[str, str, str]:
+    """
+    Copies an image from `source` to a temp file in `dest_dir`, hashing it on the way.
+    Returns (temp path, MIME type, SHA-256 hex digest); the caller moves the temp file
+    into place. Raises 400 for non-images and 413 once more than `max_bytes` are read
+    from `source`; nothing is left in `dest_dir` in either case.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-", suffix=".tmp")
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as out:
+            header, size = b"", 0
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File size exceeds the maximum limit of {max_bytes // (1024 * 1024)}MB."
+                    )
+                if len(header) < 12:
+                    header += chunk[:12 - len(header)]
+                digest.update(chunk)
+                out.write(chunk)
+
+        mime_type = sniff_image_type(header)
+        if mime_type is None or mime_type not in allowed_types:
+            raise _invalid_type()
+        return tmp_path, mime_type, digest.hexdigest()
+    except BaseException:
+        discard(tmp_path)
+        raise
+
+def discard(tmp_path: str) -> None:
+    """Removes a temp file left by receive_image."""
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
@@ -0,0 +1,68 @@
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Request body size limit, as pure ASGI middleware.
+# Starlette parses a multipart upload into a spooled temp file before the route
+# runs, so the per-photo caps in the controllers only limit what is stored, not
+# what is received. This middleware bounds the whole request body instead: a
+# request declaring a larger Content-Length is answered 413 without reading its
+# body, and a chunked (or under-declared) body is cut off with 413 at the first
+# message that takes it past the limit.
+
+class BodyTooLarge(HTTPException):
+    """Raised from receive() once the body passes the limit. FastAPI re-raises HTTPExceptions
+    from body parsing, so the app's exception handler answers it with a 413."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f"Request body exceeds the maximum of {max_bytes // (1024 * 1024)}MB.")
+
+class BodySizeLimitMiddleware:
+    """Answers 413 to HTTP requests whose body is larger than `max_bytes`."""
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        declared = Headers(scope=scope).get("content-length", "")
+        if declared.isdigit() and int(declared) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise BodyTooLarge(self.max_bytes)
+            return message
+
+        async def tracked_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except BodyTooLarge:
+            # Read outside FastAPI's body parsing (e.g. by other middleware)
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send) -> None:
+        error = BodyTooLarge(self.max_bytes)
+        # The unread body is not drained; close the connection rather than reuse it
+        response = JSONResponse({"detail": error.detail}, status_code=413, headers={"Connection": "close"})
+        await response(scope, receive, send)
@@ -0,0 +1,41 @@
+import os
+from contextlib import contextmanager
+
+# Exclusive advisory locks shared between processes (uvicorn workers, CLI
+# commands). The OS drops the lock when the holder exits, so a crashed process
+# never leaves a stale lock behind.
+
+if os.name == "nt":
+    import msvcrt
+
+    def lock_file(f):
+        f.seek(0)
+        # msvcrt.LK_LOCK only retries for ~10s, so keep retrying until we get it
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+@contextmanager
+def exclusive_lock(path: str):
+    """Holds an exclusive lock on `path` across processes for the duration of the block."""
+    with open(path, "a+") as f:
+        lock_file(f)
+        try:
+            yield
+        finally:
+            unlock_file(f)
@@ -0,0 +1,260 @@
+import asyncio
+import os
+import random
+import threading
+import time as _time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+
+# Shared outbound HTTP layer (OneMap, data.gov.sg, image search, ...).
+# One pooled httpx.AsyncClient per event loop keeps connections alive between
+# calls. Every request is bounded by a per-host semaphore and timeouts, retried
+# with jittered exponential backoff on transient failures, and guarded by a
+# per-host circuit breaker so a dead upstream fails fast instead of tying up
+# request handlers. Latency and failure counts are kept per host.
+
+CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT_SECONDS = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "8"))
+
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+BACKOFF_BASE_SECONDS = 0.2
+BACKOFF_CAP_SECONDS = 5.0
+RETRY_STATUSES = {429, 502, 503, 504}
+# Only these are retried unless the caller passes retries= explicitly
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Consecutive failures (transport errors or 5xx) that open a host's circuit,
+# and how long it stays open before a single trial request is let through
+BREAKER_FAILURES = int(os.getenv("HTTP_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("HTTP_BREAKER_RESET_SECONDS", "30"))
+
+LATENCY_WINDOW = 500  # recent samples kept per host for percentiles
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised without making a request while the host's circuit is open."""
+
+class _Breaker:
+    def __init__(self):
+        self.failures = 0
+        self.opened_at: Optional[float] = None  # monotonic time; None while closed
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if _time.monotonic() - self.opened_at < BREAKER_RESET_SECONDS:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self.trial_in_flight:
+            return False
+        self.trial_in_flight = True
+        return True
+
+    def record(self, ok: bool) -> None:
+        self.trial_in_flight = False
+        if ok:
+            self.failures, self.opened_at = 0, None
+            return
+        self.failures += 1
+        # A failed trial re-opens immediately
+        if self.opened_at is not None or self.failures >= BREAKER_FAILURES:
+            self.opened_at = _time.monotonic()
+
+class _HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0  # short-circuited while open
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies_ms)
+
+        def pct(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 1)
+
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+        }
+
+# Breakers and stats are process-wide; clients and semaphores belong to an event loop
+_lock = threading.Lock()
+_breakers: Dict[str, _Breaker] = {}
+_stats: Dict[str, _HostStats] = {}
+_per_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, Dict[str, asyncio.Semaphore]]]" = weakref.WeakKeyDictionary()
+
+def _host(url) -> str:
+    return urlsplit(str(url)).netloc
+
+def _loop_state() -> Tuple[httpx.AsyncClient, Dict[str, asyncio.Semaphore]]:
+    loop = asyncio.get_running_loop()
+    state = _per_loop.get(loop)
+    if state is None or state[0].is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(READ_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            follow_redirects=True,
+        )
+        state = (client, {})
+        _per_loop[loop] = state
+    return state
+
+def _client_for(host: str) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    client, semaphores = _loop_state()
+    semaphore = semaphores.get(host)
+    if semaphore is None:
+        semaphore = semaphores[host] = asyncio.Semaphore(PER_HOST_LIMIT)
+    return client, semaphore
+
+def _admit(host: str) -> None:
+    with _lock:
+        breaker = _breakers.setdefault(host, _Breaker())
+        stats = _stats.setdefault(host, _HostStats())
+        if not breaker.allow():
+            stats.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {host}; not sending request")
+
+def _record(host: str, ok: bool, started: Optional[float] = None) -> None:
+    with _lock:
+        _breakers[host].record(ok)
+        stats = _stats[host]
+        stats.requests += 1
+        if not ok:
+            stats.failures += 1
+        if started is not None:
+            stats.latencies_ms.append((_time.perf_counter() - started) * 1000)
+
+def _abandon(host: str) -> None:
+    """The admitted request never completed (cancelled, bad URL); free a half-open trial slot."""
+    with _lock:
+        _breakers[host].trial_in_flight = False
+
+def _backoff(attempt: int) -> float:
+    # "Full jitter": spreads retries from many callers over the whole window
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return min(BACKOFF_CAP_SECONDS, max(0.0, float(response.headers["Retry-After"])))
+    except (KeyError, ValueError):
+        return None
+
+async def request(method: str, url: str, *, retries: Optional[int] = None, **kwargs) -> httpx.Response:
+    """
+    Sends a request through the shared client. Transport errors and 429/502/503/504
+    are retried `retries` times (default MAX_RETRIES for idempotent methods, 0 otherwise).
+    Raises httpx errors (including CircuitOpenError); status codes are left to the caller.
+    """
+    method = method.upper()
+    if retries is None:
+        retries = MAX_RETRIES if method in IDEMPOTENT_METHODS else 0
+    host = _host(url)
+    client, semaphore = _client_for(host)
+
+    attempt = 0
+    while True:
+        _admit(host)
+        started = None
+        try:
+            async with semaphore:
+                started = _time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            _record(host, False, started)
+            if attempt >= retries:
+                raise
+            delay = _backoff(attempt)
+        except BaseException:
+            _abandon(host)
+            raise
+        else:
+            _record(host, response.status_code < 500, started)
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            delay = _retry_after(response)
+            if delay is None:
+                delay = _backoff(attempt)
+
+        attempt += 1
+        with _lock:
+            _stats[host].retries += 1
+        await asyncio.sleep(delay)
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+@asynccontextmanager
+async def stream(method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    """
+    Streams a response body (large downloads). Not retried, since the body may be
+    partly consumed; the per-host slot is held until the block exits.
+    """
+    host = _host(url)
+    client, semaphore = _client_for(host)
+    _admit(host)
+    recorded = False
+    try:
+        async with semaphore:
+            started = _time.perf_counter()
+            async with client.stream(method.upper(), url, **kwargs) as response:
+                _record(host, response.status_code < 500, started)
+                recorded = True
+                yield response
+    except httpx.TransportError:
+        if not recorded:
+            _record(host, False)
+        raise
+    except BaseException:
+        if not recorded:
+            _abandon(host)
+        raise
+
+def metrics() -> Dict[str, dict]:
+    """Per-host request counts, latency percentiles and circuit state."""
+    with _lock:
+        return {
+            host: dict(stats.snapshot(), circuit=_breakers[host].state)
+            for host, stats in _stats.items()
+        }
+
+def reset_state() -> None:
+    """Forgets all breaker state and metrics (tests, or after an upstream is fixed)."""
+    with _lock:
+        _breakers.clear()
+        _stats.clear()
+
+async def aclose() -> None:
+    """Closes the current event loop's client (application shutdown)."""
+    state = _per_loop.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state[0].aclose()
@@ -1,19 +1,20 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
+import hashlib
 import os
+import threading
+import time
 from dotenv import load_dotenv
-import logging
-
-# Configure basic logging to ensure messages show up
-# Uvicorn usually handles this, but it's good practice to set a handler
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 load_dotenv()
 
 SECRET_KEY = os.environ.get("SECRET_KEY", "YOUR_SUPER_SECURE_DEFAULT_KEY_CHANGE_ME")
 ALGORITHM = os.environ.get("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_SECONDS = int(os.environ.get("ACCESS_TOKEN_EXPIRE_SECONDS", 1800))
+# Verified tokens kept in memory, so repeat requests with the same token skip the HMAC check
+VERIFIED_TOKEN_CACHE_SIZE = int(os.environ.get("JWT_CACHE_SIZE", 10000))
 
 if not SECRET_KEY or SECRET_KEY == "YOUR_SUPER_SECURE_DEFAULT_KEY_CHANGE_ME":
     # IMPORTANT: Raise an error or log a warning if the secret key is not set
@@ -33,37 +34,47 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = current_time_utc + timedelta(seconds=ACCESS_TOKEN_EXPIRE_SECONDS)
 
-    # --- LOGGING THE EXPIRATION TIME ---
-    logging.info(f"JWT Expiration Time (UTC): {expire.isoformat()}")
-    
-    expire_sgt = expire.astimezone(timezone(timedelta(hours=8)))
-    logging.info(f"JWT Expiration Time (SGT): {expire_sgt.strftime('%Y-%m-%d %H:%M:%S')}")
-    
     # Standard JWT claims
     to_encode.update({"exp": expire, "sub": "access"}) 
 
-    logging.info(f"Final JWT Payload (to_encode): {to_encode}")
-    
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-    try:
-        check_payload = jwt.decode(encoded_jwt, SECRET_KEY, algorithms=[ALGORITHM], 
-                                   options={"verify_exp": False})
-        logging.info(f"✅ Newly Encoded Token Payload Check: {check_payload}")
-        
-        # 2. Re-log the final string
-        logging.info(f"✅ Final Encoded JWT String: {encoded_jwt}")
+# sha256(token) -> (claims, exp); least recently used first. Keyed by digest so
+# raw tokens are not held in memory.
+_verified: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+_verified_lock = threading.Lock()
 
-    except Exception as e:
-        logging.error(f"Failed to verify newly encoded token: {e}")
-    return encoded_jwt
+def clear_token_cache() -> None:
+    """Forgets all verified tokens (e.g. after rotating SECRET_KEY)."""
+    with _verified_lock:
+        _verified.clear()
 
 def decode_access_token(token: str) -> Optional[dict]:
     """
     Decodes and validates a JWT access token.
+    Verified claims are cached until the token's exp, bounded to VERIFIED_TOKEN_CACHE_SIZE entries.
     """
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+    with _verified_lock:
+        cached = _verified.get(key)
+        if cached is not None:
+            claims, exp = cached
+            if exp > now:
+                _verified.move_to_end(key)
+                return dict(claims)
+            del _verified[key]
+            return None
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and VERIFIED_TOKEN_CACHE_SIZE > 0:
+        with _verified_lock:
+            _verified[key] = (payload, exp)
+            if len(_verified) > VERIFIED_TOKEN_CACHE_SIZE:
+                _verified.popitem(last=False)
+    return dict(payload)
@@ -1,19 +1,38 @@
-import requests
+import asyncio
+import random
+import tempfile
 import time
 import os
 import json
 from typing import Optional, Tuple
 from datetime import datetime
+from app.utils import http_client
+from app.utils.file_lock import lock_file, unlock_file
+
+# OneMap access token, shared by every request and worker process.
+# Requests only ever read the cached token. Refreshing is single-flight: one
+# asyncio task per process, serialised across processes by a lock file, and the
+# cache file is replaced atomically, so workers that wake up late simply adopt
+# the token another worker just wrote. A background task renews the token
+# REFRESH_AHEAD_SECONDS before it stops being usable.
 
 ONEMAP_EMAIL = os.getenv("ONEMAP_EMAIL") 
 ONEMAP_PASSWORD = os.getenv("ONEMAP_PASSWORD")
-ONEMAP_TOKEN_URL = "https://www.onemap.gov.sg/api/auth/post/getToken"
+ONEMAP_BASE_URL = os.getenv("ONEMAP_BASE_URL", "https://www.onemap.gov.sg")
+ONEMAP_TOKEN_URL = f"{ONEMAP_BASE_URL}/api/auth/post/getToken"
 
 TOKEN_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".onemap_token_cache.json")
 SAFETY_BUFFER_SECONDS = 3600
+# Renew this long before the token enters the safety buffer
+REFRESH_AHEAD_SECONDS = 3600
+# Longest a request waits when there is no usable token at all (cold start)
+TOKEN_WAIT_SECONDS = 5
+REFRESH_RETRY_SECONDS = 60
 
 _cached_token: Optional[str] = None
 _token_expiry_timestamp: int = 0
+_refresh_task: Optional[asyncio.Task] = None
+_background_task: Optional[asyncio.Task] = None
 
 def _read_token_cache() -> Tuple[Optional[str], int]:
     """Reads the token and expiry timestamp from the cache file."""
@@ -45,78 +64,153 @@ def _write_token_cache(token: str, expiry_timestamp: int):
     """
     Writes the new token and expiry timestamp to the cache file, 
     ensuring the directory structure exists first.
+    The file is replaced atomically, so readers never see a partial write.
     """
     # Create the parent directory if it doesn't exist
-    os.makedirs(os.path.dirname(TOKEN_CACHE_FILE), exist_ok=True)
+    cache_dir = os.path.dirname(TOKEN_CACHE_FILE)
+    os.makedirs(cache_dir, exist_ok=True)
     
     data = {
         'access_token': token,
         'expiry_timestamp': expiry_timestamp, # Should be an integer here
         'cached_at': datetime.now().isoformat()
     }
+    tmp_path = None
     try:
-        with open(TOKEN_CACHE_FILE, 'w') as f:
+        with tempfile.NamedTemporaryFile('w', dir=cache_dir, prefix='.onemap_token.', delete=False) as f:
+            tmp_path = f.name
             json.dump(data, f, indent=4)
+        os.replace(tmp_path, TOKEN_CACHE_FILE)
     except IOError as e:
         print(f"Error writing to token cache file: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-def _get_new_onemap_token() -> dict:
+async def _get_new_onemap_token() -> dict:
     """Authenticates to OneMap to get a fresh token."""
     if not ONEMAP_EMAIL or not ONEMAP_PASSWORD:
         # NOTE: This error requires fixing your backend's .env file
         raise ValueError("OneMap credentials (EMAIL/PASSWORD) not set in backend environment variables.")
 
     payload = {"email": ONEMAP_EMAIL, "password": ONEMAP_PASSWORD}
-    headers = {"Content-Type": "application/json"}
-    response = requests.post(ONEMAP_TOKEN_URL, headers=headers, data=json.dumps(payload))
+    # Asking for a token twice is harmless, so let the client retry it
+    response = await http_client.post(ONEMAP_TOKEN_URL, json=payload, retries=http_client.MAX_RETRIES)
     response.raise_for_status()
     return response.json()
 
-def get_onemap_token() -> Optional[str]:
-    """
-    Returns a valid (and refreshed, if needed) OneMap access token, 
-    checking the in-memory and file cache before requesting a new one.
-    """
-    global _cached_token, _token_expiry_timestamp
-    
-    # --- 1. Check In-Memory Cache (Fastest) ---
-    # The comparison only works if _token_expiry_timestamp is an int/float
-    if _cached_token and _token_expiry_timestamp > time.time() + SAFETY_BUFFER_SECONDS: 
-        return _cached_token
+def _usable(expiry: int) -> bool:
+    return expiry > time.time() + SAFETY_BUFFER_SECONDS
+
+def _fresh(expiry: int) -> bool:
+    """Usable and not yet due for a proactive refresh."""
+    return expiry > time.time() + SAFETY_BUFFER_SECONDS + REFRESH_AHEAD_SECONDS
 
-    # --- 2. Check Persistent File Cache (On Server Restart) ---
+def _current() -> Tuple[Optional[str], int]:
+    """The in-memory token, loaded from the cache file on first use (server restart)."""
+    global _cached_token, _token_expiry_timestamp
     if not _cached_token:
         # This will load a valid token (int expiry) or None, 0 if invalid/missing
         _cached_token, _token_expiry_timestamp = _read_token_cache()
-        
-        # Re-check the validity of the token loaded from the file
-        if _cached_token and _token_expiry_timestamp > time.time() + SAFETY_BUFFER_SECONDS:
+        if _cached_token and _usable(_token_expiry_timestamp):
             print("Loaded valid token from cache file.")
-            return _cached_token
+    return _cached_token, _token_expiry_timestamp
 
-    # --- 3. Request New Token (Last Resort) ---
-    print("Token invalid or nearly expired. Requesting new token from OneMap...")
+async def _refresh() -> Optional[str]:
+    """Fetches a new token under the cross-process lock, unless another worker just did."""
+    global _cached_token, _token_expiry_timestamp
+    lock = open(TOKEN_CACHE_FILE + ".lock", "a+")
     try:
-        data = _get_new_onemap_token()
-        new_token = data.get('access_token')
-        new_expiry = data.get('expiry_timestamp')
-        
-        if new_token and new_expiry:
+        # flock blocks, so wait for it off the event loop
+        await asyncio.to_thread(lock_file, lock)
+        try:
+            token, expiry = _read_token_cache()
+            if token and _fresh(expiry):
+                _cached_token, _token_expiry_timestamp = token, expiry
+                return token
+
+            print("Token invalid or nearly expired. Requesting new token from OneMap...")
+            data = await _get_new_onemap_token()
+            new_token = data.get('access_token')
+            new_expiry = data.get('expiry_timestamp')
+            if not (new_token and new_expiry):
+                raise Exception("New token response did not contain required fields.")
+
             # FIX: Ensure new_expiry is converted to an integer immediately after API retrieval
             try:
                 new_expiry_int = int(new_expiry)
             except (TypeError, ValueError):
                 print("Warning: OneMap expiry_timestamp not convertible to integer. Using 0.")
                 new_expiry_int = 0
-            
+
+            _write_token_cache(new_token, new_expiry_int) # Save the clean integer
             _cached_token = new_token
             _token_expiry_timestamp = new_expiry_int # Assign the clean integer
-            _write_token_cache(new_token, new_expiry_int) # Save the clean integer
             print("Successfully refreshed and cached new token.")
             return new_token
-        else:
-            raise Exception("New token response did not contain required fields.")
-            
+        finally:
+            unlock_file(lock)
     except Exception as e:
         print(f"🛑 Failed to fetch or cache OneMap token: {e}")
         return None
+    finally:
+        lock.close()
+
+def _start_refresh() -> asyncio.Task:
+    """The refresh in flight in this process, starting one if there is none."""
+    global _refresh_task
+    loop = asyncio.get_running_loop()
+    if _refresh_task is None or _refresh_task.done() or _refresh_task.get_loop() is not loop:
+        _refresh_task = loop.create_task(_refresh())
+    return _refresh_task
+
+async def get_onemap_token() -> Optional[str]:
+    """
+    Returns a valid OneMap access token from the in-memory or file cache.
+    A token close to expiry is returned as-is while a refresh runs in the background;
+    only when there is no usable token does the caller wait (up to TOKEN_WAIT_SECONDS)
+    for the single in-flight refresh.
+    """
+    token, expiry = _current()
+    if token and _usable(expiry):
+        if not _fresh(expiry):
+            _start_refresh()
+        return token
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(_start_refresh()), TOKEN_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        print("Timed out waiting for a OneMap token refresh.")
+        return None
+
+async def _refresh_periodically():
+    while True:
+        token, expiry = _current()
+        if not (token and _fresh(expiry)):
+            await _start_refresh()
+            token, expiry = _current()
+
+        if token and _fresh(expiry):
+            # Wake when the token becomes due; jitter keeps workers from waking together
+            delay = expiry - time.time() - SAFETY_BUFFER_SECONDS - REFRESH_AHEAD_SECONDS + random.uniform(0, 60)
+        else:
+            delay = REFRESH_RETRY_SECONDS
+        await asyncio.sleep(max(delay, 1))
+
+def start_background_refresh() -> None:
+    """Keeps the token renewed ahead of expiry. Call from the app's startup (running loop)."""
+    global _background_task
+    if not ONEMAP_EMAIL or not ONEMAP_PASSWORD:
+        print("OneMap credentials not set; background token refresh disabled.")
+        return
+    if _background_task is None or _background_task.done():
+        _background_task = asyncio.get_running_loop().create_task(_refresh_periodically())
+
+async def stop_background_refresh() -> None:
+    global _background_task
+    if _background_task is not None:
+        _background_task.cancel()
+        try:
+            await _background_task
+        except asyncio.CancelledError:
+            pass
+        _background_task = None
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+# Argon2 hashing off the request path.
+# Each hash/verify costs ~100+ ms of CPU and 64 MiB of memory, so they run on a
+# small dedicated pool instead of FastAPI's shared threadpool (argon2-cffi
+# releases the GIL, so threads use separate cores). At most
+# PASSWORD_HASH_WORKERS run at once with PASSWORD_HASH_QUEUE_DEPTH more waiting;
+# beyond that, requests are shed with 429 so a login burst cannot starve the
+# rest of the API.
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_DEPTH = int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", "16"))
+RETRY_AFTER_SECONDS = 1
+
+def _argon2_settings() -> dict:
+    """Optional overrides of passlib's Argon2 defaults. Changing them rehashes passwords on next login."""
+    settings = {}
+    for env, key in (
+        ("ARGON2_TIME_COST", "argon2__rounds"),
+        ("ARGON2_MEMORY_COST_KIB", "argon2__memory_cost"),
+        ("ARGON2_PARALLELISM", "argon2__parallelism"),
+    ):
+        if os.getenv(env):
+            settings[key] = int(os.getenv(env))
+    return settings
+
+# Hashes made with other parameters still verify, and are flagged for rehash
+pwd_context = CryptContext(schemes=["argon2"], deprecated="auto", **_argon2_settings())
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_lock = threading.Lock()
+_admitted = 0   # running + queued on _executor
+_rejected = 0
+
+def _release(_future) -> None:
+    global _admitted
+    with _lock:
+        _admitted -= 1
+
+async def _run(fn, *args):
+    global _admitted, _rejected
+    with _lock:
+        if _admitted >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_DEPTH:
+            _rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many sign-in requests right now. Please try again shortly.",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        _admitted += 1
+    # Released when the job finishes, even if the awaiting request was cancelled
+    future = _executor.submit(fn, *args)
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+def stats() -> dict:
+    with _lock:
+        return {"in_flight": _admitted, "rejected": _rejected}
+
+async def hash_password(password: str) -> str:
+    """Argon2 hash of `password`, computed on the password pool."""
+    return await _run(pwd_context.hash, password)
+
+async def verify_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    (valid, new_hash), computed on the password pool. new_hash is set when the stored
+    hash uses outdated parameters; save it in place of the old one.
+    """
+    return await _run(pwd_context.verify_and_update, password, hashed_password)
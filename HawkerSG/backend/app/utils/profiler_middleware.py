@@ -1,49 +1,171 @@
-from pyinstrument import Profiler
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.background import BackgroundTask
+import itertools
 import os
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+import anyio
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Request profiling with Pyinstrument, as pure ASGI middleware.
+# Requests that are not profiled go straight to the app: no task, stream or
+# Request object is created for them. A request is profiled when
+#   - it asks for it with ?profile=true (PROFILE_ON_DEMAND, default on),
+#   - it is the 1-in-PROFILE_SAMPLE_EVERY sampled request, or
+#   - PROFILE_SLOW_MS is set: every request then runs under the profiler and
+#     the profile is kept only if the request took at least that long.
+# Profiles are written after the response is sent, off the event loop, as
+# timestamped files in PROFILE_DIR; only the newest PROFILE_KEEP are kept.
+# GET /admin/profiles lists and downloads them.
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
 
 # Define a directory to save profile results
-PROFILE_DIR = os.path.join(os.getcwd(), "profiles")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.getcwd(), "profiles"))
 os.makedirs(PROFILE_DIR, exist_ok=True)
 
-class PyInstrumentProfilerMiddleware(BaseHTTPMiddleware):
+PROFILE_ON_DEMAND = os.getenv("PROFILE_ON_DEMAND", "1").lower() not in ("0", "false", "no")
+PROFILE_SAMPLE_EVERY = _env_int("PROFILE_SAMPLE_EVERY", 0)  # 0 = no sampling
+PROFILE_SLOW_MS = _env_int("PROFILE_SLOW_MS", 0)            # 0 = no latency capture
+PROFILE_KEEP = _env_int("PROFILE_KEEP", 50)
+PROFILE_FORMATS = tuple(f.strip() for f in os.getenv("PROFILE_FORMATS", "html,speedscope").split(",") if f.strip())
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+
+# format -> file extension
+EXTENSIONS = {"html": ".html", "speedscope": ".speedscope.json"}
+
+# <id>_<ms>ms.<ext>, where the id is <timestamp>_<METHOD>_<path>
+_PROFILE_NAME = re.compile(
+    r"^(?P<id>(?P<ts>\d{8}T\d{6}_\d{6})_(?P<method>[A-Z]+)_(?P<path>[A-Za-z0-9_-]+))_(?P<ms>\d+)ms(?P<ext>\.html|\.speedscope\.json)$"
+)
+
+def _render(profiler: Profiler, fmt: str) -> str:
+    if fmt == "speedscope":
+        return profiler.output(renderer=SpeedscopeRenderer())
+    return profiler.output_html()
+
+def _profile_id(scope: Scope, started: datetime) -> str:
+    route_path = re.sub(r"[^A-Za-z0-9-]+", "_", scope.get("path", "unknown")).strip("_")[:80] or "root"
+    return f"{started:%Y%m%dT%H%M%S_%f}_{scope.get('method', 'GET')}_{route_path}"
+
+def save_profile(profiler: Profiler, profile_id: str, duration_ms: int, formats=PROFILE_FORMATS) -> List[str]:
+    """Writes the profile in each format and prunes old profiles. Returns the filenames written."""
+    written = []
+    for fmt in formats:
+        filename = f"{profile_id}_{duration_ms}ms{EXTENSIONS[fmt]}"
+        with open(os.path.join(PROFILE_DIR, filename), "w", encoding="utf-8") as f:
+            f.write(_render(profiler, fmt))
+        written.append(filename)
+    prune(PROFILE_KEEP)
+    return written
+
+def prune(keep: int) -> int:
+    """Deletes all but the newest `keep` profiles. Returns the number of files removed."""
+    by_id: Dict[str, List[str]] = {}
+    for filename in os.listdir(PROFILE_DIR):
+        match = _PROFILE_NAME.match(filename)
+        if match:
+            by_id.setdefault(match["id"], []).append(filename)
+
+    removed = 0
+    # Ids start with the timestamp, so they sort oldest first
+    for profile_id in sorted(by_id)[:max(len(by_id) - keep, 0)]:
+        for filename in by_id[profile_id]:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, filename))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+def list_profiles() -> List[dict]:
+    """Saved profiles, newest first."""
+    profiles: Dict[str, dict] = {}
+    for filename in os.listdir(PROFILE_DIR):
+        match = _PROFILE_NAME.match(filename)
+        if not match:
+            continue
+        entry = profiles.setdefault(match["id"], {
+            "id": match["id"],
+            "created_at": datetime.strptime(match["ts"], "%Y%m%dT%H%M%S_%f").isoformat(),
+            "method": match["method"],
+            "path": match["path"],
+            "duration_ms": int(match["ms"]),
+            "files": {},
+        })
+        fmt = next(name for name, ext in EXTENSIONS.items() if ext == match["ext"])
+        entry["files"][fmt] = filename
+    return sorted(profiles.values(), key=lambda p: p["id"], reverse=True)
+
+def profile_file_path(filename: str) -> Optional[str]:
+    """Absolute path of a saved profile file, or None if `filename` is not one."""
+    if not _PROFILE_NAME.match(filename) or os.path.basename(filename) != filename:
+        return None
+    path = os.path.join(PROFILE_DIR, filename)
+    return path if os.path.isfile(path) else None
+
+def _wants_profile(scope: Scope) -> bool:
+    query_string = scope.get("query_string", b"")
+    if b"profile" not in query_string:
+        return False
+    values = parse_qs(query_string.decode("latin-1")).get("profile", [])
+    return any(v.lower() == "true" for v in values)
+
+class PyInstrumentProfilerMiddleware:
     """
-    A middleware to profile FastAPI requests using Pyinstrument.
-    The profiler is activated by adding ?profile=true to the request URL.
-    Results are saved as HTML flame graphs in the 'profiles' directory.
+    Profiles requests on demand (?profile=true), 1 in `sample_every`, or when
+    slower than `slow_ms`, and saves them as HTML and/or speedscope files.
+    Profiled responses carry an X-Profile-Id header when the profile is kept.
     """
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        # 1. Check if the profiling is requested via query parameter
-        if "profile" not in request.query_params or request.query_params["profile"].lower() != "true":
-            return await call_next(request)
-
-        # 2. Start the profiler
-        profiler = Profiler(async_mode="enabled")
-        
-        with profiler:
-            response = await call_next(request)
-        
-        # 3. Stop and process the profile
-        # Use the route path for the filename
-        route_path = request.scope.get('path', 'unknown').replace('/', '_').strip('_')
-        filename = f"{route_path}_profile.html"
-        output_path = os.path.join(PROFILE_DIR, filename)
-
-        # 4. Define a background task to save the profile (to avoid blocking the API response)
-        def save_profile_task():
-            # Get the HTML output from the profiler
-            profile_html = profiler.output_html()
-            with open(output_path, "w") as f:
-                f.write(profile_html)
-            print(f"Profile saved to: {output_path}")
-
-        # 5. Attach the saving function as a background task
-        response.background = BackgroundTask(save_profile_task)
-
-        # Optional: Add a header to the response to inform the user
-        response.headers["X-Profile-Path"] = output_path
-        
-        return response
\ No newline at end of file
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        on_demand: bool = PROFILE_ON_DEMAND,
+        sample_every: int = PROFILE_SAMPLE_EVERY,
+        slow_ms: int = PROFILE_SLOW_MS,
+    ):
+        self.app = app
+        self.on_demand = on_demand
+        self.sample_every = sample_every
+        self.slow_ms = slow_ms
+        self._counter = itertools.count()
+
+    def _sampled(self) -> bool:
+        return self.sample_every > 0 and next(self._counter) % self.sample_every == 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Always kept: explicitly requested or sampled. Otherwise only kept if slow.
+        keep = (self.on_demand and _wants_profile(scope)) or self._sampled()
+        if not keep and self.slow_ms <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = _profile_id(scope, datetime.now())
+        start = time.perf_counter()
+
+        async def send_with_header(message: Message) -> None:
+            if keep and message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            profiler.stop()
+            duration_ms = int((time.perf_counter() - start) * 1000)
+            if keep or duration_ms >= self.slow_ms:
+                # The response has been sent; render and write without blocking the loop
+                written = await anyio.to_thread.run_sync(save_profile, profiler, profile_id, duration_ms)
+                print(f"Profile saved to: {', '.join(written)}")
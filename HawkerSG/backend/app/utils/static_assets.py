@@ -0,0 +1,127 @@
+import mimetypes
+import os
+from typing import Callable, Dict, Optional
+from urllib.parse import quote
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Static photo serving ahead of the app's middleware.
+# StaticAssetsMiddleware is added last, so it is the outermost user middleware:
+# requests under a static prefix are answered straight from disk without going
+# through CORS, the profiler or routing. Responses carry Cache-Control, ETag
+# and Last-Modified (304 on revalidation), byte ranges are honoured, and a
+# precompressed `<file>.br` / `<file>.gz` is served when the client accepts it.
+# Starlette's FileResponse hands the path to the server (http.response.pathsend)
+# when the server supports it, so the bytes can go out via sendfile.
+#
+# Behind nginx, set STATIC_ACCEL_REDIRECT to an internal location and the app
+# only answers with an X-Accel-Redirect header; nginx then serves the file.
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Encoding -> suffix of the precompressed file, in order of preference
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+def _accepted_encodings(headers: Headers) -> set:
+    return {
+        part.split(";", 1)[0].strip().lower()
+        for part in headers.get("accept-encoding", "").split(",")
+    }
+
+class StaticAssets(StaticFiles):
+    """
+    StaticFiles with cache headers, precompressed variants and an optional
+    X-Accel-Redirect mode. `immutable(filename)` marks files whose content never
+    changes under their name (content-addressed uploads); everything else is
+    cached for `max_age` seconds and revalidated with its ETag.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_age: int = 3600,
+        immutable: Optional[Callable[[str], bool]] = None,
+        accel_redirect: Optional[str] = None,
+    ):
+        super().__init__(directory=directory, check_dir=False)
+        self.max_age = max_age
+        self.immutable = immutable
+        # e.g. "/internal" -> X-Accel-Redirect: /internal/businessPhotos/<file>
+        self.accel_redirect = accel_redirect.rstrip("/") if accel_redirect else None
+
+    def cache_control(self, filename: str) -> str:
+        if self.immutable is not None and self.immutable(filename):
+            return IMMUTABLE_CACHE_CONTROL
+        return f"public, max-age={self.max_age}"
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        full_path = str(full_path)
+        cache_headers = {
+            "Cache-Control": self.cache_control(os.path.basename(full_path)),
+            "Access-Control-Allow-Origin": "*",
+        }
+
+        if self.accel_redirect:
+            relative = os.path.relpath(full_path, os.path.realpath(self.directory)).replace(os.sep, "/")
+            folder = os.path.basename(os.path.normpath(self.directory))
+            target = quote(f"{self.accel_redirect}/{folder}/{relative}")
+            return Response(status_code=status_code, headers={**cache_headers, "X-Accel-Redirect": target})
+
+        request_headers = Headers(scope=scope)
+        response = self._precompressed_response(full_path, request_headers, status_code)
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers.update(cache_headers)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _precompressed_response(self, full_path: str, request_headers: Headers, status_code: int) -> Optional[Response]:
+        accepted = _accepted_encodings(request_headers)
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            try:
+                stat_result = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+            response = FileResponse(
+                full_path + suffix, status_code=status_code, stat_result=stat_result, media_type=media_type
+            )
+            response.headers["Content-Encoding"] = encoding
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+        return None
+
+    async def serve(self, path: str, scope: Scope, receive: Receive, send: Send) -> None:
+        """Answers a request for `path` (relative to the directory)."""
+        try:
+            relative = os.path.normpath(os.path.join(*path.split("/"))) if path else "."
+            response = await self.get_response(relative, scope)
+        except HTTPException as exc:
+            # Outside the app, so there is no exception handler to turn this into a response
+            response = PlainTextResponse(exc.detail, status_code=exc.status_code, headers=exc.headers)
+        await response(scope, receive, send)
+
+class StaticAssetsMiddleware:
+    """Pure ASGI middleware answering requests under each URL prefix from its StaticAssets."""
+
+    def __init__(self, app: ASGIApp, mounts: Dict[str, StaticAssets]):
+        self.app = app
+        # Longest prefix first, so nested prefixes resolve to the most specific mount
+        self.mounts = sorted(((prefix.rstrip("/") + "/", files) for prefix, files in mounts.items()),
+                             key=lambda m: -len(m[0]))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            path = scope["path"]
+            for prefix, files in self.mounts:
+                if path.startswith(prefix):
+                    await files.serve(path[len(prefix):], scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
@@ -0,0 +1,63 @@
+"""
+Microbenchmark: cost of the auth dependency per request.
+
+Times get_current_user_id / get_current_license_number (what every
+authenticated route runs) with the verified-token cache cold (HMAC check and
+claim validation on every call, as before) and warm (repeat requests with the
+same bearer token), plus token issuance.
+
+Run from the backend folder:
+    python -m benchmarks.bench_auth
+    python -m benchmarks.bench_auth --iterations 200000 --tokens 5000
+"""
+import argparse
+import time
+
+from app.dependencies import get_current_license_number, get_current_user_id
+from app.utils import jwt_utils
+
+def per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct active tokens (logged-in users)")
+    args = parser.parse_args()
+
+    consumer_tokens = [
+        jwt_utils.create_access_token({"user_id": i, "email": f"user{i}@example.com", "type": "consumer"})
+        for i in range(args.tokens)
+    ]
+    business_tokens = [
+        jwt_utils.create_access_token({"license_number": f"LIC{i:06d}", "type": "business"})
+        for i in range(args.tokens)
+    ]
+
+    def cold(dependency, tokens):
+        def call(i):
+            jwt_utils.clear_token_cache()
+            dependency(tokens[i % len(tokens)])
+        return call
+
+    def warm(dependency, tokens):
+        return lambda i: dependency(tokens[i % len(tokens)])
+
+    issue_us = per_call_us(lambda i: jwt_utils.create_access_token({"user_id": i, "type": "consumer"}), args.iterations // 10)
+    print(f"create_access_token: {issue_us:8.2f} us/token")
+    print(f"{'dependency':<28} {'cold us':>9} {'warm us':>9} {'speedup':>8}")
+    for label, dependency, tokens in [
+        ("get_current_user_id", get_current_user_id, consumer_tokens),
+        ("get_current_license_number", get_current_license_number, business_tokens),
+    ]:
+        cold_us = per_call_us(cold(dependency, tokens), args.iterations // 10)
+        for token in tokens:
+            dependency(token)
+        warm_us = per_call_us(warm(dependency, tokens), args.iterations)
+        print(f"{label:<28} {cold_us:>9.2f} {warm_us:>9.2f} {cold_us / warm_us:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Load test: login throughput with Argon2 on the bounded password pool vs the old
+inline path (sync handler verifying on FastAPI's shared threadpool).
+
+Creates a throwaway SQLite database with --users consumers, starts uvicorn with
+the real app plus a /sync/consumer/login route that verifies inline, then for
+each concurrency level fires a login burst and, at the same time, probes a cheap
+threadpool-served endpoint (GET /consumer/{id}) to show whether logins starve
+the rest of the API. Reports logins/s, login p50/p99, 429s and probe latency.
+
+Run from the backend folder:
+    python -m benchmarks.bench_login
+    python -m benchmarks.bench_login --concurrency 8 64 256 --requests 400
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PORT = 8798
+PASSWORD = "benchmark-password"
+
+def percentile(sorted_values, pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def build_app():
+    """The real app plus the pre-pool login (sync handler, inline Argon2) for comparison."""
+    from fastapi import APIRouter, Depends, HTTPException
+    from fastapi.security import OAuth2PasswordRequestForm
+    from sqlalchemy.orm import Session
+    from app.controllers import consumer_controller
+    from app.database import get_db
+    from app.main import app
+    from app.utils.password_utils import pwd_context
+
+    sync_router = APIRouter(prefix="/sync")
+
+    @sync_router.post("/consumer/login")
+    def sync_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+        db_user = consumer_controller.get_user_by_email(db, form_data.username)
+        if not db_user or not pwd_context.verify(form_data.password, db_user.hashed_password):
+            raise HTTPException(status_code=401, detail="Incorrect email or password")
+        return {"user_id": db_user.id}
+
+    app.include_router(sync_router)
+    return app
+
+def create_users(database_url: str, count: int) -> None:
+    os.environ["SQLALCHEMY_DATABASE_URL"] = database_url
+    from sqlalchemy import insert
+    from app.database import SessionLocal
+    from app.main import create_db_and_tables
+    from app.models.consumer_model import Consumer
+    from app.utils.password_utils import pwd_context
+
+    create_db_and_tables()
+    hashed = pwd_context.hash(PASSWORD)  # one hash shared by every user keeps setup fast
+    with SessionLocal() as db:
+        # ORM bulk insert fills both users and consumers rows
+        db.execute(insert(Consumer), [
+            {"id": i, "email": f"user{i}@example.com", "hashed_password": hashed,
+             "username": f"user{i}", "user_type": "consumer", "recentlySearch": ""}
+            for i in range(1, count + 1)
+        ])
+        db.commit()
+
+async def run_burst(client, path: str, users: int, concurrency: int, total: int):
+    latencies, statuses = [], {}
+    remaining = iter(range(total))
+    done = asyncio.Event()
+
+    async def worker():
+        for i in remaining:
+            started = time.perf_counter()
+            response = await client.post(path, data={"username": f"user{i % users + 1}@example.com", "password": PASSWORD})
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def probe():
+        samples = []
+        while not done.is_set():
+            started = time.perf_counter()
+            (await client.get("/consumer/1")).raise_for_status()
+            samples.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.02)
+        return sorted(samples)
+
+    probing = asyncio.ensure_future(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    probe_samples = await probing
+
+    latencies.sort()
+    return {
+        "rps": statuses.get(200, 0) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "shed": statuses.get(429, 0),
+        "probe_p50": percentile(probe_samples, 50) if probe_samples else float("nan"),
+        "probe_p99": percentile(probe_samples, 99) if probe_samples else float("nan"),
+    }
+
+async def benchmark(concurrency_levels, total: int, users: int):
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(concurrency_levels) + 1)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=300) as client:
+        for _ in range(100):
+            try:
+                (await client.get("/health/live")).raise_for_status()
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+
+        print(f"{'path':<7} {'conc':>5} {'logins/s':>9} {'p50':>9} {'p99':>9} {'429s':>5}  {'probe p50':>9} {'probe p99':>9}")
+        for concurrency in concurrency_levels:
+            for label, path in (("inline", "/sync/consumer/login"), ("pool", "/consumer/login")):
+                r = await run_burst(client, path, users, concurrency, total)
+                print(f"{label:<7} {concurrency:>5} {r['rps']:>9.1f} {r['p50']:>7.0f}ms {r['p99']:>7.0f}ms {r['shed']:>5}"
+                      f"  {r['probe_p50']:>7.1f}ms {r['probe_p99']:>7.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 32, 128])
+    parser.add_argument("--requests", type=int, default=200, help="logins per path per concurrency level")
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        subprocess.run(
+            [sys.executable, "-c", f"from benchmarks.bench_login import create_users; create_users({database_url!r}, {args.users})"],
+            env=dict(os.environ, PYTHONPATH=os.getcwd()), check=True, stdout=subprocess.DEVNULL,
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmarks.bench_login:bench_app",
+             "--port", str(PORT), "--log-level", "warning", "--no-access-log", "--timeout-keep-alive", "300"],
+            env=dict(os.environ, SQLALCHEMY_DATABASE_URL=database_url, SEED_ON_STARTUP="0", PYTHONPATH=os.getcwd()),
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            asyncio.run(benchmark(args.concurrency, args.requests, args.users))
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
+elif __name__ == "benchmarks.bench_login" and "uvicorn" in sys.modules:
+    # Imported by uvicorn in the server subprocess
+    bench_app = build_app()
@@ -0,0 +1,129 @@
+"""
+Benchmark the review/favourite lookup paths as the reviews table grows.
+
+Builds a throwaway SQLite database per size using the real models, then times
+the queries issued by list_reviews_for_target, upsert_review's existence check,
+list_reviews_for_consumer, favourite_controller._is_favourite and
+list_favourites. With the composite indexes the timings should stay flat.
+
+Run from the backend folder:
+    python -m benchmarks.bench_review_indexes                    # 10k, 100k, 1M reviews
+    python -m benchmarks.bench_review_indexes --sizes 10000 100000
+    python -m benchmarks.bench_review_indexes --no-indexes       # baseline for comparison
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, create_engine, exists, insert, select, text
+
+from app.database import Base
+from app.models import consumer_model, user_model  # noqa: F401 (register tables for FKs)
+from app.models.favourite_model import Favourite
+from app.models.review_model import Review
+
+NUM_TARGETS = 11_400          # roughly the number of SFA stalls
+REVIEWS_PER_CONSUMER = 50
+FAVOURITES_PER_CONSUMER = 20
+BATCH_SIZE = 50_000
+REPEATS = 200
+
+QUERIES = {
+    "list_reviews_for_target": lambda c, t: select(Review).where(
+        Review.target_type == "business", Review.target_id == t
+    ).order_by(Review.created_at.desc()),
+    "upsert_review existence check": lambda c, t: select(Review).where(
+        Review.consumer_id == c, Review.target_type == "business", Review.target_id == t
+    ).limit(1),
+    "list_reviews_for_consumer": lambda c, t: select(Review).where(
+        Review.consumer_id == c
+    ).order_by(Review.created_at.desc()),
+    "_is_favourite": lambda c, t: select(exists().where(and_(
+        Favourite.consumer_id == c, Favourite.target_type == "business", Favourite.target_id == t
+    ))),
+    "list_favourites": lambda c, t: select(Favourite).where(Favourite.consumer_id == c),
+}
+
+def _target_for(i: int) -> int:
+    # 7919 is coprime with NUM_TARGETS, so each consumer's targets are distinct
+    return (i * 7919) % NUM_TARGETS + 1
+
+def build_database(path: str, num_reviews: int, with_indexes: bool):
+    engine = create_engine(f"sqlite:///{path}")
+    tables = [Review.__table__, Favourite.__table__]
+    if not with_indexes:
+        for table in tables:
+            table.indexes.clear()
+    Base.metadata.create_all(engine, tables=tables)
+
+    start = datetime(2025, 1, 1)
+    num_consumers = max(1, num_reviews // REVIEWS_PER_CONSUMER)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=OFF")
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        for offset in range(0, num_reviews, BATCH_SIZE):
+            conn.execute(insert(Review), [
+                {
+                    "consumer_id": i // REVIEWS_PER_CONSUMER + 1,
+                    "target_type": "business",
+                    "target_id": _target_for(i),
+                    "star_rating": i % 5 + 1,
+                    "description": "",
+                    "images": "",
+                    "created_at": start + timedelta(minutes=i),
+                    "updated_at": start + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, num_reviews))
+            ])
+        num_favourites = num_consumers * FAVOURITES_PER_CONSUMER
+        for offset in range(0, num_favourites, BATCH_SIZE):
+            conn.execute(insert(Favourite), [
+                {
+                    "consumer_id": i // FAVOURITES_PER_CONSUMER + 1,
+                    "target_type": "business",
+                    "target_id": _target_for(i),
+                    "created_at": start + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, num_favourites))
+            ])
+        conn.exec_driver_sql("ANALYZE")
+    return engine, num_consumers
+
+def time_queries(engine, num_consumers: int):
+    rng = random.Random(42)
+    results = {}
+    with engine.connect() as conn:
+        for name, build in QUERIES.items():
+            plan = conn.execute(text("EXPLAIN QUERY PLAN " + str(build(1, 1).compile(
+                compile_kwargs={"literal_binds": True}
+            )))).all()
+            started = time.perf_counter()
+            for _ in range(REPEATS):
+                consumer = rng.randint(1, num_consumers)
+                target = _target_for((consumer - 1) * REVIEWS_PER_CONSUMER)
+                conn.execute(build(consumer, target)).all()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / REPEATS
+            results[name] = (elapsed_ms, " | ".join(row[-1] for row in plan))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--no-indexes", action="store_true", help="drop the composite indexes for a baseline run")
+    args = parser.parse_args()
+
+    print(f"{'reviews':>10}  {'query':<32} {'ms/query':>9}  plan")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            build_started = time.perf_counter()
+            engine, num_consumers = build_database(os.path.join(tmp, "bench.db"), size, not args.no_indexes)
+            print(f"-- built {size:,} reviews in {time.perf_counter() - build_started:.1f}s")
+            for name, (ms, plan) in time_queries(engine, num_consumers).items():
+                print(f"{size:>10,}  {name:<32} {ms:>9.3f}  {plan}")
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
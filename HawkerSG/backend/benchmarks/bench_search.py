@@ -0,0 +1,68 @@
+"""
+Benchmark the in-process search index used by GET /search.
+
+Indexes every stall in SFA/SFA-Scrape/merged_results.csv (about 11k rows)
+plus a few synthetic menu items per stall, then times exact, prefix, typo and
+multi-word queries. Compare with a LIKE '%word%' scan, which is what the
+database would have to do without an index.
+
+Run from the backend folder:
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --repeats 2000
+"""
+import argparse
+import csv
+import os
+import random
+import time
+from types import SimpleNamespace
+
+from app.services.search_index import SearchIndex, stall_document
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "SFA", "SFA-Scrape", "merged_results.csv")
+DISHES = ["chicken rice", "char kway teow", "laksa", "fishball noodle", "nasi lemak", "prawn mee",
+          "carrot cake", "satay", "roti prata", "mee goreng", "bak chor mee", "duck rice"]
+QUERIES = ["chicken", "laksa", "char kway", "maxwell", "nasi lem", "chiken rice", "fishbal noodle", "b"]
+
+def load_stalls():
+    rng = random.Random(42)
+    with open(CSV_PATH, newline="", encoding="utf-8") as f:
+        for i, row in enumerate(csv.DictReader(f), start=1):
+            stall = SimpleNamespace(
+                id=i, license_number=row["Licence Number"], stall_name=row["Business Name"],
+                licensee_name=row["Licensee Name"], hawker_centre=row["Hawker Centre"],
+                cuisine_type=None, photo="",
+            )
+            yield stall, [(dish.title(), None) for dish in rng.sample(DISHES, 3)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=500)
+    args = parser.parse_args()
+
+    stalls = list(load_stalls())
+    start = time.perf_counter()
+    index = SearchIndex()
+    for stall, menu in stalls:
+        index.upsert(*stall_document(stall, menu))
+    print(f"Indexed {len(index)} stalls in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    texts = [" ".join(filter(None, [s.stall_name, s.licensee_name, s.hawker_centre] + [m for m, _ in menu])).lower()
+             for s, menu in stalls]
+
+    print(f"{'query':<16}{'matches':>9}{'index (ms)':>13}{'LIKE scan (ms)':>17}")
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            total, _ = index.search(query, 20)
+        indexed = (time.perf_counter() - start) * 1000 / args.repeats
+
+        words = query.split()
+        start = time.perf_counter()
+        for _ in range(max(args.repeats // 10, 1)):
+            [t for t in texts if all(w in t for w in words)]
+        scan = (time.perf_counter() - start) * 1000 / max(args.repeats // 10, 1)
+        print(f"{query:<16}{total:>9}{indexed:>13.3f}{scan:>17.3f}")
+
+if __name__ == "__main__":
+    main()
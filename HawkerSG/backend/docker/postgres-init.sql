@@ -0,0 +1 @@
+CREATE DATABASE hawkersg_test OWNER hawkersg;
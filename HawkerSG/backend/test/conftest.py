@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, make_async_engine, make_engine
+from app.models import (  # noqa: F401 (register every table)
+    business_model, consumer_model, favourite_model, hawker_centre_model, menu_item_model,
+    operating_hour_model, review_aggregate_model, review_model, stored_photo_model, user_model,
+)
+
+
+@dataclass
+class Database:
+    """A throwaway SQLite file with every table created."""
+    url: str
+    engine: Engine
+    session: sessionmaker  # sync Session factory
+
+
+@pytest.fixture
+def database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    yield Database(url, engine, sessionmaker(bind=engine))
+    engine.dispose()
+
+
+@pytest.fixture
+def db(database):
+    """A sync Session on the test database."""
+    with database.session() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def async_sessions(database):
+    """AsyncSession factory on the test database, configured like AsyncSessionLocal."""
+    engine = make_async_engine(database.url)
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def async_db(async_sessions):
+    """An AsyncSession on the test database."""
+    async with async_sessions() as session:
+        yield session
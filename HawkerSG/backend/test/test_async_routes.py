@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import anyio
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from app.controllers import favourite_controller
+from app.database import get_async_db
+from app.dependencies import get_current_user_id
+from app.models.consumer_model import Consumer
+from app.models.hawker_centre_model import HawkerCentre
+from app.models.review_aggregate_model import ReviewAggregate
+from app.routes.favourite_route import router as favourite_router
+from app.routes.hawker_route import router as hawker_router
+from app.routes.review_route import router as review_router
+from app.services import hawker_catalogue
+
+CONSUMER_ID = 1
+
+
+@pytest_asyncio.fixture
+async def client(database, async_sessions):
+    """The hawker, favourite and review routers on one event loop, signed in as consumer 1."""
+    with database.session() as db:
+        db.add(Consumer(id=CONSUMER_ID, email="c1@example.com", username="user1", user_type="consumer"))
+        for hawker_id, name in ((1, "Maxwell Food Centre"), (2, "Newton Food Centre")):
+            db.add(HawkerCentre(id=hawker_id, name=name, address="", description="", image="", rating=0.0,
+                                latitude=1.3, longitude=103.8))
+        db.add(ReviewAggregate(target_type="hawker", target_id=1, review_count=3, rating_sum=13))
+        db.commit()
+
+    async def override_async_db():
+        async with async_sessions() as db:
+            yield db
+
+    app = FastAPI()
+    for router in (hawker_router, favourite_router, review_router):
+        app.include_router(router)
+    app.dependency_overrides[get_async_db] = override_async_db
+    app.dependency_overrides[get_current_user_id] = lambda: CONSUMER_ID
+
+    @app.get("/sync")
+    def sync_route():
+        return {}
+
+    hawker_catalogue.invalidate()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as test_client:
+        yield test_client
+    hawker_catalogue.invalidate()
+
+
+# Test Case 1: Hawker centres come with their review totals; the list revalidates by ETag
+@pytest.mark.asyncio
+async def test_hawkers(client):
+    maxwell = (await client.get("/hawkers/1")).json()
+    assert (maxwell["name"], maxwell["rating"], maxwell["review_count"]) == ("Maxwell Food Centre", 4.33, 3)
+    assert (await client.get("/hawkers/99")).status_code == 404
+
+    listing = await client.get("/hawkers/")
+    assert [hawker["id"] for hawker in listing.json()] == [1, 2]
+    revalidated = await client.get("/hawkers/", headers={"If-None-Match": listing.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+
+# Test Case 2: Favourites add, report duplicates, toggle and remove, for the signed-in consumer only
+@pytest.mark.asyncio
+async def test_favourites(client):
+    path = f"/consumers/{CONSUMER_ID}/favourites"
+    target = {"target_type": "hawkercentre", "target_id": 1}
+
+    assert (await client.post(path, json=target)).json()["action"] == "added"
+    assert (await client.post(path, json=target)).json()["action"] == "exists"
+    assert (await client.post(f"{path}/toggle", json={"target_type": "hawkercentre", "target_id": 2})).json()["action"] == "added"
+    assert [(f["target_type"], f["target_id"]) for f in (await client.get(path)).json()] == [("hawkercentre", 1), ("hawkercentre", 2)]
+
+    assert (await client.request("DELETE", path, json=target)).json()["action"] == "removed"
+    assert (await client.request("DELETE", path, json=target)).status_code == 404
+    assert (await client.post(f"{path}/toggle", json={"target_type": "hawkercentre", "target_id": 2})).json()["action"] == "removed"
+    assert (await client.post("/consumers/2/favourites", json=target)).status_code == 403
+
+
+# Test Case 3: A review updates its target's rating, and shows in both listings
+@pytest.mark.asyncio
+async def test_reviews(client):
+    created = await client.post(f"/consumers/{CONSUMER_ID}/reviews",
+                                json={"target_type": "hawker", "target_id": 2, "star_rating": 4, "description": "Good"})
+    assert created.status_code == 201
+
+    assert (await client.get("/targets/hawker/2/reviews/average")).json()["average_rating"] == 4.0
+    assert [r["description"] for r in (await client.get("/targets/hawker/2/reviews")).json()["items"]] == ["Good"]
+    assert len((await client.get(f"/consumers/{CONSUMER_ID}/reviews")).json()["items"]) == 1
+
+
+# Test Case 4: The async routes keep serving while the threadpool is exhausted; a sync route cannot
+@pytest.mark.asyncio
+async def test_routes_do_not_need_the_threadpool(client):
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    total_tokens, limiter.total_tokens = limiter.total_tokens, 1
+    release = threading.Event()
+    holder = asyncio.create_task(anyio.to_thread.run_sync(release.wait))  # takes the only worker
+    await asyncio.sleep(0.05)
+    try:
+        paths = ["/hawkers/1", f"/consumers/{CONSUMER_ID}/favourites", "/targets/hawker/1/reviews",
+                 "/targets/hawker/1/reviews/average"] * 5
+        requests = [client.get(path) for path in paths]
+        responses = await asyncio.wait_for(asyncio.gather(*requests), timeout=10)
+        assert [response.status_code for response in responses] == [200] * 20
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.get("/sync"), timeout=0.2)
+    finally:
+        release.set()
+        await holder
+        limiter.total_tokens = total_tokens
+
+
+# Test Case 5: A favourite added concurrently since the check is reported as existing, not a 500
+@pytest.mark.asyncio
+async def test_concurrent_favourite_add(client, monkeypatch):
+    path = f"/consumers/{CONSUMER_ID}/favourites"
+    target = {"target_type": "hawkercentre", "target_id": 1}
+    assert (await client.post(path, json=target)).json()["action"] == "added"
+
+    async def checked_before_other_commit(*args):
+        return False
+
+    monkeypatch.setattr(favourite_controller, "_is_favourite", checked_before_other_commit)
+    assert (await client.post(path, json=target)).json()["action"] == "exists"
+    assert (await client.post(f"{path}/toggle", json=target)).json()["action"] == "exists"
+    assert len((await client.get(path)).json()) == 1
@@ -0,0 +1,72 @@
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.utils.body_limit import BodySizeLimitMiddleware
+
+LIMIT = 64 * 1024
+
+
+@pytest.fixture
+def client():
+    """An upload route behind the limit; records the uploads that reach it."""
+    received = []
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {"size": received[-1]}
+
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=LIMIT)
+    with TestClient(app) as test_client:
+        yield test_client, received
+
+
+def _chunks(total, size=8 * 1024):
+    """A multipart body sent without Content-Length (chunked), as a streaming client would."""
+    yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.jpg"\r\n\r\n'
+    for _ in range(total // size):
+        yield b"x" * size
+    yield b"\r\n--b--\r\n"
+
+
+# Test Case 1: Uploads under the limit pass through
+def test_allows_small_bodies(client):
+    test_client, received = client
+    response = test_client.post("/upload", files={"file": ("a.jpg", b"x" * 1000)})
+    assert response.status_code == 200 and received == [1000]
+
+
+# Test Case 2: A declared Content-Length over the limit is refused before the route runs
+def test_rejects_declared_length(client):
+    test_client, received = client
+    response = test_client.post("/upload", files={"file": ("a.jpg", b"x" * (LIMIT + 1))})
+    assert response.status_code == 413
+    assert response.headers["connection"] == "close"
+    assert received == []
+
+
+# Test Case 3: A chunked body is cut off with 413 once it passes the limit
+def test_rejects_chunked_body(client):
+    test_client, received = client
+    headers = {"Content-Type": "multipart/form-data; boundary=b"}
+
+    response = test_client.post("/upload", content=_chunks(LIMIT * 4), headers=headers)
+    assert response.status_code == 413 and "maximum" in response.json()["detail"]
+    assert received == []
+
+    assert test_client.post("/upload", content=_chunks(LIMIT // 2), headers=headers).status_code == 200
+
+
+# Test Case 4: Bodies read outside FastAPI's parsing (plain ASGI apps) get the same 413
+def test_rejects_in_plain_asgi_app():
+    async def app(scope, receive, send):
+        while (await receive()).get("more_body"):
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    test_client = TestClient(BodySizeLimitMiddleware(app, max_bytes=LIMIT))
+    assert test_client.post("/", content=_chunks(LIMIT * 2)).status_code == 413
+    assert test_client.post("/", content=b"x" * 100).status_code == 200
@@ -1,3 +1,6 @@
+import functools
+
+import anyio
 import pytest
 from unittest.mock import MagicMock, patch
 from fastapi import HTTPException, status
@@ -6,6 +9,10 @@ from fastapi.security import OAuth2PasswordRequestForm
 
 from app.models.user_model import User as DBUser
 
+async def _run_route(route, **kwargs):
+    """Runs a sync route in a worker thread, as FastAPI does, so it can reach the hashing pool."""
+    return await anyio.to_thread.run_sync(functools.partial(route, **kwargs))
+
 # Initilise mock data and db session
 @pytest.fixture
 def mock_db_session():
@@ -59,10 +66,11 @@ def consumer_form_data_wrong_password():
 # ==============================================================================
 
 # Test Case 1: Valid Login (Success Path) - 200
+@pytest.mark.asyncio
 @patch('app.routes.consumer_route.consumer_controller.get_user_by_email')
-@patch('app.routes.consumer_route.consumer_controller.verify_password', return_value=True)
+@patch('app.routes.consumer_route.consumer_controller.verify_password', return_value=(True, None))
 @patch('app.routes.consumer_route.create_access_token', return_value="MOCKED_JWT_TOKEN")
-def test_case_1_valid_login(
+async def test_case_1_valid_login(
     mock_create_token, mock_verify_password, mock_get_user,
     mock_db_session, consumer_form_data, mock_consumer_user
 ):
@@ -73,7 +81,7 @@ def test_case_1_valid_login(
     from app.routes.consumer_route import login_user
     
     # Run the function
-    response = login_user(form_data=consumer_form_data, db=mock_db_session)
+    response = await _run_route(login_user, form_data=consumer_form_data, db=mock_db_session)
     
     # Assertions
     mock_get_user.assert_called_once_with(mock_db_session, "test.consumer@example.com")
@@ -85,15 +93,16 @@ def test_case_1_valid_login(
 
 
 # Test Case 2: User Not Found (Incorrect Email) - 401
+@pytest.mark.asyncio
 @patch('app.routes.consumer_route.consumer_controller.get_user_by_email')
-def test_case_2_invalid_user(mock_get_user, mock_db_session, consumer_form_data):
+async def test_case_2_invalid_user(mock_get_user, mock_db_session, consumer_form_data):
     # Setup mocks: User lookup returns None
     mock_get_user.return_value = None
 
     from app.routes.consumer_route import login_user
 
     with pytest.raises(HTTPException) as excinfo:
-        login_user(form_data=consumer_form_data, db=mock_db_session)
+        await _run_route(login_user, form_data=consumer_form_data, db=mock_db_session)
         
     # Assertions
     assert excinfo.value.status_code == status.HTTP_401_UNAUTHORIZED
@@ -102,9 +111,10 @@ def test_case_2_invalid_user(mock_get_user, mock_db_session, consumer_form_data)
 
 
 # Test Case 3: Incorrect Password - 401
+@pytest.mark.asyncio
 @patch('app.routes.consumer_route.consumer_controller.get_user_by_email')
-@patch('app.routes.consumer_route.consumer_controller.verify_password', return_value=False)
-def test_case_3_invalid_password(
+@patch('app.routes.consumer_route.consumer_controller.verify_password', return_value=(False, None))
+async def test_case_3_invalid_password(
     mock_verify_password, mock_get_user, 
     mock_db_session, consumer_form_data_wrong_password, mock_consumer_user
 ):
@@ -114,7 +124,7 @@ def test_case_3_invalid_password(
     from app.routes.consumer_route import login_user
     
     with pytest.raises(HTTPException) as excinfo:
-        login_user(form_data=consumer_form_data_wrong_password, db=mock_db_session) # Use the new fixture
+        await _run_route(login_user, form_data=consumer_form_data_wrong_password, db=mock_db_session) # Use the new fixture
         
     # Assertions
     assert excinfo.value.status_code == status.HTTP_401_UNAUTHORIZED
@@ -124,9 +134,10 @@ def test_case_3_invalid_password(
 
 
 # Test Case 4: User is correct but is the wrong type ('business') - 401
+@pytest.mark.asyncio
 @patch('app.routes.consumer_route.consumer_controller.get_user_by_email')
-@patch('app.routes.consumer_route.consumer_controller.verify_password', return_value=True)
-def test_case_4_invalid_usertype(
+@patch('app.routes.consumer_route.consumer_controller.verify_password', return_value=(True, None))
+async def test_case_4_invalid_usertype(
     mock_verify_password, mock_get_user, 
     mock_db_session, consumer_form_data, mock_business_user
 ):
@@ -136,7 +147,7 @@ def test_case_4_invalid_usertype(
     from app.routes.consumer_route import login_user
     
     with pytest.raises(HTTPException) as excinfo:
-        login_user(form_data=consumer_form_data, db=mock_db_session)
+        await _run_route(login_user, form_data=consumer_form_data, db=mock_db_session)
         
     # Assertions
     assert excinfo.value.status_code == status.HTTP_401_UNAUTHORIZED
@@ -144,4 +155,23 @@ def test_case_4_invalid_usertype(
     # Ensure password verification happened, but type check failed
     mock_verify_password.assert_called_once()
 
+# Test Case 5: Hash made with outdated Argon2 parameters is replaced on successful login - 200
+@pytest.mark.asyncio
+@patch('app.routes.consumer_route.consumer_controller.update_password_hash')
+@patch('app.routes.consumer_route.consumer_controller.get_user_by_email')
+@patch('app.routes.consumer_route.consumer_controller.verify_password', return_value=(True, "rehashed_consumer_password"))
+@patch('app.routes.consumer_route.create_access_token', return_value="MOCKED_JWT_TOKEN")
+async def test_case_5_rehash_on_login(
+    mock_create_token, mock_verify_password, mock_get_user, mock_update_hash,
+    mock_db_session, consumer_form_data, mock_consumer_user
+):
+    mock_get_user.return_value = mock_consumer_user
+
+    from app.routes.consumer_route import login_user
+
+    response = await _run_route(login_user, form_data=consumer_form_data, db=mock_db_session)
+
+    assert response["access_token"] == "MOCKED_JWT_TOKEN"
+    mock_update_hash.assert_called_once_with(mock_db_session, mock_consumer_user, "rehashed_consumer_password")
+
 # python -m pytest test/test_consumer_login.py
\ No newline at end of file
@@ -0,0 +1,40 @@
+from app.services.geo_index import GeoIndex, postal_from_address
+
+# (name, latitude, longitude)
+CENTRES = [
+    ("Maxwell", 1.28030, 103.84470),
+    ("Amoy Street", 1.27930, 103.84650),
+    ("Chinatown Complex", 1.28230, 103.84300),
+    ("Newton", 1.31200, 103.83950),
+    ("Changi Village", 1.38910, 103.98750),
+]
+
+def make_index():
+    return GeoIndex([c[1] for c in CENTRES], [c[2] for c in CENTRES])
+
+
+# Test Case 1: Results are within the radius, nearest first
+def test_nearest_orders_by_distance_within_radius():
+    results = make_index().nearest(1.2804, 103.8448, radius_m=1000, limit=10)
+
+    assert [CENTRES[i][0] for i, _ in results] == ["Maxwell", "Amoy Street", "Chinatown Complex"]
+    distances = [d for _, d in results]
+    assert distances == sorted(distances)
+    assert distances[0] < 50
+    assert all(d <= 1000 for d in distances)
+
+
+# Test Case 2: limit keeps only the closest matches; far-away queries find nothing
+def test_nearest_limit_and_empty():
+    index = make_index()
+
+    assert [CENTRES[i][0] for i, _ in index.nearest(1.2804, 103.8448, 50000, 2)] == ["Maxwell", "Amoy Street"]
+    assert len(index.nearest(1.2804, 103.8448, 50000, 10)) == 5
+    assert index.nearest(0.0, 0.0, 2000, 10) == []
+
+
+# Test Case 3: Postal codes keep their leading zero
+def test_postal_from_address():
+    assert postal_from_address("Blk 50, Market Street, CapitaSpring S(48947)") == "048947"
+    assert postal_from_address("1 Kadayanallur Street S(069184)") == "069184"
+    assert postal_from_address("No postal code") is None
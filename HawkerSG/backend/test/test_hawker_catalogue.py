@@ -0,0 +1,66 @@
+import pytest
+
+from app.services import hawker_catalogue
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalogue():
+    hawker_catalogue.invalidate()
+    yield
+    hawker_catalogue.invalidate()
+
+def make_loader(items):
+    calls = []
+
+    async def load(db):
+        calls.append(db)
+        return items
+
+    return load, calls
+
+
+# Test Case 1: The payload is built once and served from memory until invalidated
+@pytest.mark.asyncio
+async def test_catalogue_cached_until_invalidated():
+    load, calls = make_loader([{"id": 1, "name": "Maxwell Food Centre"}])
+
+    first = await hawker_catalogue.get(None, load)
+    second = await hawker_catalogue.get(None, load)
+    assert len(calls) == 1
+    assert second is first
+    assert hawker_catalogue.current() is first
+    assert first.body == b'[{"id":1,"name":"Maxwell Food Centre"}]'
+
+    hawker_catalogue.invalidate()
+    assert hawker_catalogue.current() is None
+    rebuilt = await hawker_catalogue.get(None, load)
+    assert len(calls) == 2
+    # Same content, same strong ETag
+    assert rebuilt.etag == first.etag
+    assert rebuilt.version > first.version
+
+
+# Test Case 2: The ETag changes with the content
+@pytest.mark.asyncio
+async def test_etag_changes_with_content():
+    load_a, _ = make_loader([{"id": 1, "rating": 4.0}])
+    load_b, _ = make_loader([{"id": 1, "rating": 4.5}])
+
+    a = await hawker_catalogue.get(None, load_a)
+    hawker_catalogue.invalidate()
+    b = await hawker_catalogue.get(None, load_b)
+    assert a.etag != b.etag
+    assert a.etag.startswith('"') and a.etag.endswith('"')
+
+
+# Test Case 3: If-None-Match parsing
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+])
+def test_etag_matches(header, expected):
+    assert hawker_catalogue.etag_matches(header, '"abc"') is expected
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+
+from app.utils import http_client
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Local stand-in for an upstream API. Behaviour is chosen by path."""
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b"ok", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        with server.lock:
+            server.hits[self.path] += 1
+            hits = server.hits[self.path]
+            server.client_ports.add(self.client_address[1])
+
+        if url.path == "/ok":
+            self._reply(200)
+        elif url.path == "/flaky":
+            # 503 for the first `fail` hits, then 200
+            self._reply(503 if hits <= int(query["fail"][0]) else 200)
+        elif url.path == "/throttled":
+            self._reply(429, headers={"Retry-After": "0"}) if hits == 1 else self._reply(200)
+        elif url.path == "/down":
+            self._reply(500)
+        elif url.path == "/slow":
+            with server.lock:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            time.sleep(float(query["s"][0]))
+            with server.lock:
+                server.in_flight -= 1
+            self._reply(200)
+        elif url.path == "/api/public/popapi/getPlanningarea":
+            ok = self.headers.get("Authorization") == "stub-token"
+            self._reply(200 if ok else 401, json.dumps([{"pln_area_n": "TOA PAYOH"}]).encode())
+        else:
+            self._reply(404)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.hits[self.path] += 1
+        if self.path == "/api/auth/post/getToken" and json.loads(body)["email"] == "stub@example.com":
+            payload = {"access_token": "stub-token", "expiry_timestamp": str(int(time.time()) + 3 * 86400)}
+            self._reply(200, json.dumps(payload).encode())
+        else:
+            self._reply(404)
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.hits = Counter()
+    server.client_ports = set()
+    server.in_flight = server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    http_client.reset_state()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    http_client.reset_state()
+
+
+# Test Case 1: Sequential requests reuse one keep-alive connection and are timed per host
+@pytest.mark.asyncio
+async def test_connection_reuse_and_metrics(stub):
+    server, base = stub
+    for _ in range(3):
+        assert (await http_client.get(f"{base}/ok")).status_code == 200
+    await http_client.aclose()
+
+    assert len(server.client_ports) == 1
+    stats = http_client.metrics()[urlsplit(base).netloc]
+    assert stats["requests"] == 3 and stats["failures"] == 0
+    assert stats["p50_ms"] is not None and stats["circuit"] == "closed"
+
+
+# Test Case 2: Transient 503s and 429s are retried; POSTs are not retried by default
+@pytest.mark.asyncio
+async def test_retries_transient_statuses(stub, monkeypatch):
+    server, base = stub
+    monkeypatch.setattr(http_client, "BACKOFF_BASE_SECONDS", 0.001)
+
+    assert (await http_client.get(f"{base}/flaky?fail=2")).status_code == 200
+    assert server.hits["/flaky?fail=2"] == 3
+    assert (await http_client.get(f"{base}/throttled")).status_code == 200
+    assert http_client.metrics()[urlsplit(base).netloc]["retries"] == 3
+
+    # Out of retries: the last response is returned to the caller
+    assert (await http_client.get(f"{base}/flaky?fail=5", retries=1)).status_code == 503
+    await http_client.aclose()
+
+
+# Test Case 3: Consecutive failures open the circuit, which fails fast, then recovers via a trial request
+@pytest.mark.asyncio
+async def test_circuit_breaker(stub, monkeypatch):
+    server, base = stub
+    monkeypatch.setattr(http_client, "BREAKER_FAILURES", 3)
+    monkeypatch.setattr(http_client, "BREAKER_RESET_SECONDS", 0.2)
+
+    for _ in range(3):
+        assert (await http_client.get(f"{base}/down", retries=0)).status_code == 500
+    with pytest.raises(http_client.CircuitOpenError):
+        await http_client.get(f"{base}/ok")
+    assert server.hits["/ok"] == 0
+    assert http_client.metrics()[urlsplit(base).netloc]["circuit"] == "open"
+
+    await asyncio.sleep(0.25)
+    assert (await http_client.get(f"{base}/ok")).status_code == 200
+    assert http_client.metrics()[urlsplit(base).netloc]["circuit"] == "closed"
+    await http_client.aclose()
+
+
+# Test Case 4: At most PER_HOST_LIMIT requests are in flight to one host
+@pytest.mark.asyncio
+async def test_per_host_concurrency_limit(stub, monkeypatch):
+    server, base = stub
+    monkeypatch.setattr(http_client, "PER_HOST_LIMIT", 2)
+
+    responses = await asyncio.gather(*(http_client.get(f"{base}/slow?s=0.05") for _ in range(6)))
+    assert all(r.status_code == 200 for r in responses)
+    assert server.max_in_flight == 2
+    await http_client.aclose()
+
+
+# Test Case 5: Slow upstreams hit the read timeout instead of hanging the caller
+@pytest.mark.asyncio
+async def test_timeout(stub):
+    server, base = stub
+    with pytest.raises(httpx.ReadTimeout):
+        await http_client.get(f"{base}/slow?s=0.5", timeout=0.1, retries=0)
+    assert http_client.metrics()[urlsplit(base).netloc]["failures"] == 1
+    await http_client.aclose()
+
+
+# Test Case 6: Without local polygons, /hawkers/planning-area goes to OneMap through the shared client
+def test_planning_area_onemap_fallback(stub, monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services import planning_area
+    from app.utils import onemap_token_manager
+
+    server, base = stub
+    monkeypatch.setattr(onemap_token_manager, "ONEMAP_BASE_URL", base)
+    monkeypatch.setattr(onemap_token_manager, "ONEMAP_TOKEN_URL", f"{base}/api/auth/post/getToken")
+    monkeypatch.setattr(onemap_token_manager, "ONEMAP_EMAIL", "stub@example.com")
+    monkeypatch.setattr(onemap_token_manager, "ONEMAP_PASSWORD", "secret")
+    monkeypatch.setattr(onemap_token_manager, "TOKEN_CACHE_FILE", str(tmp_path / "token.json"))
+    monkeypatch.setattr(onemap_token_manager, "_cached_token", None)
+    monkeypatch.setattr(onemap_token_manager, "_token_expiry_timestamp", 0)
+    planning_area.use_index(None)
+
+    client = TestClient(app)
+    for _ in range(2):
+        response = client.get("/hawkers/planning-area", params={"latitude": 1.33, "longitude": 103.85})
+        assert response.status_code == 200
+        assert response.json() == "Toa Payoh"
+
+    # One token request, then the cached token is reused
+    assert server.hits["/api/auth/post/getToken"] == 1
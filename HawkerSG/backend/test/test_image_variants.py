@@ -0,0 +1,62 @@
+import os
+
+import pytest
+from PIL import Image
+
+from app.services import image_variants
+
+
+@pytest.fixture
+def photo_dir(monkeypatch, tmp_path):
+    """A temporary business photo folder holding one 2000x1000 JPEG."""
+    monkeypatch.setitem(image_variants.PHOTO_DIRS, "business", (str(tmp_path), "/static/business"))
+    monkeypatch.setattr(image_variants, "_ready", {})
+    monkeypatch.setattr(image_variants, "_scanned_at", {})
+    Image.new("RGB", (2000, 1000), "orange").save(tmp_path / "stall 1.jpg")
+    return tmp_path
+
+
+# Test Case 1: Variants are downscaled WebPs in the variants folder
+def test_generate_variants(photo_dir):
+    names = image_variants.generate("business", "stall 1.jpg")
+
+    assert names == {"thumb": "stall 1_thumb.webp", "medium": "stall 1_medium.webp", "webp": "stall 1.webp"}
+    sizes = {}
+    for name, filename in names.items():
+        with Image.open(photo_dir / "variants" / filename) as img:
+            assert img.format == "WEBP"
+            sizes[name] = img.size
+    assert sizes == {"thumb": (320, 160), "medium": (960, 480), "webp": (2000, 1000)}
+
+
+# Test Case 2: URLs are only advertised once generated, and keep the form of the stored photo value
+def test_variant_urls(photo_dir):
+    assert image_variants.variant_urls("business", "stall 1.jpg") is None
+
+    image_variants.schedule("business", "stall 1.jpg").result()
+
+    assert image_variants.variant_urls("business", "stall 1.jpg")["thumb"] == "/static/business/variants/stall 1_thumb.webp"
+    assert image_variants.variant_urls("business", "http://localhost:8001/static/business/stall 1.jpg")["medium"] == \
+        "http://localhost:8001/static/business/variants/stall 1_medium.webp"
+    assert image_variants.variant_urls("business", None) is None
+
+
+# Test Case 3: Removing a photo's variants deletes the files and stops advertising them
+def test_remove_variants(photo_dir):
+    image_variants.generate("business", "stall 1.jpg")
+    image_variants.remove("business", "stall 1.jpg")
+
+    assert os.listdir(photo_dir / "variants") == []
+    assert image_variants.variant_urls("business", "stall 1.jpg") is None
+
+
+# Test Case 4: Backfill covers every photo in the folder and skips up-to-date variants
+def test_backfill(photo_dir):
+    Image.new("RGBA", (50, 50)).save(photo_dir / "menu.png")
+    (photo_dir / "notes.txt").write_text("not a photo")
+
+    assert image_variants.backfill("business") == 2
+    thumb = photo_dir / "variants" / "menu_thumb.webp"
+    mtime = os.path.getmtime(thumb)
+    assert image_variants.backfill("business") == 2
+    assert os.path.getmtime(thumb) == mtime
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import pytest
+
+from app.utils import jwt_utils
+
+
+@pytest.fixture
+def counted_decode(monkeypatch):
+    """Counts signature verifications done by jose."""
+    calls = []
+    real_decode = jwt_utils.jwt.decode
+
+    def decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    jwt_utils.clear_token_cache()
+    monkeypatch.setattr(jwt_utils.jwt, "decode", decode)
+    yield calls
+    jwt_utils.clear_token_cache()
+
+
+# Test Case 1: Issuing a token does not decode it; repeat verification is served from the cache
+def test_verified_claims_cached(counted_decode):
+    token = jwt_utils.create_access_token({"user_id": 7, "type": "consumer"})
+    assert counted_decode == []
+
+    first = jwt_utils.decode_access_token(token)
+    second = jwt_utils.decode_access_token(token)
+    assert first["user_id"] == second["user_id"] == 7
+    assert len(counted_decode) == 1
+
+    # Callers get their own copy of the claims
+    first["user_id"] = 8
+    assert jwt_utils.decode_access_token(token)["user_id"] == 7
+
+
+# Test Case 2: A cached token stops being accepted at its exp
+def test_cached_token_expires(counted_decode, monkeypatch):
+    token = jwt_utils.create_access_token({"user_id": 7}, expires_delta=timedelta(seconds=60))
+    assert jwt_utils.decode_access_token(token) is not None
+
+    real_time = jwt_utils.time.time
+    monkeypatch.setattr(jwt_utils.time, "time", lambda: real_time() + 120)
+    assert jwt_utils.decode_access_token(token) is None
+
+
+# Test Case 3: Tampered tokens are rejected and never cached; the cache is bounded
+def test_invalid_tokens_and_bound(counted_decode, monkeypatch):
+    monkeypatch.setattr(jwt_utils, "VERIFIED_TOKEN_CACHE_SIZE", 2)
+    token = jwt_utils.create_access_token({"user_id": 1})
+    header, payload, signature = token.split(".")
+    forged = ".".join([header, payload, signature[::-1]])
+    assert jwt_utils.decode_access_token(forged) is None
+    assert jwt_utils.decode_access_token(forged) is None
+    assert len(counted_decode) == 2
+
+    tokens = [jwt_utils.create_access_token({"user_id": i}) for i in range(3)]
+    for token in tokens:
+        jwt_utils.decode_access_token(token)
+    assert len(jwt_utils._verified) == 2
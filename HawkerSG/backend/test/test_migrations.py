@@ -0,0 +1,51 @@
+from sqlalchemy import inspect, select, text
+
+from app.migrations import run_migrations
+from app.models.consumer_model import Consumer
+from app.models.favourite_model import Favourite
+from app.models.review_aggregate_model import ReviewAggregate
+from app.models.review_model import Review
+
+
+def _index_names(engine, table_name):
+    return {ix["name"] for ix in inspect(engine).get_indexes(table_name)}
+
+
+# Test Case 1: Missing indexes on existing tables are created, after removing the duplicates
+# a unique index would reject; ratings are rebuilt without the removed reviews
+def test_adds_missing_indexes_to_existing_tables(database, db):
+    with database.engine.begin() as conn:
+        for name in ("uq_reviews_consumer_target", "ix_reviews_target_created", "uq_favourites_consumer_target"):
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    db.add(Consumer(id=1, email="c1@example.com", username="user1", user_type="consumer"))
+    db.add_all([
+        Review(id=1, consumer_id=1, target_type="business", target_id=7, star_rating=1),
+        Review(id=2, consumer_id=1, target_type="business", target_id=7, star_rating=5),
+        Review(id=3, consumer_id=1, target_type="hawker", target_id=7, star_rating=3),
+        Favourite(id=1, consumer_id=1, target_type="business", target_id=7),
+        Favourite(id=2, consumer_id=1, target_type="business", target_id=7),
+        ReviewAggregate(target_type="business", target_id=7, review_count=2, rating_sum=6),
+    ])
+    db.commit()
+
+    run_migrations(database.engine)
+
+    assert {"uq_reviews_consumer_target", "ix_reviews_target_created"} <= _index_names(database.engine, "reviews")
+    assert "uq_favourites_consumer_target" in _index_names(database.engine, "favourites")
+    db.expire_all()
+    assert db.scalars(select(Review.id).order_by(Review.id)).all() == [2, 3]  # the latest review is kept
+    assert db.scalars(select(Favourite.id)).all() == [1]  # the first favourite is kept
+    aggregate = db.get(ReviewAggregate, ("business", 7))
+    assert (aggregate.review_count, aggregate.rating_sum) == (1, 5)
+
+
+# Test Case 2: On an up-to-date database it changes nothing
+def test_no_op_when_current(database, db, capsys):
+    db.add(ReviewAggregate(target_type="business", target_id=7, review_count=4, rating_sum=16))
+    db.commit()
+
+    run_migrations(database.engine)
+
+    assert capsys.readouterr().out == ""
+    assert db.get(ReviewAggregate, ("business", 7)).review_count == 4
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from app.utils import onemap_token_manager as tokens
+from app.utils.file_lock import exclusive_lock
+
+DAY = 86400
+
+
+@pytest.fixture
+def token_env(monkeypatch, tmp_path):
+    """Isolated cache file and a fake OneMap that counts token requests."""
+    cache_file = str(tmp_path / "token.json")
+    monkeypatch.setattr(tokens, "TOKEN_CACHE_FILE", cache_file)
+    monkeypatch.setattr(tokens, "_cached_token", None)
+    monkeypatch.setattr(tokens, "_token_expiry_timestamp", 0)
+    monkeypatch.setattr(tokens, "_refresh_task", None)
+
+    calls = []
+    release = asyncio.Event()
+    release.set()
+
+    async def fake_fetch():
+        calls.append(time.time())
+        await release.wait()
+        return {"access_token": f"token-{len(calls)}", "expiry_timestamp": str(int(time.time()) + 3 * DAY)}
+
+    monkeypatch.setattr(tokens, "_get_new_onemap_token", fake_fetch)
+    return cache_file, calls, release
+
+
+def write_cache(path, token, expiry):
+    with open(path, "w") as f:
+        json.dump({"access_token": token, "expiry_timestamp": expiry}, f)
+
+
+# Test Case 1: Concurrent callers without a token share a single refresh
+@pytest.mark.asyncio
+async def test_single_flight_refresh(token_env):
+    cache_file, calls, release = token_env
+
+    results = await asyncio.gather(*(tokens.get_onemap_token() for _ in range(20)))
+    assert results == ["token-1"] * 20
+    assert len(calls) == 1
+
+    # Written atomically: the cache holds the token and no temp files are left behind
+    with open(cache_file) as f:
+        assert json.load(f)["access_token"] == "token-1"
+    assert sorted(os.listdir(os.path.dirname(cache_file))) == ["token.json", "token.json.lock"]
+
+
+# Test Case 2: A token due for renewal is still served immediately while the refresh runs
+@pytest.mark.asyncio
+async def test_proactive_refresh_does_not_block(token_env):
+    cache_file, calls, release = token_env
+    due = int(time.time()) + tokens.SAFETY_BUFFER_SECONDS + tokens.REFRESH_AHEAD_SECONDS // 2
+    write_cache(cache_file, "old-token", due)
+    release.clear()
+
+    assert await tokens.get_onemap_token() == "old-token"
+    assert await tokens.get_onemap_token() == "old-token"
+    await asyncio.sleep(0.1)
+    assert len(calls) == 1  # one background refresh, still waiting on OneMap
+
+    release.set()
+    await tokens._refresh_task
+    assert await tokens.get_onemap_token() == "token-1"
+
+
+# Test Case 3: A refresh waits for another process's lock, then adopts the token it wrote
+@pytest.mark.asyncio
+async def test_adopts_token_refreshed_by_other_worker(token_env):
+    cache_file, calls, release = token_env
+    write_cache(cache_file, "stale-token", int(time.time()) - 10)
+
+    locked, unlock = threading.Event(), threading.Event()
+
+    def other_worker():
+        with exclusive_lock(cache_file + ".lock"):
+            locked.set()
+            unlock.wait()
+            write_cache(cache_file, "worker-token", int(time.time()) + 3 * DAY)
+
+    worker = threading.Thread(target=other_worker)
+    worker.start()
+    locked.wait()
+
+    pending = asyncio.ensure_future(tokens.get_onemap_token())
+    await asyncio.sleep(0.1)
+    assert not pending.done()
+
+    unlock.set()
+    assert await pending == "worker-token"
+    assert calls == []
+    worker.join()
+
+
+# Test Case 4: With no token and OneMap stuck, callers give up after TOKEN_WAIT_SECONDS
+@pytest.mark.asyncio
+async def test_bounded_wait_without_token(token_env, monkeypatch):
+    cache_file, calls, release = token_env
+    monkeypatch.setattr(tokens, "TOKEN_WAIT_SECONDS", 0.05)
+    release.clear()
+
+    assert await tokens.get_onemap_token() is None
+    release.set()
+    assert await tokens._refresh_task == "token-1"
@@ -0,0 +1,64 @@
+import functools
+from datetime import datetime, timedelta
+
+import anyio
+import pytest
+from fastapi import HTTPException
+
+from app.controllers import consumer_controller
+from app.models.consumer_model import Consumer
+from app.routes.consumer_route import reset_user_password
+from app.schemas.user_schema import PasswordResetData
+
+
+@pytest.fixture
+def hashed(db, monkeypatch):
+    """A consumer with reset token "valid-token"; records the passwords hashed."""
+    db.add(Consumer(id=1, email="c1@example.com", username="user1", user_type="consumer",
+                    hashed_password="old-hash", reset_token="valid-token",
+                    token_expires=datetime.now() + timedelta(hours=1)))
+    db.add(Consumer(id=2, email="c2@example.com", username="user2", user_type="consumer",
+                    hashed_password="old-hash", reset_token="expired-token",
+                    token_expires=datetime.now() - timedelta(minutes=1)))
+    db.commit()
+
+    passwords = []
+
+    async def get_password_hash(password):
+        passwords.append(password)
+        return f"hash-of-{password}"
+
+    monkeypatch.setattr(consumer_controller, "get_password_hash", get_password_hash)
+    yield passwords
+
+
+async def _reset(db, token):
+    """Runs the sync route in a worker thread, as FastAPI does, so it can reach the hashing pool."""
+    data = PasswordResetData(token=token, new_password="new-password")
+    return await anyio.to_thread.run_sync(functools.partial(reset_user_password, data=data, db=db))
+
+
+# Test Case 1: A valid token sets the new password and is used up
+@pytest.mark.asyncio
+async def test_reset_with_valid_token(db, hashed):
+    assert await _reset(db, "valid-token") == {"message": "Password successfully reset."}
+
+    consumer = db.get(Consumer, 1)
+    assert (consumer.hashed_password, consumer.reset_token, consumer.token_expires) == ("hash-of-new-password", None, None)
+    assert hashed == ["new-password"]
+    with pytest.raises(HTTPException):
+        await _reset(db, "valid-token")
+
+
+# Test Case 2: Unknown and expired tokens are rejected with 400 before any password is hashed
+@pytest.mark.asyncio
+@pytest.mark.parametrize("token", ["no-such-token", "expired-token"])
+async def test_bad_token_is_not_hashed(db, hashed, token):
+    with pytest.raises(HTTPException) as exc:
+        await _reset(db, token)
+
+    assert exc.value.status_code == 400
+    assert hashed == []
+    assert db.get(Consumer, 2).hashed_password == "old-hash"
+    if token == "expired-token":
+        assert db.get(Consumer, 2).reset_token is None  # cleared, so it can't be retried
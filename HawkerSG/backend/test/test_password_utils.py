@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.utils import password_utils
+
+# Cheap Argon2 parameters so the tests stay fast
+FAST = dict(argon2__rounds=1, argon2__memory_cost=1024, argon2__parallelism=1)
+
+
+# Test Case 1: Hashes made with other Argon2 parameters verify and come back rehashed
+@pytest.mark.asyncio
+async def test_verify_and_rehash(monkeypatch):
+    old_context = CryptContext(schemes=["argon2"], **FAST)
+    new_context = CryptContext(schemes=["argon2"], deprecated="auto", **dict(FAST, argon2__rounds=2))
+    monkeypatch.setattr(password_utils, "pwd_context", new_context)
+
+    current = await password_utils.hash_password("hunter22")
+    assert await password_utils.verify_password("hunter22", current) == (True, None)
+    assert (await password_utils.verify_password("wrong", current))[0] is False
+
+    valid, new_hash = await password_utils.verify_password("hunter22", old_context.hash("hunter22"))
+    assert valid and new_hash
+    assert "t=2" in new_hash and new_context.verify("hunter22", new_hash)
+
+
+# Test Case 2: Requests beyond workers + queue depth are shed with 429 instead of queueing
+@pytest.mark.asyncio
+async def test_sheds_load_when_full(monkeypatch):
+    release = threading.Event()
+
+    class BlockingContext:
+        def hash(self, password):
+            release.wait(5)
+            return "hashed:" + password
+
+    monkeypatch.setattr(password_utils, "pwd_context", BlockingContext())
+    monkeypatch.setattr(password_utils, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(password_utils, "PASSWORD_HASH_QUEUE_DEPTH", 1)
+
+    running = [asyncio.ensure_future(password_utils.hash_password(f"pw{i}")) for i in range(2)]
+    await asyncio.sleep(0.05)
+    with pytest.raises(HTTPException) as excinfo:
+        await password_utils.hash_password("pw2")
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers["Retry-After"] == "1"
+
+    release.set()
+    assert await asyncio.gather(*running) == ["hashed:pw0", "hashed:pw1"]
+    assert password_utils.stats()["in_flight"] == 0
@@ -0,0 +1,102 @@
+import hashlib
+import io
+import os
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.stored_photo_model import StoredPhoto
+from app.services import image_variants, photo_store
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+JPEG = b"\xff\xd8\xff\xe0" + b"\x01" * 100
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path, database):
+    """An empty menu photo folder, with references kept in the test database."""
+    photo_dir = tmp_path / "menuPhotos"
+    monkeypatch.setitem(image_variants.PHOTO_DIRS, "menu", (str(photo_dir), "/static/menu"))
+    # Variant generation is covered by test_image_variants
+    monkeypatch.setattr(image_variants, "schedule", lambda kind, filename: None)
+
+    monkeypatch.setattr(photo_store, "_session_factory", database.session)
+    yield photo_dir, database.session
+
+
+def _ref_count(session_factory, filename):
+    with session_factory() as db:
+        return db.scalar(select(StoredPhoto.ref_count).where(StoredPhoto.filename == filename))
+
+
+def _photos(photo_dir):
+    return sorted(f for f in os.listdir(photo_dir) if not f.startswith("."))
+
+
+# Test Case 1: Photos are named by content hash and identical uploads share one file
+def test_store_deduplicates(store):
+    photo_dir, session_factory = store
+
+    first = photo_store.store(io.BytesIO(PNG), "menu", max_bytes=1024)
+    second = photo_store.store(io.BytesIO(PNG), "menu", max_bytes=1024)
+
+    assert first == second == f"{hashlib.sha256(PNG).hexdigest()}.png"
+    assert _photos(photo_dir) == [first]
+    assert _ref_count(session_factory, first) == 2
+
+
+# Test Case 2: The file is deleted only when its last reference is released
+def test_release_deletes_at_zero(store):
+    photo_dir, session_factory = store
+    filename = photo_store.store(io.BytesIO(JPEG), "menu", max_bytes=1024)
+    photo_store.store(io.BytesIO(JPEG), "menu", max_bytes=1024)
+
+    assert photo_store.release("menu", filename) is False
+    assert _photos(photo_dir) == [filename]
+
+    assert photo_store.release("menu", f"/static/menu/{filename}") is True
+    assert _photos(photo_dir) == []
+    assert _ref_count(session_factory, filename) is None
+
+
+# Test Case 3: Photos saved before the store (shared seed images) are never deleted
+def test_release_ignores_legacy_photos(store):
+    photo_dir, _ = store
+    os.makedirs(photo_dir)
+    (photo_dir / "default-placeholder.jpg").write_bytes(JPEG)
+
+    assert photo_store.release("menu", "default-placeholder.jpg") is False
+    assert _photos(photo_dir) == ["default-placeholder.jpg"]
+
+
+# Test Case 4: An owned upload can only be claimed once, by its uploader; the claim keeps its reference
+@pytest.mark.asyncio
+async def test_claim_pending_checks_owner(store, async_db):
+    photo_dir, session_factory = store
+    filename = photo_store.store(io.BytesIO(PNG), "menu", max_bytes=1024, owner_id=1)
+
+    with pytest.raises(HTTPException) as exc:
+        await photo_store.claim_pending(async_db, "menu", 2, [f"/static/menu/{filename}"])
+    assert exc.value.status_code == 400
+
+    await photo_store.claim_pending(async_db, "menu", 1, [f"/static/menu/{filename}"])
+    await async_db.commit()
+    with pytest.raises(HTTPException):
+        await photo_store.claim_pending(async_db, "menu", 1, [filename])
+
+    assert _ref_count(session_factory, filename) == 1
+    assert photo_store.expire_pending(datetime(9999, 1, 1)) == 0
+    assert _photos(photo_dir) == [filename]
+
+
+# Test Case 5: Uploads never claimed release their reference once they expire
+def test_expire_pending(store):
+    photo_dir, session_factory = store
+    filename = photo_store.store(io.BytesIO(JPEG), "menu", max_bytes=1024, owner_id=1)
+
+    assert photo_store.expire_pending() == 0
+    assert photo_store.expire_pending(datetime.utcnow() + photo_store.PENDING_UPLOAD_TTL) == 1
+    assert _photos(photo_dir) == []
+    assert _ref_count(session_factory, filename) is None
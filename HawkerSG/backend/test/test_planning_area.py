@@ -0,0 +1,45 @@
+import os
+import pytest
+
+from app.services import planning_area
+from app.services.planning_area import PlanningAreaIndex
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "planning_areas.geojson")
+
+
+@pytest.fixture
+def index():
+    index = PlanningAreaIndex.from_file(FIXTURE)
+    planning_area.use_index(index)
+    yield index
+    planning_area.use_index(None)
+
+
+# Test Case 1: Points resolve to the polygon containing them, holes excluded
+@pytest.mark.parametrize("lat, lng, expected", [
+    (1.285, 103.855, "Downtown Core"),
+    (1.2775, 103.8475, "Outram"),        # inside Downtown Core's hole, covered by an Outram part
+    (1.28, 103.83, "Outram"),            # name read from the HTML Description attribute
+    (1.42, 103.835, "Yishun"),           # triangle
+    (1.44, 103.822, None),               # inside Yishun's bounding box but outside the triangle
+    (1.35, 103.95, None),                # outside every area
+])
+def test_lookup(index, lat, lng, expected):
+    assert index.lookup(lat, lng) == expected
+    assert planning_area.resolve(lat, lng) == expected
+
+
+# Test Case 2: Repeated lookups for nearby points are served from the LRU cache
+def test_resolve_cached_by_rounded_point(index):
+    planning_area._cached_lookup.cache_clear()
+    planning_area.resolve(1.28501, 103.85501)
+    planning_area.resolve(1.285012, 103.855008)
+    info = planning_area._cached_lookup.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+# Test Case 3: Without a polygon file the resolver reports itself unavailable
+def test_unavailable_without_data():
+    planning_area.use_index(None)
+    assert not planning_area.is_available()
+    assert planning_area.resolve(1.285, 103.855) is None
@@ -0,0 +1,102 @@
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import dependencies
+from app.routes.admin_route import router as admin_router
+from app.utils import profiler_middleware
+from app.utils.profiler_middleware import PyInstrumentProfilerMiddleware
+
+
+@pytest.fixture
+def profile_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler_middleware, "PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _client(**options):
+    app = FastAPI()
+
+    @app.get("/fast")
+    def fast():
+        return {"ok": True}
+
+    @app.get("/slow")
+    def slow():
+        time.sleep(0.05)
+        return {"ok": True}
+
+    app.include_router(admin_router)
+    app.add_middleware(PyInstrumentProfilerMiddleware, **options)
+    return TestClient(app)
+
+
+# Test Case 1: Unprofiled requests write nothing; ?profile=true writes timestamped HTML and speedscope files
+def test_on_demand_profile(profile_dir):
+    client = _client(on_demand=True, sample_every=0, slow_ms=0)
+
+    response = client.get("/fast")
+    assert "x-profile-id" not in response.headers
+    assert list(profile_dir.iterdir()) == []
+
+    response = client.get("/fast?profile=true")
+    profile_id = response.headers["x-profile-id"]
+    assert profile_id.endswith("_GET_fast")
+    files = sorted(p.name for p in profile_dir.iterdir())
+    assert len(files) == 2 and all(f.startswith(profile_id) for f in files)
+    speedscope = next(p for p in profile_dir.iterdir() if p.name.endswith(".speedscope.json"))
+    assert "shared" in json.loads(speedscope.read_text())
+
+
+# Test Case 2: Sampling profiles 1 in N requests
+def test_sampling(profile_dir):
+    client = _client(on_demand=False, sample_every=3, slow_ms=0)
+
+    headers = [client.get("/fast").headers.get("x-profile-id") for _ in range(6)]
+
+    assert [h is not None for h in headers] == [True, False, False, True, False, False]
+    assert len(profiler_middleware.list_profiles()) == 2
+
+
+# Test Case 3: With a latency threshold only slow requests are kept
+def test_slow_requests_kept(profile_dir):
+    client = _client(on_demand=False, sample_every=0, slow_ms=30)
+
+    client.get("/fast")
+    client.get("/slow")
+
+    profiles = profiler_middleware.list_profiles()
+    assert [p["path"] for p in profiles] == ["slow"]
+    assert profiles[0]["duration_ms"] >= 30
+
+
+# Test Case 4: Only the newest PROFILE_KEEP profiles are retained
+def test_retention(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiler_middleware, "PROFILE_KEEP", 2)
+    client = _client(on_demand=True, sample_every=0, slow_ms=0)
+
+    ids = [client.get("/fast?profile=true").headers["x-profile-id"] for _ in range(3)]
+
+    assert [p["id"] for p in profiler_middleware.list_profiles()] == ids[:0:-1]
+
+
+# Test Case 5: The admin endpoint lists and downloads profiles and requires the admin token
+def test_admin_endpoints(profile_dir, monkeypatch):
+    client = _client(on_demand=True, sample_every=0, slow_ms=0)
+    client.get("/fast?profile=true")
+
+    monkeypatch.setattr(dependencies, "ADMIN_TOKEN", None)
+    assert client.get("/admin/profiles").status_code == 404
+
+    monkeypatch.setattr(dependencies, "ADMIN_TOKEN", "s3cret")
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    listing = client.get("/admin/profiles", headers={"X-Admin-Token": "s3cret"}).json()["profiles"]
+    html = listing[0]["files"]["html"]
+    download = client.get(f"/admin/profiles/{html}", headers={"X-Admin-Token": "s3cret"})
+    assert download.status_code == 200
+    assert download.headers["content-type"].startswith("text/html")
+    assert client.get("/admin/profiles/..%2Fsecret.html", headers={"X-Admin-Token": "s3cret"}).status_code == 404
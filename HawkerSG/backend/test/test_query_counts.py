@@ -0,0 +1,134 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.exc import InvalidRequestError
+
+from app.controllers import consumer_controller
+from app.database import get_async_db, get_db, make_async_engine
+from app.dependencies import get_current_user_id
+from app.models.consumer_model import Consumer
+from app.models.favourite_model import Favourite
+from app.models.review_model import Review
+from app.routes.consumer_route import router as consumer_router
+from app.routes.favourite_route import router as favourite_router
+from app.routes.review_route import router as review_router
+from app.schemas.favourite_schema import MAX_BATCH_SIZE
+from app.services.consumer_lookup import consumer_by_id, consumer_exists
+
+CONSUMER_ID = 1
+HISTORY = 200  # favourites and reviews of the signed-in consumer
+BATCH = [{"target_type": t, "target_id": i} for t in ("business", "stall") for i in range(150, 350)]
+
+# (method, path, request options, statements issued). The counts must not grow with
+# the consumer's history: favourites and reviews are only loaded when asked for.
+ENDPOINTS = [
+    ("POST", "/consumer/login", {"data": {"username": "c1@example.com", "password": "secret123"}}, 2),
+    ("GET", f"/consumer/{CONSUMER_ID}", {}, 1),
+    ("POST", "/consumer/add-search-history", {"json": {"search_term": "laksa"}}, 3),
+    ("GET", f"/consumers/{CONSUMER_ID}/favourites", {}, 2),
+    ("POST", f"/consumers/{CONSUMER_ID}/favourites/check", {"json": {"target_type": "business", "target_id": 5}}, 2),
+    ("POST", f"/consumers/{CONSUMER_ID}/favourites/toggle", {"json": {"target_type": "business", "target_id": 9999}}, 3),
+    ("POST", f"/consumers/{CONSUMER_ID}/favourites/check/batch", {"json": {"targets": BATCH}}, 1),
+    ("POST", f"/consumers/{CONSUMER_ID}/favourites/batch", {"json": {"add": BATCH, "remove": [{"target_type": "business", "target_id": 1}]}}, 4),
+    ("GET", f"/consumers/{CONSUMER_ID}/reviews?limit=20", {}, 2),
+    ("GET", "/targets/business/5/reviews", {}, 1),
+]
+
+
+@pytest.fixture
+def client(database, monkeypatch):
+    with database.session() as db:
+        db.add(Consumer(id=CONSUMER_ID, email="c1@example.com", username="user1", user_type="consumer",
+                        hashed_password="unused", recentlySearch=""))
+        for target_id in range(1, HISTORY + 1):
+            db.add(Favourite(consumer_id=CONSUMER_ID, target_type="business", target_id=target_id))
+            db.add(Review(consumer_id=CONSUMER_ID, target_type="business", target_id=target_id,
+                          star_rating=4, created_at=datetime(2025, 1, 1)))
+        db.commit()
+    # TestClient runs the app on its own event loop, so it gets its own async engine
+    async_engine = make_async_engine(database.url)
+
+    statements = []
+    for sync_engine in (database.engine, async_engine.sync_engine):
+        event.listen(sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def override_db():
+        with database.session(autoflush=False) as db:
+            yield db
+
+    async def override_async_db():
+        async with async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)() as db:
+            yield db
+
+    async def verify_password(plain_password, hashed_password):
+        return True, None
+
+    monkeypatch.setattr(consumer_controller, "verify_password", verify_password)
+    app = FastAPI()
+    for router in (consumer_router, favourite_router, review_router):
+        app.include_router(router)
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_async_db] = override_async_db
+    app.dependency_overrides[get_current_user_id] = lambda: CONSUMER_ID
+
+    yield TestClient(app), statements
+
+
+# Test Case 1: Each endpoint issues a fixed number of statements, whatever the consumer's history
+@pytest.mark.parametrize("method, path, options, expected", ENDPOINTS, ids=[f"{m} {p}" for m, p, _, _ in ENDPOINTS])
+def test_statements_per_endpoint(client, method, path, options, expected):
+    test_client, statements = client
+
+    response = test_client.request(method, path, **options)
+
+    assert response.status_code < 300, response.text
+    assert len(statements) == expected, "\n".join(statements)
+    # Collections are only loaded when a caller asks for them (consumer_lookup.consumer_by_id)
+    assert not any("favourites.consumer_id IN (" in sql for sql in statements)
+
+
+# Test Case 2: The collections are loaded only when requested, and touching them otherwise raises
+def test_opt_in_relationship_loading(client, database):
+    _, statements = client
+
+    with database.session() as db:
+        assert db.scalar(consumer_exists(CONSUMER_ID)) is True
+        assert db.scalar(consumer_exists(999)) is False
+
+        consumer = db.scalar(consumer_by_id(CONSUMER_ID))
+        with pytest.raises(InvalidRequestError):
+            consumer.favourites
+
+    with database.session() as db:
+        statements.clear()
+        consumer = db.scalar(consumer_by_id(CONSUMER_ID, favourites=True))
+        assert len(consumer.favourites) == HISTORY
+        assert len(statements) == 2
+
+
+# Test Case 3: Batch check answers in request order; batch add/remove is idempotent and all-or-nothing
+def test_favourites_batch(client):
+    test_client, _ = client
+    base = f"/consumers/{CONSUMER_ID}/favourites"
+    targets = [{"target_type": "stall", "target_id": 7}, {"target_type": "business", "target_id": 7},
+               {"target_type": "business", "target_id": 9999}, {"target_type": "business", "target_id": 7}]
+
+    response = test_client.post(f"{base}/check/batch", json={"targets": targets})
+    assert response.json() == {"is_favourite": [False, True, False, True]}
+
+    payload = {"add": targets, "remove": [{"target_type": "business", "target_id": 8}]}
+    assert test_client.post(f"{base}/batch", json=payload).json() == {"status": "ok", "added": 2, "removed": 1}
+    assert test_client.post(f"{base}/batch", json=payload).json() == {"status": "ok", "added": 0, "removed": 0}
+
+    response = test_client.post(f"{base}/check/batch", json={"targets": targets + [payload["remove"][0]]})
+    assert response.json() == {"is_favourite": [True, True, True, True, False]}
+
+    # The same target in both lists is rejected before anything is written
+    clash = {"add": [{"target_type": "stall", "target_id": 1}], "remove": [{"target_type": "stall", "target_id": 1}]}
+    assert test_client.post(f"{base}/batch", json=clash).status_code == 422
+    too_many = [{"target_type": "stall", "target_id": i} for i in range(MAX_BATCH_SIZE + 1)]
+    assert test_client.post(f"{base}/check/batch", json={"targets": too_many}).status_code == 422
@@ -0,0 +1,72 @@
+from sqlalchemy import select
+
+from app.models.consumer_model import Consumer
+from app.models.review_aggregate_model import ReviewAggregate
+from app.models.review_model import Review
+from app.services import review_aggregates
+
+
+def _totals(db):
+    rows = db.execute(select(
+        ReviewAggregate.target_type, ReviewAggregate.target_id,
+        ReviewAggregate.review_count, ReviewAggregate.rating_sum,
+    ).order_by(ReviewAggregate.target_type, ReviewAggregate.target_id))
+    return [tuple(row) for row in rows]
+
+
+def _add_reviews(db, *reviews):
+    for consumer_id in {consumer_id for consumer_id, *_ in reviews}:
+        db.add(Consumer(id=consumer_id, email=f"c{consumer_id}@example.com", username=f"user{consumer_id}",
+                        user_type="consumer"))
+    for consumer_id, target_type, target_id, star_rating in reviews:
+        db.add(Review(consumer_id=consumer_id, target_type=target_type, target_id=target_id, star_rating=star_rating))
+    db.commit()
+
+
+# Test Case 1: The average is rounded to 2 dp, and 0.0 without reviews
+def test_average_rating():
+    assert review_aggregates.average_rating(14, 3) == 4.67
+    assert review_aggregates.average_rating(0, 0) == 0.0
+    assert review_aggregates.average_rating(None, None) == 0.0
+
+
+# Test Case 2: The first delta creates the row, later ones adjust it in place
+def test_apply_delta(db):
+    review_aggregates.apply_delta(db, "business", 1, 1, 4)
+    review_aggregates.apply_delta(db, "business", 1, 1, 5)
+    review_aggregates.apply_delta(db, "business", 1, 0, -2)  # a rating edited from 5 to 3
+    review_aggregates.apply_delta(db, "hawker", 1, 1, 3)
+    review_aggregates.apply_delta(db, "hawker", 2, 0, 0)  # no-op: no row is created
+    db.commit()
+
+    assert _totals(db) == [("business", 1, 2, 7), ("hawker", 1, 1, 3)]
+
+    review_aggregates.apply_delta(db, "business", 1, -1, -3)
+    db.commit()
+    assert _totals(db)[0] == ("business", 1, 1, 4)
+
+
+# Test Case 3: rebuild replaces every row with totals computed from the reviews table
+def test_rebuild(db):
+    _add_reviews(db, (1, "business", 1, 4), (2, "business", 1, 5), (1, "hawker", 3, 2))
+    review_aggregates.apply_delta(db, "business", 9, 5, 20)  # stale row with no reviews behind it
+    db.commit()
+
+    assert review_aggregates.rebuild(db) == 2
+    assert _totals(db) == [("business", 1, 2, 9), ("hawker", 3, 1, 2)]
+
+
+# Test Case 4: rebuild_if_empty only backfills when there are reviews but no aggregates yet
+def test_rebuild_if_empty(db):
+    review_aggregates.rebuild_if_empty(db)
+    assert _totals(db) == []
+
+    _add_reviews(db, (1, "business", 1, 4))
+    review_aggregates.rebuild_if_empty(db)
+    assert _totals(db) == [("business", 1, 1, 4)]
+
+    # Already populated: left alone even if it has drifted
+    review_aggregates.apply_delta(db, "business", 1, 0, 1)
+    db.commit()
+    review_aggregates.rebuild_if_empty(db)
+    assert _totals(db) == [("business", 1, 1, 5)]
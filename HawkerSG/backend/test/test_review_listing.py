@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.controllers import review_controller
+from app.models.consumer_model import Consumer
+from app.models.review_model import Review
+
+START = datetime(2025, 1, 1, 12, 0, 0)
+# (consumer_id, star_rating, minutes after START); reviews 3 and 4 share a timestamp
+REVIEWS = [(1, 3, 0), (2, 5, 10), (3, 1, 20), (4, 5, 20), (5, 4, 30)]
+
+
+@pytest_asyncio.fixture
+async def session(database, async_db):
+    with database.session() as db:
+        for consumer_id in range(1, 6):
+            db.add(Consumer(id=consumer_id, email=f"c{consumer_id}@example.com", username=f"user{consumer_id}",
+                            user_type="consumer", profile_pic=f"p{consumer_id}.jpg"))
+        for review_id, (consumer_id, rating, minutes) in enumerate(REVIEWS, start=1):
+            db.add(Review(id=review_id, consumer_id=consumer_id, target_type="business", target_id=7,
+                          star_rating=rating, created_at=START + timedelta(minutes=minutes)))
+        db.add(Review(id=6, consumer_id=1, target_type="business", target_id=8, star_rating=2, created_at=START))
+        db.commit()
+
+    statements = []
+    event.listen(async_db.bind.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    yield async_db, statements
+
+
+async def _all_pages(db, sort, limit):
+    ids, cursor = [], None
+    while True:
+        page = await review_controller.list_reviews_for_target(db, "business", 7, sort, cursor, limit)
+        ids += [item.id for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+# Test Case 1: Pages follow each sort order without gaps or repeats, ties broken by id
+@pytest.mark.asyncio
+async def test_keyset_pages_for_each_sort(session):
+    db, _ = session
+
+    assert await _all_pages(db, "newest", 2) == [5, 4, 3, 2, 1]
+    assert await _all_pages(db, "highest", 2) == [4, 2, 5, 1, 3]
+    assert await _all_pages(db, "lowest", 3) == [3, 1, 5, 2, 4]
+
+    every = await review_controller.list_reviews_for_target(db, "business", 7, "newest", None, None)
+    assert [item.id for item in every] == [5, 4, 3, 2, 1]
+
+
+# Test Case 2: Reviewer names and avatars come from the listing query itself
+@pytest.mark.asyncio
+async def test_reviewer_joined_in_one_query(session):
+    db, statements = session
+
+    page = await review_controller.list_reviews_for_target(db, "business", 7, "newest", None, 10)
+
+    assert len(statements) == 1
+    assert page["next_cursor"] is None
+    reviewer = page["items"][0].reviewer
+    assert (reviewer.id, reviewer.username, reviewer.profile_pic) == (5, "user5", "p5.jpg")
+
+
+# Test Case 3: A consumer's listing checks the consumer exists without loading their reviews or favourites
+@pytest.mark.asyncio
+async def test_consumer_listing(session):
+    db, statements = session
+
+    page = await review_controller.list_reviews_for_consumer(db, 1, "newest", None, 1)
+    assert [item.id for item in page["items"]] == [6]
+    assert page["items"][0].reviewer.username == "user1"
+    page = await review_controller.list_reviews_for_consumer(db, 1, "newest", page["next_cursor"], 1)
+    assert [item.id for item in page["items"]] == [1] and page["next_cursor"] is None
+
+    assert len(statements) == 4
+    assert not any("favourites" in sql for sql in statements)
+
+    with pytest.raises(HTTPException) as missing:
+        await review_controller.list_reviews_for_consumer(db, 99)
+    assert missing.value.status_code == 404
+    with pytest.raises(HTTPException) as invalid:
+        await review_controller.list_reviews_for_target(db, "business", 7, "newest", "not-a-cursor")
+    assert invalid.value.status_code == 400
@@ -0,0 +1,137 @@
+import io
+import os
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from app.controllers import review_controller
+from app.models.consumer_model import Consumer
+from app.models.review_aggregate_model import ReviewAggregate
+from app.models.review_model import Review
+from app.models.stored_photo_model import PendingUpload, StoredPhoto
+from app.schemas.review_schema import ReviewIn
+from app.services import image_variants, photo_store
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x02" * 100
+
+
+@pytest_asyncio.fixture
+async def session(tmp_path, monkeypatch, database, async_sessions):
+    photo_dir = tmp_path / "reviewPhotos"
+    monkeypatch.setitem(image_variants.PHOTO_DIRS, "review", (str(photo_dir), "/static/review"))
+    monkeypatch.setattr(image_variants, "schedule", lambda kind, filename: None)
+    monkeypatch.setattr(photo_store, "_session_factory", database.session)
+    with database.session() as db:
+        for consumer_id in (1, 2):
+            db.add(Consumer(id=consumer_id, email=f"c{consumer_id}@example.com", username=f"user{consumer_id}",
+                            user_type="consumer"))
+        db.commit()
+
+    async def call(controller, *args):
+        # One session per call, as each request gets its own
+        async with async_sessions() as db:
+            return await controller(db, *args)
+
+    yield call, photo_dir
+
+
+def _upload(owner_id):
+    return f"/static/review/{photo_store.store(io.BytesIO(JPEG), 'review', 1024, owner_id=owner_id)}"
+
+
+def _review(target_id, images):
+    return ReviewIn(target_type="business", target_id=target_id, star_rating=4, images=images)
+
+
+# Test Case 1: A review can only attach its author's own, unattached uploads
+@pytest.mark.asyncio
+async def test_only_own_uploads_attach(session):
+    call, _ = session
+    path = _upload(owner_id=1)
+
+    with pytest.raises(HTTPException) as exc:
+        await call(review_controller.upsert_review, 2, _review(7, [path]))
+    assert exc.value.status_code == 400
+
+    created = await call(review_controller.upsert_review, 1, _review(7, [path, path]))
+    assert created["review"].images == [path]
+    # Already attached: reusing it in a second review needs a new upload
+    with pytest.raises(HTTPException):
+        await call(review_controller.upsert_review, 1, _review(8, [path]))
+    # Editing the review keeps the photo it already has
+    updated = await call(review_controller.upsert_review, 1, _review(7, [path]))
+    assert updated["status"] == "updated" and updated["review"].images == [path]
+
+
+# Test Case 2: Deleting a review frees its photos, but not a photo another review still uses
+@pytest.mark.asyncio
+async def test_delete_releases_only_own_references(session):
+    call, photo_dir = session
+    first = (await call(review_controller.upsert_review, 1, _review(7, [_upload(owner_id=1)])))["review"]
+    second = (await call(review_controller.upsert_review, 2, _review(7, [_upload(owner_id=2)])))["review"]
+    assert first.images == second.images  # same bytes, one stored file
+
+    await call(review_controller.delete_review, 2, second.id)
+    assert len(os.listdir(photo_dir)) == 2  # the photo and the lock file
+
+    await call(review_controller.delete_review, 1, first.id)
+    assert [f for f in os.listdir(photo_dir) if not f.startswith(".")] == []
+
+
+# Test Case 3: A review created concurrently since the lookup is updated instead; the photo
+# claim and the rating total are applied once
+@pytest.mark.asyncio
+async def test_concurrent_create_becomes_update(session, async_sessions):
+    call, _ = session
+    await call(review_controller.upsert_review, 1, _review(7, []))
+    path = _upload(owner_id=1)
+
+    async with async_sessions() as db:
+        lookups = []
+        scalar = db.scalar
+
+        async def lookup_before_other_commit(statement, *args, **kwargs):
+            # The first lookup runs as if the other request had not committed yet
+            result = await scalar(statement, *args, **kwargs)
+            if isinstance(result, Review) and not lookups:
+                lookups.append(result.id)
+                return None
+            return result
+
+        db.scalar = lookup_before_other_commit
+        result = await review_controller.upsert_review(db, 1, ReviewIn(
+            target_type="business", target_id=7, star_rating=2, images=[path],
+        ))
+
+    assert lookups and result["status"] == "updated" and result["review"].images == [path]
+    async with async_sessions() as db:
+        aggregate = await db.get(ReviewAggregate, ("business", 7))
+        assert (aggregate.review_count, aggregate.rating_sum) == (1, 2)
+        assert await db.scalar(select(func.count()).select_from(PendingUpload)) == 0
+        assert await db.scalar(select(StoredPhoto.ref_count)) == 1
+
+
+# Test Case 4: If the review's commit fails, its photo claims roll back with it and the
+# upload can still be attached by a retry
+@pytest.mark.asyncio
+async def test_failed_commit_keeps_upload_pending(session, async_sessions):
+    call, _ = session
+    path = _upload(owner_id=1)
+
+    async with async_sessions() as db:
+        async def commit():
+            raise OperationalError("COMMIT", None, Exception("disk I/O error"))
+
+        db.commit = commit
+        with pytest.raises(OperationalError):
+            await review_controller.upsert_review(db, 1, _review(7, [path]))
+        assert not db.in_transaction()
+
+    async with async_sessions() as db:
+        assert await db.scalar(select(func.count()).select_from(PendingUpload)) == 1
+        assert await db.scalar(select(func.count()).select_from(Review)) == 0
+    created = await call(review_controller.upsert_review, 1, _review(7, [path]))
+    assert created["status"] == "created" and created["review"].images == [path]
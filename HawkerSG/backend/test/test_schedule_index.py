@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from datetime import datetime, time
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import make_async_engine
+from app.models.operating_hour_model import OperatingHour
+from app.services import schedule_index
+
+MONDAY_NOON = datetime(2025, 1, 6, 12, 0)
+
+
+@pytest.fixture
+def db(db):
+    """The shared session with two stalls' hours, and an index that starts empty."""
+    schedule_index.invalidate()
+    db.add(OperatingHour(license_number="L1", day="Monday", start_time=time(10), end_time=time(14)))
+    db.add(OperatingHour(license_number="L2", day="Sunday", start_time=time(18), end_time=time(2)))
+    db.commit()
+    yield db
+    schedule_index.invalidate()
+
+
+# Test Case 1: Windows, overnight wrap past Sunday midnight, and the manual-status fallback
+def test_open_and_scheduled(db):
+    open_licences, scheduled = schedule_index.snapshot(db, MONDAY_NOON)
+    assert open_licences == {"L1"}
+    assert scheduled == {"L1"}
+    assert schedule_index.open_license_numbers(db, datetime(2025, 1, 6, 1, 30)) == {"L2"}
+    assert schedule_index.is_open_in("L3", True, open_licences, scheduled)
+    assert not schedule_index.is_open_in("L1", True, frozenset(), scheduled)
+
+
+# Test Case 2: invalidate() marks the index stale without pulling data from under a reader,
+# and an open-now result from the old snapshot is never served afterwards
+def test_invalidate_keeps_readers_consistent(db):
+    old = schedule_index._ensure_built(db)
+    assert schedule_index._open_in(old, schedule_index.minute_of_week(MONDAY_NOON)) == {"L1"}
+
+    db.add(OperatingHour(license_number="L3", day="Monday", start_time=time(11), end_time=time(13)))
+    db.commit()
+    schedule_index.invalidate()
+
+    # A reader still holding the old snapshot finishes normally, and may refill the cache
+    assert schedule_index._open_at_minute(old, schedule_index.minute_of_week(MONDAY_NOON)) == {"L1"}
+    schedule_index._open_in(old, schedule_index.minute_of_week(MONDAY_NOON))
+
+    assert schedule_index.open_license_numbers(db, MONDAY_NOON) == {"L1", "L3"}
+    assert schedule_index._ensure_built(db) is not old
+
+
+# Test Case 3: is_open (Business.is_currently_open) follows the day's hours, and the manual status on days without any
+def test_is_open_for_one_stall(db):
+    assert schedule_index.is_open(db, "L1", False, MONDAY_NOON)
+    assert not schedule_index.is_open(db, "L1", True, datetime(2025, 1, 6, 14, 1))
+    assert schedule_index.is_open(db, "L1", True, datetime(2025, 1, 7, 12, 0))  # L1 has no Tuesday hours
+    assert not schedule_index.is_open(db, "L1", False, datetime(2025, 1, 7, 12, 0))
+    assert schedule_index.is_open(db, "L9", True, MONDAY_NOON) and not schedule_index.is_open(db, "L9", False, MONDAY_NOON)
+
+
+# Test Case 4: Concurrent first lookups through AsyncSession.run_sync all complete. The
+# rebuild runs on the event loop there, so it must not hold a lock across database I/O.
+def test_concurrent_async_builds(database):
+    # The lookups run on a loop in another thread, which needs its own async engine
+    async_engine = make_async_engine(database.url)
+    schedule_index.invalidate()
+    results = []
+
+    async def lookup():
+        async with async_sessionmaker(async_engine)() as session:
+            return await session.run_sync(schedule_index.snapshot, MONDAY_NOON)
+
+    async def main():
+        results.extend(await asyncio.gather(*(lookup() for _ in range(5))))
+        await async_engine.dispose()
+
+    # On a deadlock the loop thread is stuck, so only a timeout outside it can notice
+    worker = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+    worker.start()
+    worker.join(10)
+    assert not worker.is_alive(), "concurrent schedule index builds deadlocked"
+    assert results == [(frozenset(), frozenset())] * 5
@@ -0,0 +1,151 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.hawker_centre_model import HawkerCentre
+from app.routes import search_route
+from app.services import search_index
+from app.services.search_index import SearchIndex, hawker_document, stall_document, tokenize
+
+
+def _stall(id, stall_name, cuisine="Chinese", centre="Maxwell Food Centre", licensee="Tan Ah Kow", menu=()):
+    row = SimpleNamespace(
+        id=id, license_number=f"L{id}", stall_name=stall_name, licensee_name=licensee,
+        hawker_centre=centre, cuisine_type=cuisine, photo="",
+    )
+    return stall_document(row, menu)
+
+
+def make_index():
+    index = SearchIndex()
+    index.upsert(*_stall(1, "Tian Tian Hainanese Chicken Rice", menu=[("Chicken Rice", "Steamed chicken")]))
+    index.upsert(*_stall(2, "Ah Tai Hainanese Chicken Rice", menu=[("Roasted Chicken Rice", None)]))
+    index.upsert(*_stall(3, "Zhen Zhen Porridge", menu=[("Fish Porridge", "With chicken stock")]))
+    index.upsert(*_stall(4, "Hup Kee Wanton Noodle", cuisine="Noodles", centre="Newton Food Centre"))
+    index.upsert(*hawker_document(SimpleNamespace(id=9, name="Maxwell Food Centre", image="")))
+    return index
+
+
+def _names(hits):
+    return [payload["name"] for _, payload in hits]
+
+
+# Test Case 1: Every word must match; matches in the stall name outrank incidental ones
+def test_ranking_and_all_words_required():
+    index = make_index()
+
+    total, hits = index.search("chicken")
+    assert total == 3
+    assert _names(hits)[-1] == "Zhen Zhen Porridge"  # only mentioned in a menu description
+
+    total, hits = index.search("hainanese chicken")
+    assert total == 2
+    assert _names(index.search("tian chicken")[1])[0] == "Tian Tian Hainanese Chicken Rice"
+    assert index.search("chicken noodle") == (0, [])
+
+
+# Test Case 2: Partial words match as prefixes, and kind filters stalls from hawker centres
+def test_prefix_and_kind():
+    index = make_index()
+
+    assert _names(index.search("wan")[1]) == ["Hup Kee Wanton Noodle"]
+    assert _names(index.search("maxw", kind="hawker")[1]) == ["Maxwell Food Centre"]
+    assert index.search("maxw", kind="stall")[0] == 3
+
+
+# Test Case 3: One typo is tolerated; accents and case are ignored
+def test_typo_tolerance():
+    index = make_index()
+
+    assert _names(index.search("porridgge")[1]) == ["Zhen Zhen Porridge"]   # extra letter
+    assert _names(index.search("wotnon")[1]) == []                          # two edits away
+    assert _names(index.search("wanotn")[1]) == ["Hup Kee Wanton Noodle"]   # swapped letters
+    assert tokenize("Café  Crème-Brûlée") == ["cafe", "creme", "brulee"]
+
+
+# Test Case 4: Re-indexing a stall replaces its old terms; removing it drops it from results
+def test_update_and_remove():
+    index = make_index()
+
+    index.upsert(*_stall(4, "Hup Kee Laksa", cuisine="Noodles"))
+    assert index.search("wanton") == (0, [])
+    assert _names(index.search("laksa")[1]) == ["Hup Kee Laksa"]
+
+    index.remove(("stall", 4))
+    assert index.search("laksa") == (0, [])
+    assert len(index) == 4
+
+
+@pytest.fixture
+def gated_build(database, monkeypatch):
+    """Background builds read the test database, then wait for `release` before publishing."""
+    monkeypatch.setattr(search_index, "_session_factory", database.session)
+    started, release = [], threading.Event()
+    build = search_index.build
+
+    def gated(db):
+        started.append(threading.current_thread().name)
+        index = build(db)
+        assert release.wait(10)
+        return index
+
+    monkeypatch.setattr(search_index, "build", gated)
+    search_index.invalidate()
+    yield started, release
+    release.set()
+    _wait_until(lambda: not search_index._rebuilding)
+    search_index.invalidate()
+
+
+def _wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _add_centre(database, id, name):
+    with database.session() as db:
+        db.add(HawkerCentre(id=id, name=name, address="", latitude=1.3, longitude=103.8))
+        db.commit()
+
+
+# Test Case 5: Searches before the first build get 503 and never build themselves; one
+# background build serves them all once it is published
+def test_first_searches_wait_for_one_background_build(database, gated_build):
+    started, release = gated_build
+    _add_centre(database, 9, "Maxwell Food Centre")
+    app = FastAPI()
+    app.include_router(search_route.router)
+    client = TestClient(app)
+
+    responses = [client.get("/search/", params={"q": "maxwell"}) for _ in range(5)]
+    assert [r.status_code for r in responses] == [503] * 5
+    assert responses[0].headers["Retry-After"] == str(search_route.SEARCH_RETRY_AFTER_SECONDS)
+    _wait_until(lambda: started)
+
+    release.set()
+    _wait_until(lambda: search_index._index is not None)
+    body = client.get("/search/", params={"q": "maxwell"}).json()
+    assert [item["name"] for item in body["items"]] == ["Maxwell Food Centre"]
+    assert started == ["search-index"]
+
+
+# Test Case 6: warm() during a build (e.g. seeding finished meanwhile) runs one more build
+def test_warm_during_build_rebuilds_again(database, gated_build):
+    started, release = gated_build
+    search_index.warm()
+    _wait_until(lambda: started)  # read the empty database
+
+    _add_centre(database, 9, "Maxwell Food Centre")
+    search_index.warm()
+    search_index.warm()
+    release.set()
+
+    _wait_until(lambda: not search_index._rebuilding)
+    assert len(started) == 2
+    assert search_index.search("maxwell")[0] == 1
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.assets.database_seed import seed_db
+from app.models.business_model import Business
+from app.models.hawker_centre_model import HawkerCentre
+
+HAWKER_CENTRES_CSV = """Name,Block,Street,Building,PostalCode,Description,PhotoURL,Latitude,Longitude
+Maxwell Food Centre,1,Kadayanallur St,,69184,Famous for chicken rice,,1.28,103.84
+Newton Food Centre,500,Clemenceau Ave North,,229495,,http://example.com/newton.jpg,1.31,103.83
+Maxwell Food Centre,1,Kadayanallur St,,69184,Duplicate row,,1.28,103.84
+"""
+
+MERGED_RESULTS_CSV = """Licence Number,Business Name,Licensee Name,Establishment Address,Postal Code
+ L1 ,Tuckshop,TAN AH KOW,1 Kadayanallur St #01-01,069184
+L2,Stall Two,LIM AH HUAT,1 Kadayanallur St #01-02,069184
+L3,Stall Three,NG AH BEE,500 Clemenceau Ave North #01-03,229495
+L2,Stall Two Again,LIM AH HUAT,1 Kadayanallur St #01-02,069184
+,No Licence,ANON,500 Clemenceau Ave North #01-04,229495
+L5,Elsewhere,ONG AH SENG,9 Nowhere Rd,999999
+"""
+
+INDEX_JSON = [
+    {"postal": "069184", "hawker_centre": "Maxwell Food Centre"},
+    {"postal": "229495", "hawker_centre": "Newton Food Centre"},
+]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    sfa_dir = tmp_path / "SFA-Scrape"
+    sfa_dir.mkdir()
+    (sfa_dir / "hawker_centres.csv").write_text(HAWKER_CENTRES_CSV)
+    (sfa_dir / "merged_results.csv").write_text(MERGED_RESULTS_CSV)
+    path = tmp_path / "index.json"
+    path.write_text(json.dumps(INDEX_JSON))
+    return str(path)
+
+
+# Test Case 1: Centres and stalls are bulk inserted in batches; stalls are attributed through
+# index.json, and rows without a licence, a known centre, or a unique licence are skipped
+def test_seeds_centres_and_stalls(db, index_path, monkeypatch):
+    monkeypatch.setattr(seed_db, "SEED_BATCH_SIZE", 2)
+    progress = []
+
+    seed_db.seed_sfa_data_if_empty(db, index_path, lambda phase, done, total: progress.append((phase, done, total)))
+
+    centres = db.scalars(select(HawkerCentre).order_by(HawkerCentre.name)).all()
+    assert [(c.name, c.address) for c in centres] == [
+        ("Maxwell Food Centre", "Blk 1, Kadayanallur St S(69184)"),
+        ("Newton Food Centre", "Blk 500, Clemenceau Ave North S(229495)"),
+    ]
+    stalls = db.scalars(select(Business).order_by(Business.license_number)).all()
+    assert [(s.license_number, s.stall_name, s.hawker_centre) for s in stalls] == [
+        ("L1", "Tuckshop", "Maxwell Food Centre"),
+        ("L2", "Stall Two", "Maxwell Food Centre"),
+        ("L3", "Stall Three", "Newton Food Centre"),
+    ]
+    assert stalls[0].email == "sfa_placeholder_L1@example.com" and stalls[0].user_type == "business"
+    assert stalls[0].photo == seed_db.BUSINESS_PHOTO_URL.format("tuckshop.webp")
+    assert stalls[1].photo == seed_db.BUSINESS_PHOTO_URL.format(seed_db.DEFAULT_BUSINESS_PHOTO)
+    assert progress == [("hawker_centres", 0, 0), ("stalls", 2, 3), ("stalls", 3, 3)]
+
+
+# Test Case 2: A database that already has hawker centres is left alone
+def test_skips_seeded_database(db, index_path):
+    db.add(HawkerCentre(name="Existing Centre", address="", description="", image="", rating=0.0,
+                        latitude=1.3, longitude=103.8))
+    db.commit()
+
+    seed_db.seed_sfa_data_if_empty(db, index_path)
+
+    assert db.scalars(select(HawkerCentre.name)).all() == ["Existing Centre"]
+    assert db.scalars(select(Business.id)).all() == []
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.main
+from app.assets.database_seed import seed_db
+from app.models.hawker_centre_model import HawkerCentre
+from app.routes import health_route
+from app.services import hawker_catalogue, search_index, seeding, suggest_index
+
+
+@pytest.fixture
+def seed(database, monkeypatch):
+    """run_seed against the test database, with a stub SFA seed that records its calls."""
+    monkeypatch.setattr(seeding, "engine", database.engine)
+    monkeypatch.setattr(seeding, "SessionLocal", database.session)
+    monkeypatch.setattr(seeding, "_state", {**seeding._state, "status": "pending"})
+    monkeypatch.setattr(app.main, "create_db_and_tables", lambda: None)
+    for module, name in ((hawker_catalogue, "invalidate"), (search_index, "warm"), (suggest_index, "warm")):
+        monkeypatch.setattr(module, name, lambda: None)
+
+    calls = []
+
+    def seed_sfa_data_if_empty(db, index_file_path, on_progress=None):
+        calls.append(seeding.status()["status"])
+        on_progress("stalls", 1, 2)
+        db.add(HawkerCentre(name="Maxwell Food Centre", address="", description="", image="", rating=0.0,
+                            latitude=1.28, longitude=103.84))
+        db.commit()
+
+    monkeypatch.setattr(seed_db, "seed_sfa_data_if_empty", seed_sfa_data_if_empty)
+    yield calls
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(health_route.router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+# Test Case 1: run_seed waits while another holder has the seed lock, then seeds and reports ready
+def test_run_seed_waits_for_lock(seed):
+    with seeding.seed_lock():
+        worker = threading.Thread(target=seeding.run_seed, daemon=True)
+        worker.start()
+        deadline = time.monotonic() + 5
+        while seeding.status()["status"] != "waiting_for_lock" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert seeding.status()["status"] == "waiting_for_lock" and seed == []
+
+    worker.join(10)
+    assert seed == ["running"]
+    state = seeding.status()
+    assert state["status"] == "ready" and state["finished_at"] is not None
+    assert (state["done"], state["total"]) == (1, 2)
+
+
+# Test Case 2: A failed seed is reported, and run_seed raises it to the caller
+def test_run_seed_failure(seed, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("merged_results.csv is corrupt")
+
+    monkeypatch.setattr(seed_db, "seed_sfa_data_if_empty", fail)
+    with pytest.raises(RuntimeError):
+        seeding.run_seed()
+    assert seeding.status()["status"] == "failed"
+    assert seeding.status()["error"] == "merged_results.csv is corrupt"
+
+
+# Test Case 3: /health/ready is 503 with progress until seeded, then 200
+def test_health_ready(seed, client, monkeypatch):
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False and response.json()["seeding"]["status"] == "pending"
+
+    seeding.run_seed()
+    response = client.get("/health/ready")
+    assert response.status_code == 200 and response.json()["ready"] is True
+
+
+# Test Case 4: With startup seeding disabled, a database seeded by another process counts as ready
+def test_health_ready_when_seeded_elsewhere(seed, client, database):
+    seeding.disable()
+    assert client.get("/health/ready").status_code == 503
+
+    with database.session() as db:
+        db.add(HawkerCentre(name="Maxwell Food Centre", address="", description="", image="", rating=0.0,
+                            latitude=1.28, longitude=103.84))
+        db.commit()
+    assert client.get("/health/ready").status_code == 200
+    assert seeding.is_ready()
@@ -0,0 +1,112 @@
+from datetime import datetime, time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import get_async_db, make_async_engine
+from app.models.business_model import Business, CuisineType, StallStatus
+from app.models.operating_hour_model import OperatingHour
+from app.models.review_aggregate_model import ReviewAggregate
+from app.routes import stall_route
+from app.services import schedule_index
+
+MONDAY_NOON = stall_route.SG_TZ.localize(datetime(2025, 1, 6, 12, 0))
+
+# (id, hawker centre, cuisine, postal code, manual status, operating hours)
+STALLS = [
+    (1, "Maxwell Food Centre", CuisineType.chinese, "069184", StallStatus.OPEN, []),
+    (2, "Maxwell Food Centre", CuisineType.malay, "069184", StallStatus.CLOSED, []),
+    (3, "Newton Food Centre", CuisineType.chinese, "229495", StallStatus.CLOSED, [("Monday", 10, 14)]),
+    (4, "Newton Food Centre", CuisineType.indian, "229495", StallStatus.OPEN, [("Monday", 18, 22)]),
+    (5, "Maxwell Food Centre", CuisineType.chinese, "069184", StallStatus.OPEN, [("Tuesday", 10, 14)]),
+    (6, "Tiong Bahru Market", CuisineType.western, "168898", StallStatus.OPEN, []),
+    (7, "Maxwell Food Centre", CuisineType.chinese, "069184", StallStatus.OPEN, []),
+]
+OPEN_AT_MONDAY_NOON = [1, 3, 5, 6, 7]  # 3 by its hours; 4 is outside them; the rest by manual status
+
+
+@pytest.fixture
+def client(database, monkeypatch):
+    with database.session() as db:
+        for stall_id, centre, cuisine, postal_code, stall_status, hours in STALLS:
+            db.add(Business(
+                id=stall_id, email=f"s{stall_id}@example.com", user_type="business",
+                license_number=f"L{stall_id}", stall_name="Chicken Rice", licensee_name="Owner",
+                establishment_address="1 Market St", hawker_centre=centre, postal_code=postal_code,
+                cuisine_type=cuisine, status=stall_status,
+            ))
+            for day, start, end in hours:
+                db.add(OperatingHour(license_number=f"L{stall_id}", day=day, start_time=time(start), end_time=time(end)))
+        db.add(ReviewAggregate(target_type="business", target_id=1, review_count=2, rating_sum=9))
+        db.commit()
+
+    # TestClient runs the app on its own event loop, so it gets its own async engine
+    async_engine = make_async_engine(database.url)
+
+    async def override_async_db():
+        async with async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)() as db:
+            yield db
+
+    monkeypatch.setattr(stall_route, "now_sg", lambda: MONDAY_NOON)
+    schedule_index.invalidate()
+    app = FastAPI()
+    app.include_router(stall_route.router)
+    app.dependency_overrides[get_async_db] = override_async_db
+    with TestClient(app) as test_client:
+        yield test_client
+    schedule_index.invalidate()
+
+
+def _pages(client, **params):
+    """Follows next_cursor from the first page; returns the ids of each page."""
+    pages, cursor = [], None
+    while True:
+        body = client.get("/stalls/", params={**params, **({"cursor": cursor} if cursor is not None else {})}).json()
+        pages.append([item["id"] for item in body["items"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+# Test Case 1: Pages split at `limit`, in id order, with no gaps or repeats; the last page has no cursor
+def test_page_boundaries(client):
+    assert _pages(client, limit=3) == [[1, 2, 3], [4, 5, 6], [7]]
+    assert _pages(client, limit=7) == [[1, 2, 3, 4, 5, 6, 7]]
+
+    first = client.get("/stalls/", params={"limit": 3}).json()
+    assert first["next_cursor"] == 3 and first["limit"] == 3
+    assert client.get("/stalls/", params={"cursor": 7}).json() == {"items": [], "next_cursor": None, "limit": 50}
+
+
+# Test Case 2: A malformed or out-of-range cursor or limit is rejected with 422
+@pytest.mark.parametrize("params", [
+    {"cursor": "abc"}, {"cursor": "-1"}, {"cursor": "eyJpZCI6IDN9"}, {"limit": 0},
+    {"limit": stall_route.MAX_PAGE_SIZE + 1}, {"cuisine_type": "Martian"},
+])
+def test_invalid_parameters(client, params):
+    assert client.get("/stalls/", params=params).status_code == 422
+
+
+# Test Case 3: Each filter narrows the listing, and paging within a filter stays in id order
+@pytest.mark.parametrize("params, expected", [
+    ({"hawker_centre": "Maxwell Food Centre"}, [1, 2, 5, 7]),
+    ({"cuisine_type": "Chinese"}, [1, 3, 5, 7]),
+    ({"postal_code": "229495"}, [3, 4]),
+    ({"open_now": "true"}, OPEN_AT_MONDAY_NOON),
+    ({"hawker_centre": "Maxwell Food Centre", "cuisine_type": "Chinese", "open_now": "true"}, [1, 5, 7]),
+])
+def test_filters(client, params, expected):
+    assert sum(_pages(client, **params, limit=2), []) == expected
+
+
+# Test Case 4: ?all=true returns the legacy plain list, filters included
+def test_all_returns_plain_list(client):
+    every = client.get("/stalls/", params={"all": "true"}).json()
+    assert [stall["id"] for stall in every] == [1, 2, 3, 4, 5, 6, 7]
+    assert [stall["id"] for stall in every if stall["is_open"]] == OPEN_AT_MONDAY_NOON
+    assert (every[0]["rating"], every[0]["review_count"]) == (4.5, 2)
+
+    maxwell = client.get("/stalls/", params={"all": "true", "hawker_centre": "Maxwell Food Centre"}).json()
+    assert [stall["id"] for stall in maxwell] == [1, 2, 5, 7]
@@ -0,0 +1,89 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import photo_store
+from app.utils import static_assets
+from app.utils.static_assets import StaticAssets, StaticAssetsMiddleware
+
+DIGEST_NAME = "ab" * 32 + ".jpg"
+
+
+def _client(photo_dir, **options):
+    """An app whose only middleware records the requests that get past the static mount."""
+    seen = []
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def record(request, call_next):
+        seen.append(request.url.path)
+        return await call_next(request)
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    files = StaticAssets(str(photo_dir), max_age=60, immutable=photo_store.is_content_addressed, **options)
+    app.add_middleware(StaticAssetsMiddleware, mounts={"/static/business": files})
+    return TestClient(app), seen
+
+
+@pytest.fixture
+def photo_dir(tmp_path):
+    (tmp_path / "stall.jpg").write_bytes(b"\xff\xd8\xff" + b"x" * 1000)
+    (tmp_path / DIGEST_NAME).write_bytes(b"\xff\xd8\xff" + b"y" * 1000)
+    return tmp_path
+
+
+# Test Case 1: Static requests are answered before the app's middleware; other routes still pass through
+def test_static_requests_bypass_app_middleware(photo_dir):
+    client, seen = _client(photo_dir)
+
+    assert client.get("/static/business/stall.jpg").status_code == 200
+    assert client.get("/static/business/missing.jpg").status_code == 404
+    assert client.get("/ping").status_code == 200
+    assert seen == ["/ping"]
+
+
+# Test Case 2: Cache headers, revalidation and byte ranges
+def test_cache_headers_and_ranges(photo_dir):
+    client, _ = _client(photo_dir)
+
+    response = client.get("/static/business/stall.jpg")
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert response.headers["last-modified"]
+    assert client.get("/static/business/stall.jpg", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    immutable = client.get(f"/static/business/{DIGEST_NAME}")
+    assert immutable.headers["cache-control"] == static_assets.IMMUTABLE_CACHE_CONTROL
+
+    partial = client.get("/static/business/stall.jpg", headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206
+    assert partial.content == b"\xff\xd8\xff" + b"x" * 7
+
+
+# Test Case 3: A precompressed copy is served only to clients that accept its encoding
+def test_precompressed_variant(photo_dir):
+    (photo_dir / "menu.svg").write_text("<svg/>")
+    (photo_dir / "menu.svg.gz").write_bytes(gzip.compress(b"<svg/>"))
+    client, _ = _client(photo_dir)
+
+    response = client.get("/static/business/menu.svg", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("image/svg+xml")
+    assert response.content == b"<svg/>"  # decoded by the client
+
+    plain = client.get("/static/business/menu.svg", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+# Test Case 4: In X-Accel-Redirect mode nginx is told where the file is instead of receiving it
+def test_accel_redirect(photo_dir):
+    client, _ = _client(photo_dir, accel_redirect="/internal/")
+
+    response = client.get("/static/business/stall.jpg")
+    assert response.headers["x-accel-redirect"] == f"/internal/{photo_dir.name}/stall.jpg"
+    assert response.content == b""
+    assert client.get("/static/business/../secret.txt").status_code == 404
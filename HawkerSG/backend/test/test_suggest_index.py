@@ -0,0 +1,153 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.business_model import Business, CuisineType
+from app.models.consumer_model import Consumer
+from app.models.favourite_model import Favourite
+from app.models.hawker_centre_model import HawkerCentre
+from app.models.review_aggregate_model import ReviewAggregate
+from app.routes import search_route
+from app.services import suggest_index
+from app.services.suggest_index import SuggestIndex
+
+
+def _suggestion(text, popularity, kind="stall"):
+    return {"text": text, "type": kind, "id": None, "count": 1, "popularity": popularity}
+
+
+# Test Case 1: Any word of a suggestion can match; more popular suggestions come first
+def test_prefix_matches_any_word_by_popularity():
+    index = SuggestIndex([
+        _suggestion("Tian Tian Chicken Rice", 40),
+        _suggestion("Chinatown Complex", 90, "hawker"),
+        _suggestion("Chinese", 500, "cuisine"),
+        _suggestion("Ah Tai Chicken Rice", 25),
+        _suggestion("Hup Kee Wanton Noodle", 10),
+    ])
+
+    assert [s["text"] for s in index.suggest("chi")] == [
+        "Chinese", "Chinatown Complex", "Tian Tian Chicken Rice", "Ah Tai Chicken Rice",
+    ]
+    assert [s["text"] for s in index.suggest("Chicken R", limit=1)] == ["Tian Tian Chicken Rice"]
+    assert [s["text"] for s in index.suggest("noodle")] == ["Hup Kee Wanton Noodle"]
+    assert index.suggest("xyz") == [] and index.suggest("  ") == []
+
+
+# Test Case 2: Short prefixes are answered from precomputed results, without ranking at lookup time
+def test_short_prefixes_are_precomputed():
+    index = SuggestIndex([_suggestion(f"Stall {i} Chicken Rice", i) for i in range(20000)])
+    index._rank = None  # any ranking or range scan would now fail
+
+    results = index.suggest("c")
+    assert [s["popularity"] for s in results] == list(range(19999, 19989, -1))
+    assert [s["popularity"] for s in index.suggest("ST", limit=3)] == [19999, 19998, 19997]
+    with pytest.raises(AttributeError):
+        index.suggest("chic")
+
+
+def _stall(id, name, centre, cuisine=CuisineType.chinese):
+    return Business(
+        id=id, email=f"s{id}@example.com", user_type="business", license_number=f"L{id}",
+        stall_name=name, licensee_name="Owner", establishment_address="1 Market St", hawker_centre=centre,
+        postal_code="048947", cuisine_type=cuisine,
+    )
+
+
+# Test Case 3: Built from the database with shared stall names merged and private searches left out
+def test_build_from_database(db):
+    db.add_all([
+        _stall(1, "Chicken Rice", "Maxwell Food Centre"),
+        _stall(2, "Chicken Rice", "Newton Food Centre"),
+        _stall(3, "Laksa King", "Maxwell Food Centre", CuisineType.malay),
+        HawkerCentre(id=50, name="Maxwell Food Centre", address="1 Kadayanallur St", latitude=1.28, longitude=103.84),
+        ReviewAggregate(target_type="business", target_id=3, review_count=7, rating_sum=30),
+        *[Consumer(id=100 + i, email=f"c{i}@example.com", user_type="consumer",
+                   recentlySearch="laksa|private thing" if i == 0 else "Laksa") for i in range(suggest_index.MIN_TERM_SEARCHERS)],
+        Favourite(consumer_id=100, target_type="business", target_id=3),
+    ])
+    db.commit()
+
+    index = suggest_index.build(db)
+
+    by_text = {(s["type"], s["text"]): s for s in index.suggest("laksa") + index.suggest("chicken") + index.suggest("m")}
+    assert by_text[("stall", "Chicken Rice")]["count"] == 2 and by_text[("stall", "Chicken Rice")]["id"] is None
+    assert by_text[("stall", "Chicken Rice")]["popularity"] == 2
+    assert by_text[("stall", "Laksa King")]["popularity"] == 9
+    assert by_text[("hawker", "Maxwell Food Centre")]["popularity"] == 2
+    assert by_text[("cuisine", "Malay")]["popularity"] == 1
+    assert by_text[("term", "laksa")]["popularity"] == suggest_index.MIN_TERM_SEARCHERS
+    assert index.suggest("private") == []
+
+
+@pytest.fixture
+def gated_build(database, monkeypatch):
+    """Background builds read the test database, then wait for `release` before publishing."""
+    monkeypatch.setattr(suggest_index, "_session_factory", database.session)
+    started, release = [], threading.Event()
+    build = suggest_index.build
+
+    def gated(db):
+        started.append(threading.current_thread().name)
+        index = build(db)
+        assert release.wait(10)
+        return index
+
+    monkeypatch.setattr(suggest_index, "build", gated)
+    suggest_index.invalidate()
+    yield started, release
+    release.set()
+    _wait_until(lambda: not suggest_index._rebuilding)
+    suggest_index.invalidate()
+
+
+def _wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _add_stall(database, id, name):
+    with database.session() as db:
+        db.add(_stall(id, name, "Maxwell Food Centre"))
+        db.commit()
+
+
+# Test Case 4: Requests before the first build get no suggestions and never build themselves;
+# one background build serves them all once it is published
+def test_first_requests_wait_for_one_background_build(database, gated_build):
+    started, release = gated_build
+    _add_stall(database, 1, "Chicken Rice")
+    app = FastAPI()
+    app.include_router(search_route.router)
+    client = TestClient(app)
+
+    responses = [client.get("/search/suggest", params={"prefix": "chi"}) for _ in range(5)]
+    assert [r.json()["items"] for r in responses] == [[]] * 5
+    _wait_until(lambda: started)
+
+    release.set()
+    _wait_until(lambda: suggest_index._index is not None)
+    items = client.get("/search/suggest", params={"prefix": "chi"}).json()["items"]
+    assert [item["text"] for item in items] == ["Chinese", "Chicken Rice"]
+    assert started == ["suggest-index"]
+
+
+# Test Case 5: warm() during a build (e.g. seeding finished meanwhile) runs one more build
+def test_warm_during_build_rebuilds_again(database, gated_build):
+    started, release = gated_build
+    suggest_index.warm()
+    _wait_until(lambda: started)  # read the empty database
+
+    _add_stall(database, 1, "Chicken Rice")
+    suggest_index.warm()
+    suggest_index.warm()
+    release.set()
+
+    _wait_until(lambda: not suggest_index._rebuilding)
+    assert len(started) == 2
+    assert [s["text"] for s in suggest_index.suggest("chicken")] == ["Chicken Rice"]
@@ -0,0 +1,77 @@
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import uploads
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 100
+WEBP = b"RIFF\x00\x00\x00\x00WEBPVP8 " + b"\x00" * 100
+
+
+class CountingReader(io.BytesIO):
+    """Records the largest read so the test can check the upload is streamed."""
+    largest_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.largest_read = max(self.largest_read, len(data))
+        return data
+
+
+# Test Case 1: The image type comes from the magic bytes
+def test_sniff_image_type():
+    assert uploads.sniff_image_type(PNG[:12]) == "image/png"
+    assert uploads.sniff_image_type(JPEG[:12]) == "image/jpeg"
+    assert uploads.sniff_image_type(WEBP[:12]) == "image/webp"
+    assert uploads.sniff_image_type(b"GIF89a......") is None
+
+
+# Test Case 2: A large upload is copied chunk by chunk into a temp file and hashed on the way
+def test_receive_image_streams_to_disk(tmp_path):
+    body = JPEG + os.urandom(1024 * 1024)
+    source = CountingReader(body)
+
+    tmp_file, mime_type, digest = uploads.receive_image(source, str(tmp_path), max_bytes=2 * 1024 * 1024)
+
+    assert mime_type == "image/jpeg"
+    assert digest == hashlib.sha256(body).hexdigest()
+    assert open(tmp_file, "rb").read() == body
+    assert source.largest_read <= uploads.CHUNK_SIZE
+    uploads.discard(tmp_file)
+    assert os.listdir(tmp_path) == []
+
+
+# Test Case 3: An oversized upload is abandoned once it passes the limit and leaves nothing on disk
+def test_receive_image_size_cap(tmp_path):
+    source = CountingReader(PNG + b"\x00" * (5 * uploads.CHUNK_SIZE))
+
+    with pytest.raises(HTTPException) as exc:
+        uploads.receive_image(source, str(tmp_path), max_bytes=2 * uploads.CHUNK_SIZE)
+
+    assert exc.value.status_code == 413
+    assert source.tell() == 3 * uploads.CHUNK_SIZE
+    assert os.listdir(tmp_path) == []
+
+
+# Test Case 4: A non-image posing as a PNG is rejected whatever its name
+def test_receive_image_rejects_spoofed_type(tmp_path):
+    with pytest.raises(HTTPException) as exc:
+        uploads.receive_image(io.BytesIO(b"<?php echo 1; ?>" * 10), str(tmp_path), max_bytes=1024)
+
+    assert exc.value.status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+# Test Case 5: Only the allowed types are accepted
+def test_receive_image_allowed_types(tmp_path):
+    tmp_file, mime_type, _ = uploads.receive_image(io.BytesIO(WEBP), str(tmp_path), 1024)
+    assert mime_type == "image/webp"
+    uploads.discard(tmp_file)
+
+    with pytest.raises(HTTPException):
+        uploads.receive_image(io.BytesIO(WEBP), str(tmp_path), 1024, ["image/png"])
+    assert os.listdir(tmp_path) == []
@@ -52,7 +52,7 @@ export default function StallCard({ stall, variant = "grid" }: StallCardProps) {
 
       {/* Stall image */}
       <img
-        src={stall.images?.[0] ?? "/placeholder.jpg"}
+        src={stall.thumbnail ?? stall.images?.[0] ?? "/placeholder.jpg"}
         alt={stall.name}
         className={`${imageHeight} w-full object-cover`}
       />
@@ -33,6 +33,7 @@ export interface Stall {
   cuisine: string;
   location: string;
   images: string[];
+  thumbnail?: string; // small WebP for list views; falls back to images[0]
   rating: number;
   reviewCount: number;
   priceRange: '$' | '$$' | '$$$';
@@ -101,7 +102,7 @@ export function DataProvider({ children }: { children: React.ReactNode }) {
       try {
         const [hawkersRes, stallsRes] = await Promise.all([
           fetch(`${API_BASE_URL}/hawkers`),
-          fetch(`${API_BASE_URL}/stalls`)
+          fetch(`${API_BASE_URL}/stalls?all=true`)
         ]);
 
         if (!hawkersRes.ok || !stallsRes.ok) {
@@ -333,6 +334,7 @@ export function DataProvider({ children }: { children: React.ReactNode }) {
               cuisine,
               location: String(stall?.establishment_address ?? ""),
               images: photo ? [photo] : [],
+              thumbnail: stall?.photo_variants?.thumb ?? undefined,
               rating,
               reviewCount,
               priceRange: "$",
@@ -450,40 +452,16 @@ export function DataProvider({ children }: { children: React.ReactNode }) {
   const getReviewsByStall = async (stallId: string | number) => {
     try {
       // 1. Fetch reviews for the stall
-      const res = await fetch(`${API_BASE_URL}/targets/business/${stallId}/reviews`);
+      const res = await fetch(`${API_BASE_URL}/targets/business/${stallId}/reviews?all=true`);
       if (!res.ok) throw new Error(`Failed to fetch reviews for stall ${stallId}`);
       const reviews = await res.json();
-      console.log("Raw review data:", reviews);
-
-      // 2. Fetch usernames for all unique consumer IDs to avoid multiple requests
-      const consumerIds = Array.from(new Set(reviews.map((r: any) => r.consumer_id))) as number[];
-
-      const consumerMap: Record<number, string> = {};
-
-      await Promise.all(
-        consumerIds.map(async (id) => {
-          const numericId = Number(id); // <-- cast to number
-          try {
-            const userRes = await fetch(`${API_BASE_URL}/consumer/${numericId}`);
-            if (userRes.ok) {
-              const userData = await userRes.json();
-              consumerMap[numericId] = userData.username;
-            } else {
-              consumerMap[numericId] = "Unknown";
-            }
-          } catch (_) {
-            consumerMap[numericId] = "Unknown";
-          }
-        })
-      );
-
 
-      // 3. Map reviews to your Review interface using the fetched usernames
+      // 2. Map reviews to your Review interface; each review carries its reviewer's username
       return reviews.map((r: any) => ({
         id: String(r.id),
         stallId: String(stallId),
         userId: String(r.consumer_id),
-        userName: consumerMap[r.consumer_id] || "Unknown",
+        userName: r.reviewer?.username || "Unknown",
         rating: Number(r.star_rating),
         comment: r.description || "",
         images: Array.isArray(r.images) ? r.images : [],
@@ -731,24 +709,14 @@ export function DataProvider({ children }: { children: React.ReactNode }) {
   const getReviewsByConsumer = async (consumerId: string) => {
     try {
 
-      const res = await fetch(`${API_BASE_URL}/consumers/${consumerId}/reviews`);
+      const res = await fetch(`${API_BASE_URL}/consumers/${consumerId}/reviews?all=true`);
       if (!res.ok) throw new Error("Failed to fetch consumer reviews");
       const reviews = await res.json();
-      let userName = "Unknown";
-      try {
-        const userRes = await fetch(`${API_BASE_URL}/consumer/${consumerId}`);
-        if (userRes.ok) {
-          const userData = await userRes.json();
-          userName = userData.username;
-        }
-      } catch (_) {
-     
-      }
       return reviews.map((r: any) => ({
         id: String(r.id),
         stallId: String(r.target_id),
         userId: String(r.consumer_id),
-        userName, 
+        userName: r.reviewer?.username || "Unknown",
         rating: Number(r.star_rating),
         comment: r.description || "",
         images: Array.isArray(r.images) ? r.images : [],